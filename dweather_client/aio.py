@@ -0,0 +1,641 @@
+"""
+Asyncio versions of the client's queries, for services running on an event loop.
+
+Every read goes through an AsyncTransport, so that thousands of queries can be in flight on a single
+event loop without a thread per request. AsyncGatewayTransport caps how many requests are open at once,
+across all of the queries sharing it. Files are named and decoded by the same logic as the synchronous
+datasets, the archive reads of archive_utils are run over the async transport with `run_reads`.
+
+Requires aiohttp, which the `aio` extra installs: pip install dweather_client[aio]
+
+    from dweather_client import aio
+    async with aio.AsyncGatewayTransport(max_concurrency=64) as transport:
+        histories = await asyncio.gather(*(
+            aio.get_gridcell_history(lat, lon, "cpcc_precip_us-daily", transport=transport) for lat, lon in points))
+"""
+import asyncio
+import datetime
+import gzip
+import json
+from abc import ABC, abstractmethod
+from io import BytesIO
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from dweather_client import client
+from dweather_client.aliases_and_units import get_unit_converter, get_unit_converter_no_aliases, get_to_units
+from dweather_client.archive_utils import tar_members_reads, zip_members_reads
+from dweather_client.cache_utils import METADATA_CACHE
+from dweather_client.http_queries import GATEWAY_URL
+from dweather_client.ipfs_errors import *
+from dweather_client.ipfs_queries import SimpleGriddedDataset, ForecastDataset, METADATA_FILE, generated_by
+from dweather_client.manifest_utils import get_manifest
+from dweather_client.storms_datasets import IbtracsDataset, AtcfDataset, SimulatedStormsDataset
+from dweather_client.struct_utils import check_result_format
+from dweather_client.timeseries_utils import window_bounds, overlaps_window
+from dweather_client.transports import NOT_FOUND_ERRORS, _strip_ipfs_prefix
+
+# requests open at once on an AsyncGatewayTransport by default
+DEFAULT_CONCURRENCY = 32
+# what async transports raise when the gateway doesn't answer in time
+TIMEOUT_ERRORS = (asyncio.TimeoutError,)
+
+
+async def run_reads(reads, transport):
+    """
+    Async version of archive_utils.run_reads
+    args:
+    :reads: generator of reads, such as archive_utils.tar_members_reads
+    :transport: AsyncTransport to make the calls with
+    return: the value returned by `reads`
+    """
+    try:
+        request = next(reads)
+        while True:
+            method, *args = request
+            request = reads.send(await getattr(transport, method)(*args))
+    except StopIteration as stop:
+        return stop.value
+
+
+class AsyncTransport(ABC):
+    """
+    Base class for the ways of reading IPFS content from coroutines, see transports.Transport
+    """
+
+    @abstractmethod
+    async def cat(self, path):
+        """
+        args:
+        :path: IPFS path of the file to get, e.g. `{hash}/metadata.json`
+        return: content of the file as bytes
+        raises: one of NOT_FOUND_ERRORS if the path doesn't exist
+        """
+        pass
+
+    async def cat_range(self, path, offset, length):
+        """
+        return: `length` bytes of the file at `path` starting at `offset`, fewer if the file ends first
+        """
+        return (await self.cat(path))[offset:offset + length]
+
+    async def size(self, path):
+        """
+        return: size of the file at `path` in bytes
+        """
+        return len(await self.cat(path))
+
+    @abstractmethod
+    async def get_heads(self):
+        """
+        return: dict of dataset name: hash of the head of its linked list, see http_queries.get_heads
+        """
+        pass
+
+    async def close(self):
+        """
+        Release any connections held by the transport
+        """
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+
+class AsyncGatewayTransport(AsyncTransport):
+    """
+    Reads content from an HTTP gateway with aiohttp, with at most `max_concurrency` requests open at once
+    """
+
+    def __init__(self, url=GATEWAY_URL, timeout=None, max_concurrency=DEFAULT_CONCURRENCY, session=None):
+        """
+        args:
+        :url: base url of the IPFS gateway
+        :timeout: seconds to wait for each request before throwing exception. If None, waits indefinitely
+        :max_concurrency: max number of requests open at once
+        :session: aiohttp.ClientSession to use instead of creating one on first use, it is left open on close
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for async queries, install dweather_client[aio]")
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = None
+
+    def _get_session(self):
+        # sessions and semaphores belong to the event loop they're created on, so they're only created once it runs
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, method, url, path, headers=None):
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(method, url, headers=headers) as r:
+                if r.status == 404:
+                    raise ContentNotFoundError(f"{path} not found on {self.url}")
+                if r.status == 416:
+                    return r, b""
+                r.raise_for_status()
+                return r, await r.read()
+
+    async def cat(self, path):
+        _, content = await self._request("GET", f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", path)
+        return content
+
+    async def cat_range(self, path, offset, length):
+        if length <= 0:
+            return b""
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        r, content = await self._request("GET", f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", path, headers)
+        if r.status == 200:
+            # the gateway ignored the range and sent the whole file
+            return content[offset:offset + length]
+        return content
+
+    async def size(self, path):
+        r, _ = await self._request("HEAD", f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", path)
+        if r.content_length is not None:
+            return r.content_length
+        return len(await self.cat(path))
+
+    async def get_heads(self):
+        _, content = await self._request("GET", f"{self.url}/climate/hashes/heads.json", "heads.json")
+        return json.loads(content)
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_default_transport = None
+
+
+def set_default_transport(transport):
+    """
+    Make every async dataset created without an explicit transport share `transport`.
+    Pass None to go back to creating an AsyncGatewayTransport per dataset
+    """
+    global _default_transport
+    _default_transport = transport
+
+
+def get_default_transport():
+    """
+    return: the transport set with set_default_transport, or None
+    """
+    return _default_transport
+
+
+class AsyncIpfsDataset:
+    """
+    Base class for the async queries of an IPFS dataset, see ipfs_queries.IpfsDataset. Queries keep no state
+    on the dataset, so that a single dataset object can serve any number of concurrent queries
+    """
+
+    def __init__(self, dataset, as_of=None, ipfs_timeout=None, transport=None):
+        """
+        args:
+        :dataset: name of the dataset in heads.json
+        :as_of: optional datetime, releases generated after it are ignored
+        :ipfs_timeout: seconds to wait for each request of a transport created for this dataset
+        :transport: AsyncTransport to read content with. If None, uses the default set with set_default_transport,
+        falling back to an AsyncGatewayTransport
+        """
+        self.dataset = dataset
+        self.as_of = as_of
+        if transport is None:
+            transport = get_default_transport()
+        # only close transports created for this dataset, a shared one may still be in use
+        self._owns_transport = transport is None
+        self.transport = AsyncGatewayTransport(timeout=ipfs_timeout) if transport is None else transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._owns_transport:
+            await self.transport.close()
+        return False
+
+    async def get_head(self):
+        """
+        return: hash of the head of the dataset's linked list
+        raises: KeyError if the dataset isn't in heads.json
+        """
+        return (await self.transport.get_heads())[self.dataset]
+
+    async def get_metadata(self, h):
+        """
+        return: metadata of the release `h` as dict, cached like IpfsDataset.get_metadata
+        """
+        text = METADATA_CACHE.get(h)
+        if text is None:
+            text = (await self.transport.cat(f"{h}/{METADATA_FILE}")).decode("utf-8")
+            METADATA_CACHE.put(h, text)
+        return json.loads(text)
+
+    async def get_releases(self, head):
+        """
+        Like IpfsDataset.iter_releases, only the releases that aren't in the dataset's manifest yet require
+        a metadata fetch
+        return: list of the manifest records of the linked list from `head`, newest first
+        """
+        manifest = get_manifest(self.dataset)
+        fetched = {}
+        release_itr = head
+        while release_itr is not None:
+            record = manifest.get(release_itr)
+            if record is None:
+                fetched[release_itr] = await self.get_metadata(release_itr)
+                release_itr = fetched[release_itr].get("previous hash")
+            else:
+                release_itr = record["previous hash"]
+        return list(manifest.iter_releases(head, fetched.__getitem__))
+
+    async def get_file_object(self, path):
+        """
+        return: content of the file at `path` as file-like bytes object
+        """
+        return BytesIO(await self.transport.cat(path))
+
+
+class AsyncGriddedDataset(AsyncIpfsDataset):
+    """
+    Async queries of the gridded datasets derived from SimpleGriddedDataset, which cover most of
+    client.GRIDDED_DATASETS. Prism, RTMA, Copernicus and VHI sets are only available synchronously
+    """
+
+    def __init__(self, dataset, as_of=None, ipfs_timeout=None, transport=None):
+        """
+        args:
+        :dataset: name of a gridded dataset, as in client.GRIDDED_DATASETS
+        see AsyncIpfsDataset for the others
+        raises: KeyError if there's no such gridded dataset, DatasetError if it has no async queries
+        """
+        dataset_class = client.GRIDDED_DATASETS[dataset]
+        if not issubclass(dataset_class, SimpleGriddedDataset):
+            raise DatasetError(f"{dataset} can't be queried asynchronously, use client.get_gridcell_history")
+        super().__init__(dataset, as_of=as_of, ipfs_timeout=ipfs_timeout, transport=transport)
+        # the synchronous dataset only names and decodes the cells, it never reads from its transport
+        self.grid = dataset_class(as_of=as_of, transport=self.transport)
+
+    async def get_data(self, lat, lon, start=None, end=None):
+        """
+        Async version of SimpleGriddedDataset.get_data
+        raises: ContentNotFoundError if a release of the dataset has no data for the point
+        """
+        response = (await self.get_data_many([(lat, lon)], start, end))[(lat, lon)]
+        if response is None:
+            raise ContentNotFoundError(f"{self.dataset} has no data for {lat}, {lon}")
+        return response
+
+    async def get_data_many(self, points, start=None, end=None):
+        """
+        Async version of SimpleGriddedDataset.get_data_many
+        """
+        head = await self.get_head()
+        return await self.query_points(head, points, await self.get_metadata(head), start, end)
+
+    async def query_points(self, head, points, metadata, start=None, end=None):
+        """
+        Async version of SimpleGriddedDataset.query_points. The releases overlapping the window are all read at once
+        """
+        cells = {tuple(point): self.grid.snap_point(*point, metadata) for point in points}
+        file_names = {cell: self.grid.get_file_names(*cell) for cell in set(cells.values())}
+        start, end = window_bounds(start, end)
+        records = [record for record in await self.get_releases(head) if generated_by(record, self.as_of)]
+        releases = await asyncio.gather(*(
+            self.fetch_cells(record, file_names, metadata, start, end) for record in reversed(records)))
+        return self.grid.collect_cells(cells, [release for release in releases if release is not None], start, end)
+
+    async def fetch_cells(self, record, file_names, metadata, start=None, end=None):
+        """
+        Read and decode the cells of a release, see SimpleGriddedDataset.iter_cell_files
+        args:
+        :record: manifest record of the release
+        :file_names: dict of snapped cell: dict of tar and gz names as returned by get_file_names
+        :metadata: metadata of the head of the dataset
+        return: dict of cell: decoded data without the cells the release doesn't have, or None if the release
+        doesn't overlap the window
+        """
+        ipfs_hash = record["hash"]
+        date_range = self.grid.get_date_range_from_metadata(ipfs_hash)
+        if not overlaps_window(*date_range, start, end):
+            return None
+        if record["previous hash"] is None:
+            contents = await asyncio.gather(*(
+                self.cat_if_found(f"{ipfs_hash}/{names['gz']}") for names in file_names.values()))
+            cell_files = {cell: content for cell, content in zip(file_names, contents) if content is not None}
+        else:
+            tars = {}
+            for cell, names in file_names.items():
+                tars.setdefault(names["tar"], {})[names["gz"]] = cell
+            members = await asyncio.gather(*(
+                self.get_archive_members(ipfs_hash, tar_name, list(cells)) for tar_name, cells in tars.items()))
+            cell_files = {cells[member]: content
+                          for cells, tar_members in zip(tars.values(), members) for member, content in tar_members.items()}
+        return {cell: self.grid.decode_weather_file(BytesIO(content), date_range, metadata.get("missing value"), start, end)
+                for cell, content in cell_files.items()}
+
+    async def cat_if_found(self, path):
+        """
+        return: content of the file at `path`, or None if there's no such file
+        """
+        try:
+            return await self.transport.cat(path)
+        except NOT_FOUND_ERRORS:
+            return None
+
+    async def get_archive_members(self, ipfs_hash, tar_name, members):
+        """
+        return: dict of member name: content of the members of a release's tar, or of the zip replacing it in some
+        releases, without the members the archive doesn't have
+        """
+        try:
+            return await run_reads(tar_members_reads(f"{ipfs_hash}/{tar_name}", members), self.transport)
+        except NOT_FOUND_ERRORS:
+            try:
+                return await run_reads(zip_members_reads(f"{ipfs_hash}/{tar_name[:-4]}.zip", members), self.transport)
+            except NOT_FOUND_ERRORS:
+                return {}
+
+
+class AsyncForecastDataset(AsyncIpfsDataset):
+    """
+    Async queries of the GFS and ECMWF forecast datasets, see ipfs_queries.ForecastDataset
+    """
+
+    def __init__(self, dataset, ipfs_timeout=None, transport=None):
+        """
+        raises: DatasetError if `dataset` isn't a GFS or ECMWF set
+        """
+        interval, con_to_cpc = client.get_forecast_interval(dataset)
+        super().__init__(dataset, ipfs_timeout=ipfs_timeout, transport=transport)
+        # the synchronous dataset only names and decodes the files, it never reads from its transport
+        self.forecast = ForecastDataset(dataset, interval, con_to_cpc, transport=self.transport)
+
+    async def get_data(self, lat, lon, forecast_date):
+        """
+        Async version of ForecastDataset.get_data
+        """
+        head = await self.get_head()
+        return await self.query_point(head, await self.get_metadata(head), lat, lon, forecast_date)
+
+    async def query_point(self, head, metadata, lat, lon, forecast_date):
+        """
+        Implementation of get_data, once the dataset's head and its metadata have been looked up
+        """
+        snapped_lat, snapped_lon = self.forecast.snap_point(lat, lon, metadata)
+        relevant_hash = ForecastDataset.find_relevant_hash(
+            forecast_date, ForecastDataset.parse_full_date_range(metadata), await self.get_releases(head))
+        file_names = self.forecast.get_file_names(forecast_date, snapped_lat, snapped_lon)
+        members = await run_reads(
+            zip_members_reads(f"{relevant_hash}/{file_names['zip']}", [file_names["file"]]), self.transport)
+        return self.forecast.to_conventional(snapped_lat, snapped_lon), \
+            self.forecast.decode_forecast(forecast_date, members[file_names["file"]])
+
+
+class AsyncStationDataset(AsyncIpfsDataset):
+    """
+    Async queries of the "ghcnd" or "ghcnd-imputed-daily" station data, see ipfs_queries.StationDataset
+    """
+
+    async def get_data(self, station):
+        head = await self.get_head()
+        with gzip.open(await self.get_file_object(f"{head}/{station}.csv.gz")) as gz:
+            return gz.read().decode('utf-8')
+
+
+class AsyncIbtracsDataset(AsyncIpfsDataset):
+    """
+    Async queries of storms_datasets.IbtracsDataset
+    """
+
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(IbtracsDataset.dataset, ipfs_timeout=ipfs_timeout, transport=transport)
+
+    async def get_data(self, basin, **kwargs):
+        if basin not in IbtracsDataset.BASINS:
+            raise ValueError("Invalid basin ID")
+        head = await self.get_head()
+        ipfs_hash = head
+        if kwargs["as_of"] is not None:
+            ipfs_hash = IbtracsDataset.find_relevant_hash(kwargs["as_of"], head, await self.get_releases(head))
+        file_obj = await self.get_file_object(f"{ipfs_hash}/ibtracs-{basin}.csv.gz")
+        return IbtracsDataset.read_basin_file(file_obj, **kwargs)
+
+
+class AsyncAtcfDataset(AsyncIpfsDataset):
+    """
+    Async queries of storms_datasets.AtcfDataset, whose releases are all read at once
+    """
+
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(AtcfDataset.dataset, ipfs_timeout=ipfs_timeout, transport=transport)
+
+    async def get_data(self, basin, **kwargs):
+        if basin not in AtcfDataset.BASINS:
+            raise ValueError("Invalid basin ID")
+        records = await self.get_releases(await self.get_head())
+        release_files = await asyncio.gather(*(
+            self.get_file_object(f"{record['hash']}/history.json.gz") for record in reversed(records)))
+        return AtcfDataset.read_release_files(release_files, basin, **kwargs)
+
+
+class AsyncSimulatedStormsDataset(AsyncIpfsDataset):
+    """
+    Async queries of storms_datasets.SimulatedStormsDataset, whose files for a basin are all read at once
+    """
+
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(SimulatedStormsDataset.dataset, ipfs_timeout=ipfs_timeout, transport=transport)
+
+    async def get_data(self, basin, **kwargs):
+        head = await self.get_head()
+        if basin not in SimulatedStormsDataset.BASINS:
+            raise ValueError("Invalid basin ID")
+        metadata = await self.get_metadata(head)
+        names = [f for f in metadata["files"] if basin in f]
+        file_objs = await asyncio.gather(*(self.get_file_object(f"{head}/{f}") for f in names))
+        return SimulatedStormsDataset.read_simulation_files(dict(zip(names, file_objs)), **kwargs)
+
+
+def get_converter(metadata, use_imperial_units, desired_units):
+    """
+    return: the unit converter and dweather unit of a dataset from its metadata, like the client functions set them up
+    """
+    if not desired_units:
+        return get_unit_converter(metadata["unit of measurement"], use_imperial_units)
+    return get_unit_converter_no_aliases(metadata["unit of measurement"], desired_units)
+
+
+async def get_gridcell_history(
+        lat,
+        lon,
+        dataset,
+        also_return_snapped_coordinates=False,
+        also_return_metadata=False,
+        use_imperial_units=True,
+        desired_units=None,
+        convert_to_local_time=True,
+        as_of=None,
+        ipfs_timeout=None,
+        start=None,
+        end=None,
+        result_format="dict",
+        transport=None):
+    """
+    Async version of client.get_gridcell_history, for the datasets of AsyncGriddedDataset. `transport` is the
+    AsyncTransport to read with, see AsyncIpfsDataset
+    """
+    history = (await get_gridcell_histories(
+        [(lat, lon)], dataset, also_return_snapped_coordinates, also_return_metadata, use_imperial_units,
+        desired_units, convert_to_local_time, as_of, ipfs_timeout, start, end, result_format, transport))[(lat, lon)]
+    if history is None:
+        raise CoordinateNotFoundError("Invalid coordinate for dataset")
+    return history
+
+
+async def get_gridcell_histories(
+        points,
+        dataset,
+        also_return_snapped_coordinates=False,
+        also_return_metadata=False,
+        use_imperial_units=True,
+        desired_units=None,
+        convert_to_local_time=True,
+        as_of=None,
+        ipfs_timeout=None,
+        start=None,
+        end=None,
+        result_format="dict",
+        transport=None):
+    """
+    Async version of client.get_gridcell_histories, for the datasets of AsyncGriddedDataset. `transport` is the
+    AsyncTransport to read with, see AsyncIpfsDataset
+    """
+    check_result_format(result_format)
+    points = [tuple(point) for point in points]
+    try:
+        dataset_obj = AsyncGriddedDataset(dataset, as_of=as_of, ipfs_timeout=ipfs_timeout, transport=transport)
+    except KeyError:
+        raise DatasetError("No such dataset in dClimate")
+    async with dataset_obj:
+        try:
+            head = await dataset_obj.get_head()
+        except KeyError:
+            raise DatasetError("No such dataset in dClimate")
+        metadata = await dataset_obj.get_metadata(head)
+        converter, dweather_unit = get_converter(metadata, use_imperial_units, desired_units)
+        try:
+            responses = await dataset_obj.query_points(head, points, metadata, start=start, end=end)
+        except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError):
+            raise CoordinateNotFoundError("Invalid coordinate for dataset")
+
+    return client.format_gridcell_histories(
+        responses, metadata, converter, dweather_unit, desired_units, convert_to_local_time, result_format,
+        also_return_metadata, also_return_snapped_coordinates)
+
+
+async def get_forecast(
+        lat,
+        lon,
+        forecast_date,
+        dataset,
+        also_return_snapped_coordinates=False,
+        also_return_metadata=False,
+        use_imperial_units=True,
+        desired_units=None,
+        convert_to_local_time=True,
+        ipfs_timeout=None,
+        transport=None):
+    """
+    Async version of client.get_forecast. `transport` is the AsyncTransport to read with, see AsyncIpfsDataset
+    """
+    if not isinstance(forecast_date, datetime.date):
+        raise TypeError("Forecast date must be datetime.date")
+
+    async with AsyncForecastDataset(dataset, ipfs_timeout=ipfs_timeout, transport=transport) as dataset_obj:
+        try:
+            head = await dataset_obj.get_head()
+        except KeyError:
+            raise DatasetError("No such dataset in dClimate")
+        metadata = await dataset_obj.get_metadata(head)
+        converter, dweather_unit = get_converter(metadata, use_imperial_units, desired_units)
+        try:
+            (lat, lon), resp_frame = await dataset_obj.query_point(head, metadata, lat, lon, forecast_date)
+        except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError):
+            raise CoordinateNotFoundError("Invalid coordinate for dataset")
+
+    return client.format_forecast(
+        resp_frame, lat, lon, metadata, converter, dweather_unit, desired_units, convert_to_local_time,
+        also_return_metadata, also_return_snapped_coordinates)
+
+
+async def get_station_history(
+        station_id,
+        weather_variable,
+        use_imperial_units=True,
+        desired_units=None,
+        dataset='ghcnd',
+        ipfs_timeout=None,
+        transport=None):
+    """
+    Async version of client.get_station_history. `transport` is the AsyncTransport to read with, see AsyncIpfsDataset
+    """
+    to_unit = None
+    if desired_units:
+        to_unit = get_to_units(desired_units)
+    async with AsyncStationDataset(dataset, ipfs_timeout=ipfs_timeout, transport=transport) as dataset_obj:
+        try:
+            csv_text = await dataset_obj.get_data(station_id)
+        except KeyError:
+            raise DatasetError("No such dataset in dClimate")
+        except NOT_FOUND_ERRORS:
+            raise StationNotFoundError("Invalid station ID for dataset")
+    return client.format_station_history(csv_text, weather_variable, use_imperial_units, to_unit)
+
+
+async def get_tropical_storms(
+        source,
+        basin,
+        radius=None,
+        lat=None,
+        lon=None,
+        min_lat=None,
+        min_lon=None,
+        max_lat=None,
+        max_lon=None,
+        as_of=None,
+        ipfs_timeout=None,
+        transport=None):
+    """
+    Async version of client.get_tropical_storms. `transport` is the AsyncTransport to read with, see AsyncIpfsDataset
+    """
+    storm_kwargs = client.get_storm_kwargs(radius, lat, lon, min_lat, min_lon, max_lat, max_lon, as_of)
+    if source == "atcf":
+        cm = AsyncAtcfDataset(ipfs_timeout=ipfs_timeout, transport=transport)
+    elif source == "historical":
+        cm = AsyncIbtracsDataset(ipfs_timeout=ipfs_timeout, transport=transport)
+    elif source == "simulated":
+        cm = AsyncSimulatedStormsDataset(ipfs_timeout=ipfs_timeout, transport=transport)
+    else:
+        raise ValueError("Invalid source")
+
+    async with cm as storm_getter:
+        return await storm_getter.get_data(basin, **storm_kwargs)
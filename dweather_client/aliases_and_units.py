@@ -12,6 +12,7 @@ import os
 from astropy import units as u
 from astropy.units import equivalencies, imperial
 from math import floor, log10
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 
@@ -30,23 +31,93 @@ UNIT_ALIASES = {
     "m^3/s": u.m**3 / u.s,
 }
 
+# spellings of the temperature units used in metadata and by users, registered once for unit parsing
+DEGF = u.def_unit("degF", imperial.deg_F)
+DEGC = u.def_unit("degC", u.deg_C)
+
+# parsing unit strings is slow, so converters are built once per distinct set of arguments
+UNIT_CACHE_SIZE = 1024
+
+class AffineConverter:
+    """
+    Converts values between two units whose conversion is a scale and an offset, e.g. mm to inch or degC to degF,
+    with one multiply-add on the raw floats instead of going through astropy on every call.
+    The scale and offset are computed once with astropy when the converter is built
+    """
+
+    def __init__(self, from_unit, to_unit, equivalencies=None):
+        """
+        args:
+        :from_unit: astropy unit of the values to convert
+        :to_unit: astropy unit to convert them to
+        :equivalencies: astropy equivalencies needed for the conversion, e.g. u.temperature()
+        raises: ValueError if the units can't be converted, or not with a scale and offset (e.g. logarithmic units)
+        """
+        self.from_unit = from_unit
+        self.to_unit = to_unit
+        self.equivalencies = equivalencies if equivalencies is not None else []
+        samples = np.array([0.0, 1.0, 1000.0])
+        converted = (samples * from_unit).to_value(to_unit, equivalencies=self.equivalencies)
+        self.offset = float(converted[0])
+        self.scale = float(converted[1] - converted[0])
+        if not np.isclose(self.offset + self.scale * samples[2], converted[2], rtol=1e-12, atol=0):
+            raise ValueError(f"conversion from {from_unit} to {to_unit} isn't affine")
+
+    def convert_values(self, values):
+        """
+        args:
+        :values: float array-like in `from_unit`
+        return: float array in `to_unit`
+        """
+        converted = np.multiply(values, self.scale, dtype=np.float64)
+        if self.offset:
+            converted += self.offset
+        return converted
+
+    def __call__(self, q):
+        """
+        Drop-in replacement for q.to(to_unit). Plain arrays are taken to be in `from_unit`
+        """
+        if isinstance(q, u.Quantity):
+            q = q.value if q.unit == self.from_unit else q.to_value(self.from_unit, equivalencies=self.equivalencies)
+        return self.convert_values(q) << self.to_unit
+
+
+def astropy_converter(to_unit, equivalencies=None):
+    """
+    Converter going through astropy, for conversions AffineConverter doesn't handle
+    """
+    return lambda q: q.to(to_unit, equivalencies=equivalencies if equivalencies is not None else [])
+
+
+def build_converter(from_unit, to_unit, equivalencies=None):
+    """
+    return: an AffineConverter from `from_unit` to `to_unit` when possible, otherwise a converter using astropy,
+    which raises when it's called if the units are incompatible
+    """
+    try:
+        return AffineConverter(from_unit, to_unit, equivalencies)
+    except ValueError:
+        return astropy_converter(to_unit, equivalencies)
+
+
 METRIC_TO_IMPERIAL = {
-    u.m: lambda q: q.to(imperial.inch),
-    u.mm: lambda q: q.to(imperial.inch),
-    u.deg_C: lambda q: q.to(imperial.deg_F, equivalencies=u.temperature()),
-    u.K: lambda q: q.to(imperial.deg_F, equivalencies=u.temperature()),
-    u.kg / u.m**2: lambda q: q.to(imperial.pound / imperial.ft ** 2),
-    u.m / u.s: lambda q: q.to(imperial.mile / u.hour),
-    u.m**3 / u.s: lambda q: q.to(imperial.yard**3 / u.s)
+    u.m: build_converter(u.m, imperial.inch),
+    u.mm: build_converter(u.mm, imperial.inch),
+    u.deg_C: build_converter(u.deg_C, imperial.deg_F, u.temperature()),
+    u.K: build_converter(u.K, imperial.deg_F, u.temperature()),
+    u.kg / u.m**2: build_converter(u.kg / u.m**2, imperial.pound / imperial.ft ** 2),
+    u.m / u.s: build_converter(u.m / u.s, imperial.mile / u.hour),
+    u.m**3 / u.s: build_converter(u.m**3 / u.s, imperial.yard**3 / u.s)
 
 }
 
 IMPERIAL_TO_METRIC = {
-    imperial.inch: lambda q: q.to(u.mm),
-    imperial.deg_F: lambda q: q.to(u.deg_C, equivalencies=u.temperature()),
-    imperial.pound / imperial.ft ** 2: lambda q: q.to(u.kg / u.m**2),
-    imperial.mile / u.hour: lambda q: q.to(u.m / u.s),
-    imperial.yard**3 / u.s: lambda q: q.to(u.m**3 / u.s)
+    imperial.inch: build_converter(imperial.inch, u.mm),
+    imperial.deg_F: build_converter(imperial.deg_F, u.deg_C, u.temperature()),
+    imperial.pound / imperial.ft ** 2: build_converter(imperial.pound / imperial.ft ** 2, u.kg / u.m**2),
+    imperial.mile / u.hour: build_converter(imperial.mile / u.hour, u.m / u.s),
+    imperial.yard**3 / u.s: build_converter(imperial.yard**3 / u.s, u.m**3 / u.s)
 }
 
 STATION_ALIASES_TO_COLUMNS = {
@@ -148,27 +219,103 @@ def rounding_formula_temperature(str_val, converted_val, forced_precision=None):
     return round(converted_val, precision)
 
 
+def _float_array(values):
+    values = getattr(values, "values", values)
+    return np.asarray(getattr(values, "value", values), dtype=np.float64)
+
+
+def _round_by_decimals(values, decimals):
+    """
+    Python's round with a number of decimals per value. Each distinct number of decimals is rounded in one
+    np.round pass, which scales by a power of ten first, so the few values landing about halfway between
+    two roundings are rounded again by Python, which rounds the exact binary value. Arrays of any shape
+    are rounded as flat arrays, and `decimals` must have the shape of `values`
+    """
+    shape = np.shape(values)
+    values, decimals = np.ravel(values), np.ravel(decimals)
+    rounded = np.empty_like(values)
+    for n in np.unique(decimals):
+        selected = decimals == n
+        rounded[selected] = np.round(values[selected], int(n))
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * np.power(10.0, decimals)
+        distance_to_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+        near_half = distance_to_half <= np.abs(scaled) * 4 * np.finfo(np.float64).eps
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), int(decimals[i]))
+    return rounded.reshape(shape)
+
+
+def str_precision(str_vals):
+    """
+    Number of decimals each value was written with, the way the rounding formulas count them from `str_val`
+    Args:
+        `str_vals` (iterable of str) the original values as strings
+    Returns:
+        int array
+    """
+    str_vals = getattr(str_vals, "values", str_vals)
+    return np.fromiter(
+        (len(str(val).partition(".")[2].partition(".")[0]) for val in str_vals), dtype=np.int64, count=len(str_vals))
+
+
+def round_converted(original_vals, converted_vals, precision):
+    """
+    Array version of `rounding_formula`, with identical results for every value
+    Args:
+        `original_vals` (array-like of float) the original values
+        `converted_vals` (array-like of float) the values after unit conversion has been applied
+        `precision` (int or array-like of int) decimals of each original value, e.g. from `str_precision`
+    Returns:
+        float array of the converted values rounded to an appropriate number of decimals
+    """
+    original = _float_array(original_vals)
+    converted = _float_array(converted_vals)
+    precision = np.broadcast_to(np.asarray(precision, dtype=np.int64), converted.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = -np.floor(np.log10(converted / original))
+    # NaNs and conversions with a non positive or infinite factor can't be rounded, like in rounding_formula.
+    # Where rounding_formula raises instead, e.g. for an original 0 converted to a non zero value, this gives NaN
+    roundable = np.isfinite(exponent)
+    rounded = np.full(converted.shape, np.nan)
+    rounded[roundable] = _round_by_decimals(
+        converted[roundable], precision[roundable] + exponent[roundable].astype(np.int64))
+    rounded[converted == 0] = 0.0
+    return rounded
+
+
+def round_converted_temperature(converted_vals, precision):
+    """
+    Array version of `rounding_formula_temperature`
+    Args:
+        `converted_vals` (array-like of float) the values after unit conversion has been applied
+        `precision` (int or array-like of int) decimals of each original value, e.g. from `str_precision`
+    Returns:
+        float array of the converted values rounded to their original precision
+    """
+    converted = _float_array(converted_vals)
+    precision = np.broadcast_to(np.asarray(precision, dtype=np.int64), converted.shape)
+    return _round_by_decimals(converted, precision)
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
 def get_unit_converter_no_aliases(original_units, desired_units):
     """
     Get an astropy Unit corresponding to `original_units` (str) and a converter (function) to convert to
     `desired_units` (str) Raises `UnitError` when unable to parse `desired_units` as Unit
     """
-    degF = u.def_unit("degF", imperial.deg_F)
-    degC = u.def_unit("degC", u.deg_C)
-    with u.imperial.enable(), u.add_enabled_units([degF, degC]):
+    with u.imperial.enable(), u.add_enabled_units([DEGF, DEGC]):
         dweather_unit = u.Unit(original_units)
         try:
             to_unit = u.Unit(desired_units)
         except ValueError:
             raise UnitError("Specified unit not recognized")
-        if to_unit.physical_type == "temperature":
-            def converter(q): return q.to(
-                to_unit, equivalencies=u.temperature())
-        else:
-            def converter(q): return q.to(to_unit)
+        equivalencies = u.temperature() if to_unit.physical_type == "temperature" else None
+        converter = build_converter(dweather_unit, to_unit, equivalencies)
     return converter, dweather_unit
 
 
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
 def get_to_units(desired_units):
     """
     Get the astropy Unit corresponding to `desired_units`. Raises `UnitError` when unable to parse
@@ -182,6 +329,7 @@ def get_to_units(desired_units):
     return to_unit
 
 
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
 def get_unit_converter(str_u, use_imperial_units):
     with u.imperial.enable():
         dweather_unit = UNIT_ALIASES[str_u] if str_u in UNIT_ALIASES else u.Unit(
@@ -0,0 +1,291 @@
+"""
+Random access to the members of archives stored on IPFS.
+
+Gridded releases pack every cell of a latitude row into one archive, but a query only needs one
+member. Since archives are immutable, the offsets of their members can be indexed once and cached,
+after which a member can be fetched with a single ranged read.
+
+The reads of each function are written as a generator of transport calls, which `run_reads` runs
+against a Transport, so that dweather_client.aio can run the same logic over an AsyncTransport.
+"""
+import json
+import struct
+import tarfile
+import zipfile
+import zlib
+from io import BytesIO
+
+from dweather_client.cache_utils import ContentCache
+
+TAR_INDEX_CACHE = ContentCache("tar_index", max_memory_bytes=16 * 1024 ** 2, max_disk_bytes=128 * 1024 ** 2)
+ZIP_INDEX_CACHE = ContentCache("zip_index", max_memory_bytes=16 * 1024 ** 2, max_disk_bytes=128 * 1024 ** 2)
+
+# the end of central directory record is 22 bytes plus a comment of up to 64KiB. Reading this much of
+# the tail usually gets the whole central directory along with it
+ZIP_TAIL_SIZE = 64 * 1024
+# slack read past a member's local header, which may have a different extra field than its central entry
+ZIP_LOCAL_HEADER_SLACK = 256
+
+_EOCD = struct.Struct("<4s4H2LH")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_CENTRAL_ENTRY = struct.Struct("<4s4B4HL2L5H2L")
+_LOCAL_HEADER = struct.Struct("<4s5HL2L2H")
+_ZIP64_EXTRA_ID = 0x0001
+_READABLE_METHODS = {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+
+
+def build_tar_index(tar_bytes):
+    """
+    args:
+    :tar_bytes: content of a tar file
+    return: dict of member name: [offset of the member's data, size of the member's data]
+    """
+    with tarfile.open(fileobj=BytesIO(tar_bytes)) as tar:
+        return {member.name: [member.offset_data, member.size] for member in tar.getmembers() if member.isfile()}
+
+
+def run_reads(reads, transport):
+    """
+    Run the transport calls requested by a generator of reads, such as tar_members_reads
+    args:
+    :reads: generator yielding (name of a Transport method, *args) tuples, which is sent the result of each call
+    :transport: Transport to make the calls with
+    return: the value returned by `reads`
+    """
+    try:
+        request = next(reads)
+        while True:
+            method, *args = request
+            request = reads.send(getattr(transport, method)(*args))
+    except StopIteration as stop:
+        return stop.value
+
+
+def get_tar_member(transport, tar_path, member):
+    """
+    Get one member of a tar. The first time a tar is seen it is downloaded whole to build its member
+    index, which is cached so that later calls only transfer the bytes of the requested member
+    args:
+    :transport: Transport to read the tar with
+    :tar_path: IPFS path of the tar
+    :member: name of the member to get
+    return: content of the member as bytes
+    raises: KeyError if the tar has no such member
+    """
+    return get_tar_members(transport, tar_path, [member])[member]
+
+
+def get_tar_members(transport, tar_path, members):
+    """
+    Get several members of a tar with a single transfer: the whole tar the first time it is seen, after which
+    its cached index is used to only transfer the span of bytes holding the requested members
+    args:
+    :transport: Transport to read the tar with
+    :tar_path: IPFS path of the tar
+    :members: names of the members to get
+    return: dict of member name: content as bytes. Members the tar doesn't have are left out
+    """
+    return run_reads(tar_members_reads(tar_path, members), transport)
+
+
+def tar_members_reads(tar_path, members):
+    """
+    Reads of get_tar_members, see run_reads
+    """
+    index_text = TAR_INDEX_CACHE.get(tar_path)
+    if index_text is None:
+        tar_bytes = yield "cat", tar_path
+        index = build_tar_index(tar_bytes)
+        TAR_INDEX_CACHE.put(tar_path, json.dumps(index))
+        span_start = 0
+    else:
+        index = json.loads(index_text)
+        tar_bytes = None
+    found = [member for member in members if member in index]
+    if not found:
+        return {}
+    if tar_bytes is None:
+        span_start = min(index[member][0] for member in found)
+        span_end = max(sum(index[member]) for member in found)
+        tar_bytes = yield "cat_range", tar_path, span_start, span_end - span_start
+    ret = {}
+    for member in found:
+        offset, size = index[member]
+        ret[member] = tar_bytes[offset - span_start:offset - span_start + size]
+    return ret
+
+
+def _parse_zip64_extra(extra, file_size, compress_size, header_offset):
+    """
+    Replace the 32 bit fields of a central directory entry that overflowed with their ZIP64 values
+    """
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<2H", extra, pos)
+        if header_id == _ZIP64_EXTRA_ID:
+            values = iter(struct.unpack_from(f"<{length // 8}Q", extra, pos + 4))
+            if file_size == 0xFFFFFFFF:
+                file_size = next(values)
+            if compress_size == 0xFFFFFFFF:
+                compress_size = next(values)
+            if header_offset == 0xFFFFFFFF:
+                header_offset = next(values)
+            break
+        pos += 4 + length
+    return file_size, compress_size, header_offset
+
+
+def parse_central_directory(cd_bytes):
+    """
+    args:
+    :cd_bytes: central directory of a zip file
+    return: dict of member name: [local header offset, compressed size, size, compression method, flags, CRC-32]
+    """
+    index = {}
+    pos = 0
+    while pos + _CENTRAL_ENTRY.size <= len(cd_bytes):
+        (signature, _, _, _, _, flags, method, _, _, crc, compress_size, file_size, name_len, extra_len,
+         comment_len, _, _, _, header_offset) = _CENTRAL_ENTRY.unpack_from(cd_bytes, pos)
+        if signature != b"PK\x01\x02":
+            raise zipfile.BadZipFile("Bad central directory entry")
+        pos += _CENTRAL_ENTRY.size
+        name = cd_bytes[pos:pos + name_len].decode("utf-8" if flags & 0x800 else "cp437")
+        extra = cd_bytes[pos + name_len:pos + name_len + extra_len]
+        file_size, compress_size, header_offset = _parse_zip64_extra(
+            extra, file_size, compress_size, header_offset)
+        index[name] = [header_offset, compress_size, file_size, method, flags, crc]
+        pos += name_len + extra_len + comment_len
+    return index
+
+
+def build_zip_index(transport, zip_path):
+    """
+    Read the central directory of a zip with ranged reads of its tail
+    args:
+    :transport: Transport to read the zip with
+    :zip_path: IPFS path of the zip
+    return: dict of member name: [local header offset, compressed size, size, compression method, flags, CRC-32]
+    """
+    return run_reads(zip_index_reads(zip_path), transport)
+
+
+def zip_index_reads(zip_path):
+    """
+    Reads of build_zip_index, see run_reads
+    """
+    size = yield "size", zip_path
+    tail_start = max(0, size - ZIP_TAIL_SIZE)
+    tail = yield "cat_range", zip_path, tail_start, size - tail_start
+    eocd_pos = tail.rfind(b"PK\x05\x06")
+    if eocd_pos < 0 or eocd_pos + _EOCD.size > len(tail):
+        raise zipfile.BadZipFile(f"{zip_path} is not a zip file")
+    _, _, _, _, n_entries, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, eocd_pos)
+    locator_pos = eocd_pos - _ZIP64_LOCATOR.size
+    if locator_pos >= 0 and tail[locator_pos:locator_pos + 4] == b"PK\x06\x07":
+        _, _, zip64_eocd_offset, _ = _ZIP64_LOCATOR.unpack_from(tail, locator_pos)
+        if zip64_eocd_offset >= tail_start:
+            zip64_eocd = tail[zip64_eocd_offset - tail_start:zip64_eocd_offset - tail_start + _ZIP64_EOCD.size]
+        else:
+            zip64_eocd = yield "cat_range", zip_path, zip64_eocd_offset, _ZIP64_EOCD.size
+        cd_size, cd_offset = _ZIP64_EOCD.unpack(zip64_eocd)[-2:]
+    if cd_offset >= tail_start:
+        cd_bytes = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        cd_bytes = yield "cat_range", zip_path, cd_offset, cd_size
+    return parse_central_directory(cd_bytes)
+
+
+def get_zip_index(transport, zip_path):
+    """
+    return: the member index of the zip at `zip_path`, see build_zip_index. Cached by path
+    """
+    return run_reads(cached_zip_index_reads(zip_path), transport)
+
+
+def cached_zip_index_reads(zip_path):
+    """
+    Reads of get_zip_index, see run_reads
+    """
+    index_text = ZIP_INDEX_CACHE.get(zip_path)
+    if index_text is None:
+        index = yield from zip_index_reads(zip_path)
+        ZIP_INDEX_CACHE.put(zip_path, json.dumps(index))
+        return index
+    return json.loads(index_text)
+
+
+def get_zip_member(transport, zip_path, member):
+    """
+    Get one member of a zip, only transferring its central directory (once, after which it's cached)
+    and the bytes of the requested member
+    args:
+    :transport: Transport to read the zip with
+    :zip_path: IPFS path of the zip
+    :member: name of the member to get
+    return: content of the member as bytes
+    raises: KeyError if the zip has no such member
+    """
+    return get_zip_members(transport, zip_path, [member])[member]
+
+
+def get_zip_members(transport, zip_path, members):
+    """
+    Get several members of a zip, transferring its central directory (once, after which it's cached) and
+    then the span of bytes holding all of the requested members in a single ranged read
+    args:
+    :transport: Transport to read the zip with
+    :zip_path: IPFS path of the zip
+    :members: names of the members to get
+    return: dict of member name: content as bytes. Members the zip doesn't have are left out
+    """
+    return run_reads(zip_members_reads(zip_path, members), transport)
+
+
+def zip_members_reads(zip_path, members):
+    """
+    Reads of get_zip_members, see run_reads
+    """
+    index = yield from cached_zip_index_reads(zip_path)
+    ret = {}
+    spans = {}
+    for member in members:
+        if member not in index:
+            continue
+        header_offset, compress_size, _, method, flags, _ = index[member]
+        if method not in _READABLE_METHODS or flags & 0x1:
+            # encrypted members and exotic compression methods are left to zipfile
+            zip_bytes = yield "cat", zip_path
+            with zipfile.ZipFile(BytesIO(zip_bytes)) as zi:
+                ret[member] = zi.read(member)
+            continue
+        name_len = len(member.encode("utf-8" if flags & 0x800 else "cp437"))
+        spans[member] = (
+            header_offset, header_offset + _LOCAL_HEADER.size + name_len + ZIP_LOCAL_HEADER_SLACK + compress_size)
+    if not spans:
+        return ret
+    span_start = min(start for start, _ in spans.values())
+    span_end = max(end for _, end in spans.values())
+    chunk = yield "cat_range", zip_path, span_start, span_end - span_start
+    for member, (start, _) in spans.items():
+        ret[member] = yield from _extract_zip_member(zip_path, member, index[member], chunk, start - span_start)
+    return ret
+
+
+def _extract_zip_member(zip_path, member, entry, chunk, pos):
+    """
+    Decompress a member from `chunk`, which holds the zip's bytes from its local header at `pos` onwards
+    """
+    header_offset, compress_size, file_size, method, _, crc = entry
+    signature, _, _, _, _, _, _, _, _, local_name_len, local_extra_len = _LOCAL_HEADER.unpack_from(chunk, pos)
+    if signature != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {member} in {zip_path}")
+    data_start = _LOCAL_HEADER.size + local_name_len + local_extra_len
+    data = chunk[pos + data_start:pos + data_start + compress_size]
+    if len(data) < compress_size:
+        data = yield "cat_range", zip_path, header_offset + data_start, compress_size
+    if method == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    if len(data) != file_size or zlib.crc32(data) != crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {member} in {zip_path}")
+    return data
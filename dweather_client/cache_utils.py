@@ -0,0 +1,199 @@
+"""
+Caches for immutable content pulled from IPFS.
+
+Anything addressed by a CID can never change, so entries never have to be invalidated, only
+evicted once the cache outgrows its bounds. Values are stored as text so that every read hands
+back a fresh object that callers are free to mutate.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get(
+    "DWEATHER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dweather_client"))
+
+
+class ContentCache:
+    """
+    Two level cache for text keyed by IPFS path. The first level is an in-process LRU bounded by
+    entry count and total size, the second a directory on disk bounded by total size, which is
+    shared between processes and survives restarts.
+    """
+
+    def __init__(self, namespace, max_entries=2048, max_memory_bytes=64 * 1024 ** 2,
+                 max_disk_bytes=512 * 1024 ** 2, cache_dir=None, persist=True):
+        """
+        args:
+        :namespace: name of the subdirectory of the cache dir this cache writes to
+        :max_entries: max number of entries held in memory
+        :max_memory_bytes: max number of characters held in memory
+        :max_disk_bytes: max number of bytes held on disk, oldest files are evicted first
+        :cache_dir: base directory for the on-disk cache. If None, uses CACHE_DIR
+        :persist: if False, only the in-process cache is used
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.persist = persist
+        self._cache_dir = cache_dir
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.RLock()
+
+    @property
+    def directory(self):
+        base = self._cache_dir if self._cache_dir is not None else CACHE_DIR
+        if not (self.persist and base):
+            return None
+        return os.path.join(base, self.namespace)
+
+    def _file_path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        """
+        return: cached text for `key`, or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        text = self._read_disk(key)
+        if text is not None:
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        """
+        Store `text` under `key` in memory and, if persisting, on disk
+        """
+        self._remember(key, text)
+        self._write_disk(key, text)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        return: cached text for `key`, calling `fetch()` to get and store it on a miss
+        """
+        text = self.get(key)
+        if text is None:
+            text = fetch()
+            self.put(key, text)
+        return text
+
+    def clear(self):
+        """
+        Drop every entry, both in memory and on disk
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            directory = self.directory
+            if directory and os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+            self._disk_bytes = None
+
+    def _remember(self, key, text):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            if len(text) > self.max_memory_bytes:
+                return
+            self._memory[key] = text
+            self._memory_bytes += len(text)
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self._file_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            # bump the mtime so that eviction drops the least recently used files first
+            os.utime(path)
+        except (OSError, UnicodeDecodeError):
+            return None
+        return text
+
+    def _write_disk(self, key, text):
+        if self.directory is None:
+            return
+        path = self._file_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError:
+            # the on-disk level is best effort, e.g. a read-only home directory shouldn't break queries
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._directory_size()
+            else:
+                self._disk_bytes += len(text.encode("utf-8"))
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _directory_size(self):
+        total = 0
+        for entry in os.scandir(self.directory):
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict_disk(self):
+        """
+        Remove the least recently used files until the directory is back under 90% of its bound
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+METADATA_CACHE = ContentCache("metadata")
+
+
+def get_cached_json(cache, key, fetch_text):
+    """
+    args:
+    :cache: ContentCache to look in
+    :key: IPFS path identifying the content
+    :fetch_text: function returning the content as a JSON str, called on a miss
+    return:
+        parsed JSON content
+    """
+    return json.loads(cache.get_or_fetch(key, fetch_text))
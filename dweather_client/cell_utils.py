@@ -0,0 +1,134 @@
+"""
+Vectorized decoding of gridded cell files.
+
+Cells are text files holding one line per year of comma separated values. Rather than being converted one
+at a time, the values are split into a NumPy bytes array and parsed in one pass, which also yields the
+number of decimals each value was written with, as needed to round after unit conversions.
+"""
+import numpy as np
+import pandas as pd
+
+VALUE = "value"
+PRECISION = "precision"
+
+
+def decode_cell(data, missing_value=None, dtype=np.float64):
+    """
+    Parse cell text into numbers. Values are delimited by commas and newlines, and are split exactly like
+    str.split would, so empty values (e.g. PRISM's) and a trailing newline each produce a NaN
+    args:
+    :data: cell text as bytes
+    :missing_value: the dataset's "no observation" value from its metadata. A str is matched against the
+    text of each value, anything else against the parsed number
+    :dtype: float dtype of the returned values
+    return: tuple of (values array with NaN for missing values, int8 array of the number of decimals of each value)
+    """
+    # a fixed width bytes array of the values, e.g. dtype S6, so that they can be compared and parsed at once
+    tokens = np.array(data.replace(b"\n", b",").split(b","))
+    present = tokens != b""
+    if isinstance(missing_value, str):
+        present &= tokens != missing_value.encode("utf-8")
+    values = np.full(len(tokens), np.nan, dtype=dtype)
+    values[present] = tokens[present].astype(dtype)
+    if missing_value is not None and not isinstance(missing_value, str):
+        values[values == missing_value] = np.nan
+
+    dots = np.char.find(tokens, b".")
+    precision = np.where(dots >= 0, np.char.str_len(tokens) - dots - 1, 0).astype(np.int8)
+    return values, precision
+
+
+def mask_missing(values, missing_value):
+    """
+    Set the values equal to a dataset's numeric "no observation" value to NaN, in place
+    args:
+    :values: float array
+    :missing_value: the dataset's missing value from its metadata, as a number or str. Non numeric strs are ignored
+    return: values
+    """
+    try:
+        missing_number = float(missing_value)
+    except (TypeError, ValueError):
+        return values
+    values[values == missing_number] = np.nan
+    return values
+
+
+def decimal_places(values, max_decimals=4):
+    """
+    Number of decimals each value is printed with by str once rounded to `max_decimals`, which is at least one
+    args:
+    :values: float array, already rounded to `max_decimals`
+    return: int8 array
+    """
+    precision = np.full(len(values), max_decimals, dtype=np.int8)
+    for decimals in range(max_decimals - 1, 0, -1):
+        precision[np.round(values, decimals) == values] = decimals
+    return precision
+
+
+def cell_frame(values, precision, index):
+    """
+    return: pd.DataFrame of the values and their number of decimals, the form gridded datasets return data in
+    """
+    return pd.DataFrame({
+        VALUE: np.asarray(values, dtype=np.float64), PRECISION: np.asarray(precision, dtype=np.int8)}, index=index)
+
+
+def decode_lines(lines, starts, step, missing_value=None):
+    """
+    Decode lines of values where each line starts at its own time, e.g. one line per calendar year
+    args:
+    :lines: list of bytes lines of comma separated values
+    :starts: date or datetime of the first value of each line
+    :step: datetime.timedelta between consecutive values of a line
+    :missing_value: see decode_cell
+    return: pd.DataFrame as returned by cell_frame, with a DatetimeIndex
+    """
+    if not lines:
+        return cell_frame([], [], pd.DatetimeIndex([]))
+    values, precision = decode_cell(b",".join(lines), missing_value)
+    counts = np.array([line.count(b",") + 1 for line in lines])
+    line_starts = np.repeat(np.array(starts, dtype="datetime64[ns]"), counts)
+    offsets = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return cell_frame(values, precision, pd.DatetimeIndex(line_starts + offsets * np.timedelta64(step)))
+
+
+def stack_cells(frames, shape):
+    """
+    Align the data of many cells on one time index and stack it into arrays
+    args:
+    :frames: list of pd.DataFrame as returned by cell_frame, or None for cells without data, in C order of `shape`
+    :shape: tuple of the grid's dimensions, e.g. (number of lats, number of lons)
+    return: tuple of the union of the frames' indexes, float array of shape (times, *shape) with NaN where a cell
+    has no value, and int8 array of the same shape with the number of decimals of each value
+    """
+    present = [frame for frame in frames if frame is not None]
+    index = present[0].index if present else pd.Index([])
+    for frame in present[1:]:
+        if not frame.index.equals(index):
+            index = index.union(frame.index)
+    values = np.full((len(index), len(frames)), np.nan)
+    precision = np.zeros((len(index), len(frames)), dtype=np.int8)
+    for i, frame in enumerate(frames):
+        if frame is None:
+            continue
+        rows = slice(None) if frame.index.equals(index) else index.get_indexer(frame.index)
+        values[rows, i] = frame[VALUE].to_numpy()
+        precision[rows, i] = frame[PRECISION].to_numpy()
+    shape = (len(index),) + tuple(shape)
+    return index, values.reshape(shape), precision.reshape(shape)
+
+
+def time_index(first, periods, dataset):
+    """
+    Index for `periods` consecutive values of a daily or hourly dataset
+    args:
+    :first: datetime of the first value
+    :periods: number of values
+    :dataset: name of the dataset, which says whether it's daily or hourly
+    return: array of datetime.date for daily datasets, pd.DatetimeIndex for hourly ones
+    """
+    if "daily" in dataset:
+        return pd.date_range(first, periods=periods, freq=pd.Timedelta(days=1)).date
+    return pd.date_range(first, periods=periods, freq=pd.Timedelta(hours=1))
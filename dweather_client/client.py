@@ -5,25 +5,26 @@ from curses import meta
 from astropy.units import equivalencies
 from dweather_client.http_queries import get_metadata, get_heads, get_stations_metadata
 from dweather_client.aliases_and_units import \
-    get_to_units, lookup_station_alias, STATION_UNITS_LOOKUP as SUL, get_unit_converter, get_unit_converter_no_aliases, rounding_formula, rounding_formula_temperature, BOM_UNITS, UNIT_ALIASES
-from dweather_client.struct_utils import tupleify, convert_nans_to_none
+    get_to_units, lookup_station_alias, STATION_UNITS_LOOKUP as SUL, get_unit_converter, get_unit_converter_no_aliases, rounding_formula, rounding_formula_temperature, round_converted, round_converted_temperature, str_precision, BOM_UNITS, UNIT_ALIASES
+from dweather_client.struct_utils import tupleify, convert_nans_to_none, check_result_format, format_history, \
+    region_to_xarray
+from dweather_client.cell_utils import VALUE, PRECISION
 import datetime
-import pytz
 import csv
 import json
 import inspect
 import numpy as np
 import pandas as pd
 from astropy import units as u
-from timezonefinder import TimezoneFinder
+from dweather_client.timezone_utils import to_local_time
 from dweather_client import gridded_datasets
 from dweather_client.storms_datasets import IbtracsDataset, AtcfDataset, SimulatedStormsDataset
 from dweather_client.ipfs_queries import AustraliaBomStations, CedaBiomass, CmeStationsDataset, DutchStationsDataset, DwdStationsDataset, DwdHourlyStationsDataset, GlobalHourlyStationsDataset, JapanStations, StationDataset, EauFranceDataset,\
     YieldDatasets, FsaIrrigationDataset, AemoPowerDataset, AemoGasDataset, AesoPowerDataset, ForecastDataset, AfrDataset, DroughtMonitor, CwvStations, SpeedwellStations, TeleconnectionsDataset, CsvStationDataset, StationForecastDataset, SapStations
 from dweather_client.slice_utils import DateRangeRetriever, has_changed
 from dweather_client.ipfs_errors import *
+from dweather_client.transports import NOT_FOUND_ERRORS, TIMEOUT_ERRORS
 from io import StringIO
-import ipfshttpclient
 
 # Gets all gridded dataset classes from the datasets module
 GRIDDED_DATASETS = {
@@ -53,7 +54,10 @@ def get_gridcell_history(
         desired_units=None,
         convert_to_local_time=True,
         as_of=None,
-        ipfs_timeout=None):
+        ipfs_timeout=None,
+        start=None,
+        end=None,
+        result_format="dict"):
     """
     Get the historical timeseries data for a gridded dataset in a dictionary
 
@@ -68,7 +72,16 @@ def get_gridcell_history(
 
     use_imperial_units is set to True by default, but if set to False,
     will get the appropriate metric unit from aliases_and_units
+
+    start and end are optional dates or datetimes bounding the returned history (inclusive,
+    a date includes the whole day, hourly sets are bounded in UTC). Releases and years of
+    data outside of the window are never fetched or decoded
+
+    result_format is "dict" by default. "series" returns a pd.Series of floats with the unit in
+    its attrs["unit"] instead, and "quantity" a tuple of one Quantity array and a pd.DatetimeIndex,
+    which avoids creating a Python object per value for long histories
     """
+    check_result_format(result_format)
     try:
         metadata = get_metadata(get_heads()[dataset])
     except KeyError:
@@ -82,36 +95,180 @@ def get_gridcell_history(
         converter, dweather_unit = get_unit_converter_no_aliases(
             metadata["unit of measurement"], desired_units)
 
-    # get dataset-specific "no observation" value
-    missing_value = metadata["missing value"]
     try:
         with GRIDDED_DATASETS[dataset](as_of=as_of, ipfs_timeout=ipfs_timeout) as dataset_obj:
             try:
-                (lat, lon), str_resp_series = dataset_obj.get_data(lat, lon)
-            except (ipfshttpclient.exceptions.ErrorResponse, ipfshttpclient.exceptions.TimeoutError, KeyError, FileNotFoundError) as e:
+                (lat, lon), resp_frame = dataset_obj.get_data(lat, lon, start=start, end=end)
+            except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError) as e:
+                raise CoordinateNotFoundError("Invalid coordinate for dataset")
+    except KeyError:
+        raise DatasetError("No such dataset in dClimate")
+
+    return format_gridcell_history(
+        resp_frame, lat, lon, metadata, converter, dweather_unit, desired_units, convert_to_local_time,
+        result_format, also_return_metadata, also_return_snapped_coordinates)
+
+
+def get_gridcell_histories(
+        points,
+        dataset,
+        also_return_snapped_coordinates=False,
+        also_return_metadata=False,
+        use_imperial_units=True,
+        desired_units=None,
+        convert_to_local_time=True,
+        as_of=None,
+        ipfs_timeout=None,
+        start=None,
+        end=None,
+        result_format="dict"):
+    """
+    Get the historical timeseries data of many points of a gridded dataset at once
+
+    Takes an iterable of (lat, lon) tuples and returns a dict of (lat, lon): the result
+    get_gridcell_history would return for that point, or None for points the dataset has
+    no data for. All other arguments are the same as get_gridcell_history's.
+
+    The dataset's metadata and linked list are only looked up once, and points falling in the
+    same grid cell share their download. For most gridded sets the cells stored in the same
+    archive are also fetched together, with a single transfer per release
+    """
+    check_result_format(result_format)
+    points = [tuple(point) for point in points]
+    try:
+        metadata = get_metadata(get_heads()[dataset])
+    except KeyError:
+        raise DatasetError("No such dataset in dClimate")
+
+    if not desired_units:
+        converter, dweather_unit = get_unit_converter(
+            metadata["unit of measurement"], use_imperial_units)
+    else:
+        converter, dweather_unit = get_unit_converter_no_aliases(
+            metadata["unit of measurement"], desired_units)
+
+    try:
+        with GRIDDED_DATASETS[dataset](as_of=as_of, ipfs_timeout=ipfs_timeout) as dataset_obj:
+            try:
+                responses = dataset_obj.get_data_many(points, start=start, end=end)
+            except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError):
                 raise CoordinateNotFoundError("Invalid coordinate for dataset")
     except KeyError:
         raise DatasetError("No such dataset in dClimate")
 
+    return format_gridcell_histories(
+        responses, metadata, converter, dweather_unit, desired_units, convert_to_local_time, result_format,
+        also_return_metadata, also_return_snapped_coordinates)
+
+
+def format_gridcell_histories(responses, metadata, *args):
+    """
+    Convert the responses of a dataset's get_data_many into the result of get_gridcell_histories.
+    The other args are those of format_gridcell_history after `metadata`
+    """
+    results = {}
+    for point, response in responses.items():
+        if response is None:
+            results[point] = None
+            continue
+        (lat, lon), resp_frame = response
+        results[point] = format_gridcell_history(resp_frame, lat, lon, metadata, *args)
+    return results
+
+
+def get_gridcell_region(
+        dataset,
+        min_lat,
+        min_lon,
+        max_lat,
+        max_lon,
+        start=None,
+        end=None,
+        use_imperial_units=True,
+        desired_units=None,
+        as_of=None,
+        ipfs_timeout=None,
+        as_xarray=False):
+    """
+    Get the historical data of every grid cell of a gridded dataset inside a bounding box
+
+    Returns a tuple of a Quantity array of shape (times, lats, lons) with NaN for missing
+    values, the pd.Index of its dates/datetimes, and the arrays of its lats and lons. With
+    as_xarray=True, which requires xarray, returns an xarray.DataArray instead.
+
+    Bounds are inclusive and in conventional lat/lon. Cells sharing an archive are fetched
+    together, so each latitude's archive is read once per release. Hourly sets are left in UTC,
+    as a region can span many timezones. Units work like in get_gridcell_history
+    """
+    try:
+        metadata = get_metadata(get_heads()[dataset])
+    except KeyError:
+        raise DatasetError("No such dataset in dClimate")
+
+    if not desired_units:
+        converter, dweather_unit = get_unit_converter(
+            metadata["unit of measurement"], use_imperial_units)
+    else:
+        converter, dweather_unit = get_unit_converter_no_aliases(
+            metadata["unit of measurement"], desired_units)
+
+    try:
+        with GRIDDED_DATASETS[dataset](as_of=as_of, ipfs_timeout=ipfs_timeout) as dataset_obj:
+            if not hasattr(dataset_obj, "get_region"):
+                raise DatasetError("Region queries aren't supported for this dataset")
+            try:
+                times, lats, lons, values, precision = dataset_obj.get_region(
+                    min_lat, min_lon, max_lat, max_lon, start=start, end=end)
+            except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError):
+                raise CoordinateNotFoundError("Invalid region for dataset")
+    except KeyError:
+        raise DatasetError("No such dataset in dClimate")
+
+    cube = values * dweather_unit
+    if converter is not None:
+        try:
+            converted = converter(cube)
+        except ValueError:
+            raise UnitError("Specified unit is incompatible with original")
+        if desired_units is not None:
+            if converted.unit.physical_type == "temperature":
+                rounded = round_converted_temperature(converted, precision)
+            else:
+                rounded = round_converted(cube, converted, precision)
+            cube = rounded * converted.unit
+        else:
+            cube = converted
+
+    if as_xarray:
+        return region_to_xarray(cube, times, lats, lons)
+    return cube, times, lats, lons
+
+
+def format_gridcell_history(
+        resp_frame,
+        lat,
+        lon,
+        metadata,
+        converter,
+        dweather_unit,
+        desired_units,
+        convert_to_local_time,
+        result_format,
+        also_return_metadata,
+        also_return_snapped_coordinates):
+    """
+    Convert the data a gridded dataset returned for a cell into the result of get_gridcell_history,
+    whose arguments these are. lat/lon are the snapped coordinates of the cell, and converter/dweather_unit
+    come from get_unit_converter or get_unit_converter_no_aliases
+    """
     # try a timezone-based transformation on the times in case we're using an hourly set.
     if convert_to_local_time:
-        try:
-            tf = TimezoneFinder()
-            local_tz = pytz.timezone(tf.timezone_at(lng=lon, lat=lat))
-            str_resp_series = str_resp_series.tz_localize(
-                "UTC").tz_convert(local_tz)
-        # datetime.date (daily sets) doesn't work with this, only datetime.datetime (hourly sets)
-        except (AttributeError, TypeError):
-            pass
-
-    if type(missing_value) == str:
-        resp_series = str_resp_series.replace(
-            missing_value, np.NaN).astype(float)
-    else:
-        str_resp_series.loc[str_resp_series.astype(
-            float) == missing_value] = np.NaN
-        resp_series = str_resp_series.astype(float)
+        # daily sets, indexed by datetime.date, are left as is
+        resp_frame = to_local_time(resp_frame, lat, lon)
 
+    # datasets have already replaced their "no observation" values with NaN
+    resp_series = resp_frame[VALUE]
+    precision = resp_frame[PRECISION].values
     resp_series = resp_series * dweather_unit
     if converter is not None:
         try:
@@ -121,11 +278,11 @@ def get_gridcell_history(
             raise UnitError("Specified unit is incompatible with original")
         if desired_units is not None:
             if converted_resp_series.values.unit.physical_type == "temperature":
-                rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-                    str_resp_series, converted_resp_series)
+                rounded_resp_array = round_converted_temperature(
+                    converted_resp_series, precision)
             else:
-                rounded_resp_array = np.vectorize(rounding_formula)(
-                    str_resp_series, resp_series, converted_resp_series)
+                rounded_resp_array = round_converted(
+                    resp_series, converted_resp_series, precision)
             final_resp_series = pd.Series(
                 rounded_resp_array * converted_resp_series.values.unit, index=resp_series.index)
         else:
@@ -133,8 +290,12 @@ def get_gridcell_history(
     else:
         final_resp_series = resp_series
 
-    result = {k: convert_nans_to_none(
-        v) for k, v in final_resp_series.to_dict().items()}
+    if result_format == "dict":
+        result = {k: convert_nans_to_none(
+            v) for k, v in final_resp_series.to_dict().items()}
+    else:
+        # for "quantity", metadata and snapped coordinates follow the array and index in the tuple
+        result = format_history(final_resp_series, dweather_unit, result_format)
 
     if also_return_metadata:
         result = tupleify(result) + ({"metadata": metadata},)
@@ -178,34 +339,53 @@ def get_forecast(
         converter, dweather_unit = get_unit_converter_no_aliases(
             metadata["unit of measurement"], desired_units)
 
-    if 'gfs' in dataset:
-        interval = 1
-        con_to_cpc = True
-    elif 'ecmwf' in dataset:
-        interval = 3
-        con_to_cpc = False
+    interval, con_to_cpc = get_forecast_interval(dataset)
 
     try:
         with ForecastDataset(dataset, interval=interval, con_to_cpc=con_to_cpc, ipfs_timeout=ipfs_timeout) as dataset_obj:
-            (lat, lon), str_resp_series = dataset_obj.get_data(
+            (lat, lon), resp_frame = dataset_obj.get_data(
                 lat, lon, forecast_date)
     except KeyError:
         raise DatasetError("No such dataset in dClimate")
-    except (ipfshttpclient.exceptions.ErrorResponse, ipfshttpclient.exceptions.TimeoutError, KeyError, FileNotFoundError) as e:
+    except (*NOT_FOUND_ERRORS, *TIMEOUT_ERRORS, KeyError, FileNotFoundError) as e:
         raise CoordinateNotFoundError("Invalid coordinate for dataset")
 
+    return format_forecast(
+        resp_frame, lat, lon, metadata, converter, dweather_unit, desired_units, convert_to_local_time,
+        also_return_metadata, also_return_snapped_coordinates)
+
+
+def get_forecast_interval(dataset):
+    """
+    Hours between the steps of a forecast dataset, and whether its grid uses CPC's lat/lon convention
+    """
+    if 'gfs' in dataset:
+        return 1, True
+    elif 'ecmwf' in dataset:
+        return 3, False
+    raise DatasetError("No such dataset in dClimate")
+
+
+def format_forecast(
+        resp_frame,
+        lat,
+        lon,
+        metadata,
+        converter,
+        dweather_unit,
+        desired_units,
+        convert_to_local_time,
+        also_return_metadata,
+        also_return_snapped_coordinates):
+    """
+    Convert the frame returned by ForecastDataset.get_data into the result of get_forecast
+    """
     if convert_to_local_time:
-        try:
-            tf = TimezoneFinder()
-            local_tz = pytz.timezone(tf.timezone_at(lng=lon, lat=lat))
-            str_resp_series = str_resp_series.tz_localize(
-                "UTC").tz_convert(local_tz)
-        # datetime.date (daily sets) doesn't work with this, only datetime.datetime (hourly sets)
-        except (AttributeError, TypeError):
-            pass
-
-    missing_value = ""
-    resp_series = str_resp_series.replace(missing_value, np.NaN).astype(float)
+        # daily sets, indexed by datetime.date, are left as is
+        resp_frame = to_local_time(resp_frame, lat, lon)
+
+    resp_series = resp_frame[VALUE]
+    precision = resp_frame[PRECISION].values
     resp_series = resp_series * dweather_unit
 
     if converter is not None:
@@ -216,11 +396,11 @@ def get_forecast(
             raise UnitError("Specified unit is incompatible with original")
         if desired_units is not None:
             if converted_resp_series.values.unit.physical_type == "temperature":
-                rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-                    str_resp_series, converted_resp_series)
+                rounded_resp_array = round_converted_temperature(
+                    converted_resp_series, precision)
             else:
-                rounded_resp_array = np.vectorize(rounding_formula)(
-                    str_resp_series, resp_series, converted_resp_series)
+                rounded_resp_array = round_converted(
+                    resp_series, converted_resp_series, precision)
             final_resp_series = pd.Series(
                 rounded_resp_array * converted_resp_series.values.unit, index=resp_series.index)
         else:
@@ -268,14 +448,7 @@ def get_tropical_storms(
         in addition, the function's args must contain either all members of one of the above tuples, or none
         i.e., if function is given args containing some but not all of the members of one of the above tuples, raise ValueError
     """
-    if ((radius is not None) or (lat is not None) or (lon is not None)) \
-            and ((radius is None) or (lat is None) or (lon is None)):
-        raise ValueError("Invalid args")
-    if ((min_lat is not None) or (min_lon is not None) or (max_lat is not None) or (max_lon is not None)) \
-            and ((min_lat is None) or (min_lon is None) or (max_lat is None) or (max_lon is None)):
-        raise ValueError("Invalid args")
-    if radius and min_lat:
-        raise ValueError("Invalid args")
+    storm_kwargs = get_storm_kwargs(radius, lat, lon, min_lat, min_lon, max_lat, max_lon, as_of)
 
     # Shift to context manager (cm) approach
     # Establish cm in first if statement, use it as a context manager in the second
@@ -289,12 +462,29 @@ def get_tropical_storms(
         raise ValueError("Invalid source")
 
     with cm as storm_getter:
-        if radius:
-            return storm_getter.get_data(basin, radius=radius, lat=lat, lon=lon, as_of=as_of)
-        elif min_lat:
-            return storm_getter.get_data(basin, min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon, as_of=as_of)
-        else:
-            return storm_getter.get_data(basin, as_of=as_of)
+        return storm_getter.get_data(basin, **storm_kwargs)
+
+
+def get_storm_kwargs(radius, lat, lon, min_lat, min_lon, max_lat, max_lon, as_of):
+    """
+    Check the subsetting args of get_tropical_storms
+    return: the kwargs of the storm datasets' get_data
+    """
+    if ((radius is not None) or (lat is not None) or (lon is not None)) \
+            and ((radius is None) or (lat is None) or (lon is None)):
+        raise ValueError("Invalid args")
+    if ((min_lat is not None) or (min_lon is not None) or (max_lat is not None) or (max_lon is not None)) \
+            and ((min_lat is None) or (min_lon is None) or (max_lat is None) or (max_lon is None)):
+        raise ValueError("Invalid args")
+    if radius and min_lat:
+        raise ValueError("Invalid args")
+
+    if radius:
+        return {"radius": radius, "lat": lat, "lon": lon, "as_of": as_of}
+    elif min_lat:
+        return {"min_lat": min_lat, "min_lon": min_lon, "max_lat": max_lat, "max_lon": max_lon, "as_of": as_of}
+    else:
+        return {"as_of": as_of}
 
 
 def get_station_history(
@@ -332,6 +522,7 @@ def get_station_history(
     aliases.
 
     """
+    to_unit = None
     if desired_units:
         to_unit = get_to_units(desired_units)
     try:
@@ -339,8 +530,17 @@ def get_station_history(
             csv_text = dataset_obj.get_data(station_id)
     except KeyError:
         raise DatasetError("No such dataset in dClimate")
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
+    return format_station_history(csv_text, weather_variable, use_imperial_units, to_unit)
+
+
+def format_station_history(csv_text, weather_variable, use_imperial_units=True, to_unit=None):
+    """
+    Convert the csv returned by StationDataset.get_data into the result of get_station_history
+    args:
+    :to_unit: astropy Unit to convert the values to, see get_to_units, instead of imperial or metric
+    """
     column = lookup_station_alias(weather_variable)
     history = {}
     reader = csv.reader(csv_text.split('\n'))
@@ -359,7 +559,7 @@ def get_station_history(
             continue
         datapoint = SUL[column]['vectorize'](float(row[data_col]))
 
-        if desired_units:
+        if to_unit is not None:
             try:
                 if to_unit.physical_type == "temperature":
                     converted = datapoint.to(
@@ -387,7 +587,7 @@ def get_cme_station_history(station_id, weather_variable, use_imperial_units=Tru
             csv_text = dataset_obj.get_data(station_id)
     except KeyError:
         raise DatasetError("No such dataset in dClimate")
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
     metadata = get_metadata(get_heads()["cme_temperature_stations-daily"])
     unit = metadata["stations"][station_id]
@@ -433,8 +633,11 @@ def get_cme_station_history(station_id, weather_variable, use_imperial_units=Tru
     return history
 
 
-def get_hourly_station_history(dataset, station_id, weather_variable, use_imperial_units=True, desired_units=None, ipfs_timeout=None):
-
+def get_hourly_station_history(dataset, station_id, weather_variable, use_imperial_units=True, desired_units=None, ipfs_timeout=None, result_format="dict"):
+    """
+    result_format is "dict" by default, see get_gridcell_history for the array based formats
+    """
+    check_result_format(result_format)
     # Get original units from metadata
     original_units = None
     metadata = get_metadata(get_heads()[dataset])
@@ -454,7 +657,7 @@ def get_hourly_station_history(dataset, station_id, weather_variable, use_imperi
                 csv_text = dataset_obj.get_data(station_id, weather_variable)
         else:
             raise DatasetError("No such dataset in dClimate")
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
     df = pd.read_csv(StringIO(csv_text))
     str_resp_series = df[weather_variable].astype(str)
@@ -474,8 +677,8 @@ def get_hourly_station_history(dataset, station_id, weather_variable, use_imperi
         except ValueError:
             raise UnitError("Specified unit is incompatible with original")
         if desired_units is not None:
-            rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-                str_resp_series, converted_resp_series)
+            rounded_resp_array = round_converted_temperature(
+                converted_resp_series, str_precision(str_resp_series))
             final_resp_series = pd.Series(
                 rounded_resp_array * converted_resp_series.values.unit, index=df.index)
         else:
@@ -483,12 +686,14 @@ def get_hourly_station_history(dataset, station_id, weather_variable, use_imperi
     else:
         final_resp_series = pd.Series(
             df[weather_variable].values*dweather_unit, index=df.index)
+    if result_format != "dict":
+        return format_history(final_resp_series, dweather_unit, result_format)
     result = {datetime.datetime.fromisoformat(k): convert_nans_to_none(
         v) for k, v in final_resp_series.to_dict().items()}
     return result
 
 
-def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_units=True, desired_units=None, ipfs_timeout=None):
+def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_units=True, desired_units=None, ipfs_timeout=None, result_format="dict"):
     """
     This is almost an exact copy of get_hourly_station_history
 
@@ -496,7 +701,10 @@ def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_
     instead of the others here in client. That list currently stands at:
 
     -  inmet_brazil-hourly
+
+    result_format is "dict" by default, see get_gridcell_history for the array based formats
     """
+    check_result_format(result_format)
     # Get original units from metadata
     original_units = None
     metadata = get_metadata(get_heads()[dataset])
@@ -558,7 +766,7 @@ def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_
                     station_id, weather_variable)
         else:
             raise DatasetError("No such dataset in dClimate")
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
 
     # concat together all retrieved station csv texts
@@ -581,8 +789,8 @@ def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_
         except ValueError:
             raise UnitError("Specified unit is incompatible with original")
         if desired_units is not None:
-            rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-                str_resp_series, converted_resp_series)
+            rounded_resp_array = round_converted_temperature(
+                converted_resp_series, str_precision(str_resp_series))
             final_resp_series = pd.Series(
                 rounded_resp_array * converted_resp_series.values.unit, index=df.index)
         else:
@@ -590,6 +798,8 @@ def get_csv_station_history(dataset, station_id, weather_variable, use_imperial_
     else:
         final_resp_series = pd.Series(
             df[column_name].values*dweather_unit, index=df.index)
+    if result_format != "dict":
+        return format_history(final_resp_series, dweather_unit, result_format)
     result = {datetime.datetime.fromisoformat(k): convert_nans_to_none(
         v) for k, v in final_resp_series.to_dict().items()}
     return result
@@ -619,7 +829,7 @@ def get_station_forecast_history(dataset, station_id, forecast_date, desired_uni
                     history[datetime.datetime.strptime(
                         row[date_col], "%Y-%m-%d").date()] = row[data_col]
             return history
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
 
 
@@ -642,7 +852,7 @@ def get_european_station_history(dataset, station_id, weather_variable, use_impe
             csv_text = dataset_obj.get_data(station_id)
     except KeyError:
         raise DatasetError("No such dataset in dClimate")
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
     metadata = get_metadata(get_heads()[dataset])
 
@@ -715,7 +925,7 @@ def get_yield_history(commodity, state, county, dataset="sco-yearly", ipfs_timeo
     try:
         with YieldDatasets(dataset, ipfs_timeout=ipfs_timeout) as dataset_obj:
             return dataset_obj.get_data(commodity, state, county)
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise ValueError("Invalid commodity/state/county code combination")
 
 
@@ -729,7 +939,7 @@ def get_irrigation_data(commodity, ipfs_timeout=None):
     try:
         with FsaIrrigationDataset(ipfs_timeout=ipfs_timeout) as dataset_obj:
             return dataset_obj.get_data(commodity)
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise ValueError("Invalid commodity code")
 
 
@@ -749,8 +959,8 @@ def get_japan_station_history(station_name, desired_units=None, as_of=None, ipfs
         resp_series = resp_series * dweather_unit
         converted_resp_series = pd.Series(
             converter(resp_series.values), resp_series.index)
-        rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-            str_resp_series, converted_resp_series)
+        rounded_resp_array = round_converted_temperature(
+            converted_resp_series, str_precision(str_resp_series))
         final_resp_series = pd.Series(
             rounded_resp_array * converted_resp_series.values.unit, index=resp_series.index)
         return final_resp_series.to_dict()
@@ -805,8 +1015,8 @@ def get_australia_station_history(station_name, weather_variable, desired_units=
         resp_series = resp_series * dweather_unit
         converted_resp_series = pd.Series(
             converter(resp_series.values), resp_series.index)
-        rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-            str_resp_series, converted_resp_series)
+        rounded_resp_array = round_converted_temperature(
+            converted_resp_series, str_precision(str_resp_series))
         final_resp_series = pd.Series(
             rounded_resp_array * converted_resp_series.values.unit, index=resp_series.index)
         return final_resp_series.to_dict()
@@ -845,7 +1055,7 @@ def get_drought_monitor_history(state, county, ipfs_timeout=None):
     try:
         with DroughtMonitor(ipfs_timeout=ipfs_timeout) as dataset_obj:
             return dataset_obj.get_data(state, county)
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise ValueError("Invalid state/county combo")
 
 
@@ -862,7 +1072,7 @@ def get_ceda_biomass(year, lat, lon, unit, ipfs_timeout=None):
     try:
         with CedaBiomass(ipfs_timeout=ipfs_timeout) as dataset_obj:
             return dataset_obj.get_data(year, lat, lon, unit)
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise ValueError("Invalid paramaters with which to get biomass data")
 
 
@@ -908,11 +1118,16 @@ def get_teleconnections_history(weather_variable, ipfs_timeout=None):
         return history
 
 
-def get_eaufrance_history(station, weather_variable, use_imperial_units=False, desired_units=None, ipfs_timeout=None):
+def get_eaufrance_history(station, weather_variable, use_imperial_units=False, desired_units=None, ipfs_timeout=None, result_format="dict"):
+    """
+    result_format is "dict" by default, see get_gridcell_history for the array based formats
+    """
+    check_result_format(result_format)
     try:
         with EauFranceDataset(ipfs_timeout=ipfs_timeout) as dataset_obj:
             csv_text = dataset_obj.get_data(station)
             df = pd.read_csv(StringIO(csv_text))
+            str_resp_series = df[weather_variable].astype(str)
             df = df.set_index("DATE")
             original_units = "m^3/s"
             if desired_units:
@@ -929,8 +1144,8 @@ def get_eaufrance_history(station, weather_variable, use_imperial_units=False, d
                     raise UnitError(
                         f"Specified unit is incompatible with original, original units are {original_units} and requested units are {desired_units}")
                 if desired_units is not None:
-                    rounded_resp_array = np.vectorize(rounding_formula_temperature)(
-                        str_resp_series, converted_resp_series)
+                    rounded_resp_array = round_converted_temperature(
+                        converted_resp_series, str_precision(str_resp_series))
                     final_resp_series = pd.Series(
                         rounded_resp_array * converted_resp_series.values.unit, index=df.index)
                 else:
@@ -938,8 +1153,10 @@ def get_eaufrance_history(station, weather_variable, use_imperial_units=False, d
             else:
                 final_resp_series = pd.Series(
                     df[weather_variable].values*dweather_unit, index=df.index)
+            if result_format != "dict":
+                return format_history(final_resp_series, dweather_unit, result_format)
             result = {datetime.date.fromisoformat(k): convert_nans_to_none(
                 v) for k, v in final_resp_series.to_dict().items()}
         return result
-    except ipfshttpclient.exceptions.ErrorResponse:
+    except NOT_FOUND_ERRORS:
         raise StationNotFoundError("Invalid station ID for dataset")
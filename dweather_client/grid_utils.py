@@ -188,6 +188,22 @@ def conventional_lat_lon_to_cpc(lat, lon):
         return lat, lon
 
 
+def grid_axis(low, high, origin, resolution, precision=3):
+    """
+    Coordinates of a dataset's grid lying between two bounds, inclusive.
+
+    return: np.array of floats, origin + k * resolution rounded to `precision`
+    args:
+        low, high = bounds of the axis, float
+        origin = any coordinate of the grid, e.g. the start of the metadata's latitude or longitude range
+        resolution = metadata resolution, float
+    """
+    # allow for floating point error on bounds that are themselves grid points
+    first = int(np.ceil((low - origin) / resolution - 1e-9))
+    last = int(np.floor((high - origin) / resolution + 1e-9))
+    return np.round(origin + np.arange(first, last + 1) * resolution, precision)
+
+
 def snap_to_grid(lat, lon, metadata):
     """ 
     Find the nearest valid (lat,lon) for a given metadata file and arbitrary
@@ -3,10 +3,28 @@ Queries associated with the https protocol option.
 """
 import os, pickle, math, requests, datetime, io, gzip, json, logging, csv, tarfile
 from collections import Counter, deque
+from requests.adapters import HTTPAdapter
 from dweather_client.ipfs_errors import *
+from dweather_client.cache_utils import METADATA_CACHE, get_cached_json
 
 GATEWAY_URL = 'https://gateway.arbolmarket.com'
 
+def pooled_session(pool_size=10):
+    """
+    Make a requests.Session that keeps up to pool_size connections per host alive between requests.
+    Args:
+        pool_size (int): max number of connections kept open to each host
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+SESSION = pooled_session()
+
 def get_heads(url=GATEWAY_URL):
     """
     Get heads.json for a given IPFS gateway.
@@ -23,13 +41,14 @@ def get_heads(url=GATEWAY_URL):
         }
     """
     hashes_url = url + "/climate/hashes/heads.json"
-    r = requests.get(hashes_url)
+    r = SESSION.get(hashes_url)
     r.raise_for_status()
     return r.json()
 
 def get_metadata(hash_str, url=GATEWAY_URL):
     """
-    Get the metadata file for a given hash.
+    Get the metadata file for a given hash. Metadata is cached by hash, in memory and on disk,
+    since the content behind a hash can never change.
     Args:
         url (str): the url of the IPFS server
         hash_str (str): the hash of the ipfs dataset
@@ -55,10 +74,13 @@ def get_metadata(hash_str, url=GATEWAY_URL):
             'year delimiter': '\n'
         }
     """
+    return get_cached_json(METADATA_CACHE, hash_str, lambda: _fetch_metadata_text(hash_str, url))
+
+def _fetch_metadata_text(hash_str, url):
     metadata_url = "%s/ipfs/%s/metadata.json" % (url, hash_str)
-    r = requests.get(metadata_url)
+    r = SESSION.get(metadata_url)
     r.raise_for_status()
-    return r.json()
+    return r.text
 
 def get_stations_metadata(hash_str, url=GATEWAY_URL):
     """
@@ -68,7 +90,7 @@ def get_stations_metadata(hash_str, url=GATEWAY_URL):
         hash_str (str): the hash of the ipfs dataset
     """
     stations_url = "%s/ipfs/%s/stations.json" % (url, hash_str)
-    r = requests.get(stations_url)
+    r = SESSION.get(stations_url)
     r.raise_for_status()
     return r.json()
 
@@ -83,7 +105,7 @@ def get_hash_cell(hash_str, coord_str, url=GATEWAY_URL):
         The contents of the file as a string
     """
     dataset_url = '%s/ipfs/%s/%s' % (url, hash_str, coord_str)
-    r = requests.get(dataset_url)
+    r = SESSION.get(dataset_url)
     r.raise_for_status()
     return r.text
 
@@ -99,7 +121,7 @@ def get_zipped_hash_cell(hash_str, coord_str, url=GATEWAY_URL):
         the contents of the file as a string
     """
     dataset_url = '%s/ipfs/%s/%s.gz' % (url, hash_str, coord_str)
-    r = requests.get(dataset_url)
+    r = SESSION.get(dataset_url)
     r.raise_for_status()
     with gzip.GzipFile(fileobj=io.BytesIO(r.content)) as zip_data:
         return zip_data.read().decode("utf-8")
@@ -152,14 +174,14 @@ def get_station_csv(station_id, station_dataset="ghcnd-imputed-daily", url=GATEW
     all_hashes = get_heads()
     dataset_hash = all_hashes[station_dataset]
     dataset_url = "%s/ipfs/%s/%s.csv.gz" % (url, dataset_hash, str(station_id))
-    r = requests.get(dataset_url)
+    r = SESSION.get(dataset_url)
     r.raise_for_status()
     with gzip.GzipFile(fileobj=io.BytesIO(r.content)) as zip_data:
         return zip_data.read().decode("utf-8")
 
 def get_hurricane_release_dict(release_hash, url=GATEWAY_URL):
     url = "%s/ipfs/%s/history.json.gz" % (url, release_hash)
-    resp = requests.get(url)
+    resp = SESSION.get(url)
     resp.raise_for_status()
     with gzip.GzipFile(fileobj=io.BytesIO(resp.content)) as zip_data:
         return json.loads(zip_data.read().decode("utf-8"))
@@ -36,4 +36,8 @@ class DateOutOfRangeError(IPFSError):
 
 class UnitError(IPFSError):
     """Unrecognized unit, or specified unit incompatible with original"""
-    pass
\ No newline at end of file
+    pass
+
+class ContentNotFoundError(IPFSError):
+    """The requested IPFS path does not exist on the transport"""
+    pass
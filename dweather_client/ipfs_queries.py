@@ -4,25 +4,45 @@ Queries associated with the ipfs protocol option.
 
 from abc import ABC, abstractmethod
 from collections import deque
-import ipfshttpclient
+from concurrent.futures import ThreadPoolExecutor
 import json
 import datetime
-import os
-import tarfile
 import gzip
-import pickle
-import zipfile
 from dweather_client.ipfs_errors import *
-from dweather_client.grid_utils import conventional_lat_lon_to_cpc, cpc_lat_lon_to_conventional
-from dweather_client.struct_utils import find_closest_lat_lon
+from dweather_client.grid_utils import conventional_lat_lon_to_cpc, cpc_lat_lon_to_conventional, grid_axis
+from dweather_client.struct_utils import merge_releases
 from dweather_client.http_queries import get_heads
+from dweather_client.cache_utils import METADATA_CACHE, get_cached_json
+from dweather_client.manifest_utils import get_manifest
+from dweather_client.timeseries_utils import window_bounds, overlaps_window, trim_to_window
+from dweather_client.archive_utils import get_tar_member, get_tar_members, get_zip_member, get_zip_members
+from dweather_client.stream_utils import open_stream, iter_lines
+from dweather_client.cell_utils import decode_cell, decode_lines, cell_frame, time_index, mask_missing, decimal_places, \
+    stack_cells, VALUE
+from dweather_client.transports import IpfsApiTransport, get_default_transport, NOT_FOUND_ERRORS
+from dweather_client.rtma_utils import get_rtma_index, CHUNK_SIZE
+import numpy as np
 import pandas as pd
-from array import array
 from io import BytesIO
 
 
 METADATA_FILE = "metadata.json"
-GATEWAY_IPFS_ID = "/ip4/134.122.126.13/tcp/4001/p2p/12D3KooWM8nN6VbUka1NeuKnu9xcKC56D17ApAVRDyfYNytzUsqG"
+# releases of a linked list fetched at once by default, see IpfsDataset.fetch_releases
+DEFAULT_MAX_WORKERS = 8
+
+
+def generated_by(record, as_of):
+    """
+    args:
+    :record: manifest record of a release
+    :as_of: optional datetime
+    return: whether the release was generated by `as_of`, always True if `as_of` is None
+    """
+    if not as_of:
+        return True
+    if record["time generated"] is None:
+        raise KeyError("metadata has no time generated key")
+    return datetime.datetime.fromisoformat(record["time generated"]) <= as_of
 
 
 class IpfsDataset(ABC):
@@ -37,21 +57,30 @@ class IpfsDataset(ABC):
         """
         pass
 
-    def __init__(self, as_of=None, ipfs_timeout=None):
+    def __init__(self, as_of=None, ipfs_timeout=None, transport=None, max_workers=None):
         """
         args:
         :ipfs_timeout: Time IPFS should wait for response before throwing exception. If None, will assume that
         code is running in an environment containing all datasets (such as gateway)
+        :transport: Transport to read content with. If None, uses the default set with
+        transports.set_default_transport, falling back to the local IPFS daemon
+        :max_workers: number of releases fetched at once, defaults to DEFAULT_MAX_WORKERS. 1 fetches them one by one
         """
+        self.max_workers = DEFAULT_MAX_WORKERS if max_workers is None else max_workers
         self.on_gateway = not ipfs_timeout
-        self.ipfs = ipfshttpclient.connect(timeout=ipfs_timeout, session=True)
+        if transport is None:
+            transport = get_default_transport()
+        # only close transports created for this dataset, a shared one may still be in use
+        self._owns_transport = transport is None
+        self.transport = IpfsApiTransport(timeout=ipfs_timeout) if transport is None else transport
         self.as_of = as_of
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.ipfs.close()
+        if self._owns_transport:
+            self.transport.close()
         if isinstance(exc_val, Exception):
             return False
         return True
@@ -63,21 +92,85 @@ class IpfsDataset(ABC):
         return:
             metadata as dict
         """
-        if not self.on_gateway:
-            self.ipfs._client.request('/swarm/connect', (GATEWAY_IPFS_ID,))
-        metadata = self.ipfs.cat(f"{h}/{METADATA_FILE}").decode('utf-8')
-        return json.loads(metadata)
+        return get_cached_json(METADATA_CACHE, h, lambda: self._fetch_metadata_text(h))
+
+    def _fetch_metadata_text(self, h):
+        return self.transport.cat(f"{h}/{METADATA_FILE}").decode('utf-8')
 
-    def get_file_object(self, f):
+    def get_file_object(self, f, stream=False):
         """
         args:
         :h: dClimate IPFS hash from which to get data. Must point to a file, not a directory
+        :stream: if True, the file is read from the transport as it is consumed instead of being
+        downloaded whole first
         return:
             content of file as file-like bytes object
         """
-        if not self.on_gateway:
-            self.ipfs._client.request('/swarm/connect', (GATEWAY_IPFS_ID,))
-        return BytesIO(self.ipfs.cat(f))
+        if stream:
+            return open_stream(self.transport.stream(f))
+        return BytesIO(self.transport.cat(f))
+
+    def get_tar_member(self, tar_path, member):
+        """
+        Reads a single member of a tar, using a cached index of the tar's members to only transfer
+        that member's bytes
+        args:
+        :tar_path: IPFS path of the tar
+        :member: name of the member to get
+        return:
+            content of the member as file-like bytes object
+        """
+        return BytesIO(get_tar_member(self.transport, tar_path, member))
+
+    def get_zip_member(self, zip_path, member):
+        """
+        Reads a single member of a zip, using ranged reads of its central directory, which is cached,
+        and of the member itself
+        args:
+        :zip_path: IPFS path of the zip
+        :member: name of the member to get
+        return:
+            content of the member as file-like bytes object
+        """
+        return BytesIO(get_zip_member(self.transport, zip_path, member))
+
+    def get_tar_members(self, tar_path, members):
+        """
+        Reads several members of a tar in a single transfer, see get_tar_member
+        args:
+        :tar_path: IPFS path of the tar
+        :members: names of the members to get
+        return:
+            dict of member name: content as file-like bytes object, without the members the tar doesn't have
+        """
+        return {member: BytesIO(content) for member, content in get_tar_members(self.transport, tar_path, members).items()}
+
+    def get_zip_members(self, zip_path, members):
+        """
+        Reads several members of a zip in a single ranged read, see get_zip_member
+        args:
+        :zip_path: IPFS path of the zip
+        :members: names of the members to get
+        return:
+            dict of member name: content as file-like bytes object, without the members the zip doesn't have
+        """
+        return {member: BytesIO(content) for member, content in get_zip_members(self.transport, zip_path, members).items()}
+
+    def get_manifest(self):
+        """
+        return: the persisted ReleaseManifest indexing this dataset's linked list
+        """
+        return get_manifest(self.dataset)
+
+    def iter_releases(self, head):
+        """
+        Iterates through the release records of a linked list, newest first. Only releases that
+        haven't been indexed in the dataset's manifest yet require a metadata fetch
+        args:
+        :head: ipfs hash of the directory at the head of the linked list
+        return: generator of manifest records
+        """
+        return self.get_manifest().iter_releases(head, self.get_metadata)
 
     def traverse_ll(self, head, as_of=None):
         """
@@ -86,33 +179,81 @@ class IpfsDataset(ABC):
         :head: ipfs hash of the directory at the head of the linked list
         return: deque containing all hashes in the linked list
         """
-        release_itr = head
         release_ll = deque()
-        while True:
-            metadata = self.get_metadata(release_itr)
-            if as_of:
-                date_generated = datetime.datetime.fromisoformat(
-                    metadata["time generated"])
-                if date_generated <= as_of:
-                    release_ll.appendleft(release_itr)
-            else:
-                release_ll.appendleft(release_itr)
-            try:
-                prev_release = metadata['previous hash']
-            except KeyError:
-                return release_ll
-            if prev_release is not None:
-                release_itr = prev_release
-            else:
-                return release_ll
+        for h, _ in self.iter_chain(head, as_of):
+            release_ll.appendleft(h)
+        return release_ll
+
+    def iter_chain(self, head, as_of=None):
+        """
+        Iterates through the hashes of a linked list as they're resolved, newest first
+        args:
+        :head: ipfs hash of the directory at the head of the linked list
+        :as_of: optional datetime, releases generated after it are skipped
+        return: generator of (hash, whether the release is the root) tuples
+        """
+        for record in self.iter_releases(head):
+            if generated_by(record, as_of):
+                yield record["hash"], record["previous hash"] is None
+
+    def fetch_releases(self, hashes, fetch, start=None, end=None):
+        """
+        Fetch and decode the releases of a linked list overlapping a window, up to `max_workers` at once.
+        Each release is decoded by the thread that downloaded it, as soon as its download completes
+        args:
+        :hashes: hashes of the releases in chain order, root first
+        :fetch: function of (date range, hash, whether the release is the root) returning the release's data
+        :start: optional start of the window as returned by window_bounds, releases ending before it are skipped
+        :end: optional end of the window as returned by window_bounds, releases starting after it are skipped
+        return: list of the data of the overlapping releases, in chain order
+        """
+        hashes = list(hashes)
+        if self.max_workers <= 1 or len(hashes) <= 1:
+            chunks = [self.fetch_release(h, i == 0, fetch, start, end) for i, h in enumerate(hashes)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(hashes))) as pool:
+                futures = [pool.submit(self.fetch_release, h, i == 0, fetch, start, end) for i, h in enumerate(hashes)]
+                chunks = [future.result() for future in futures]
+        return [chunk for chunk in chunks if chunk is not None]
+
+    def fetch_chain(self, head, fetch, start=None, end=None):
+        """
+        Pipelined version of fetch_releases over the dataset's linked list. Walking the list back from the head takes
+        one metadata fetch per release not in the manifest yet, so rather than waiting for the whole walk, each release's
+        data is scheduled for download as soon as the release is reached and downloads overlap with the rest of the walk
+        args:
+        :head: hash of the head of the linked list
+        see fetch_releases for the others
+        return: list of the data of the overlapping releases, in chain order
+        """
+        if self.max_workers <= 1:
+            return self.fetch_releases(self.get_hashes(head), fetch, start, end)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.fetch_release, h, is_root, fetch, start, end)
+                       for h, is_root in self.iter_chain(head, self.as_of)]
+            chunks = [future.result() for future in reversed(futures)]
+        return [chunk for chunk in chunks if chunk is not None]
+
+    def fetch_release(self, ipfs_hash, is_root, fetch, start=None, end=None):
+        """
+        Fetch and decode a release if it overlaps a window, see fetch_releases
+        return: the release's data, or None if it doesn't overlap the window
+        """
+        date_range = self.get_date_range_from_metadata(ipfs_hash)
+        if not overlaps_window(*date_range, start, end):
+            return None
+        return fetch(date_range, ipfs_hash, is_root)
 
     @abstractmethod
     def get_data(self, *args, **kwargs):
         """
         Exposed method that allows user to get data in the dataset. Args and return value will depend on whether
-        this is a gridded, station or storm dataset
+        this is a gridded, station or storm dataset. Subclasses get the dataset's current head from this base
+        implementation, and keep it and any other state of the query local to the call, so that a single
+        dataset object can serve queries from many threads at once
+        return: hash of the head of the dataset's linked list
         """
-        self.head = get_heads()[self.dataset]
+        return get_heads()[self.dataset]
 
 
 class GriddedDataset(IpfsDataset):
@@ -140,11 +281,13 @@ class GriddedDataset(IpfsDataset):
                          * resolution + min_lon, 3)
         return snap_lat, snap_lon
 
-    def get_hashes(self):
+    def get_hashes(self, head):
         """
+        args:
+        :head: hash of the head of the dataset's linked list
         return: list of all hashes in dataset
         """
-        hashes = self.traverse_ll(self.head, self.as_of)
+        hashes = self.traverse_ll(head, self.as_of)
         return list(hashes)
 
     def get_date_range_from_metadata(self, h):
@@ -153,200 +296,297 @@ class GriddedDataset(IpfsDataset):
         :h: hash for ipfs directory containing metadata
         return: list of [start_time, end_time]
         """
-        metadata = self.get_metadata(h)
-        str_dates = (metadata["date range"][0], metadata["date range"][1])
+        record = self.get_manifest().get(h)
+        if record is not None and record["date range"] is not None:
+            str_dates = record["date range"]
+        else:
+            metadata = self.get_metadata(h)
+            str_dates = (metadata["date range"][0], metadata["date range"][1])
         return [datetime.datetime.fromisoformat(dt) for dt in str_dates]
 
-    def get_weather_dict(self, date_range, ipfs_hash, is_root):
+    def get_weather_dict(self, date_range, ipfs_hash, is_root, tar_name, gzip_name, missing_value=None, start=None,
+                         end=None):
         """
-        Get a pd.Series of weather values for a given IPFS hash
+        Get the weather values for a given IPFS hash
         args:
         :date_range: time range that hash has data for
         :ipfs_hash: hash containing data
         :is_root: bool indicating whether this is the root node in the linked list
-        return: pd.Series with date or datetime index and weather values
+        :tar_name: name of the tar holding the cell in non-root releases
+        :gzip_name: name of the cell's gzipped file
+        :missing_value: the dataset's "no observation" value from its metadata, replaced by NaN
+        :start: optional datetime, yearly lines ending before it are skipped without being decoded
+        :end: optional datetime, decoding stops at the first yearly line starting after it
+        return: pd.DataFrame with date or datetime index, float `value` column with NaN for missing values
+        and int8 `precision` column holding the number of decimals each value was stored with
         """
         if not is_root:
             try:
-                with tarfile.open(fileobj=self.get_file_object(f"{ipfs_hash}/{self.tar_name}")) as tar:
-                    member = tar.getmember(self.gzip_name)
-                    with gzip.open(tar.extractfile(member)) as gz:
-                        cell_text = gz.read().decode('utf-8')
-            except ipfshttpclient.exceptions.ErrorResponse:
-                zip_file_name = self.tar_name[:-4] + '.zip'
-                with zipfile.ZipFile(self.get_file_object(f"{ipfs_hash}/{zip_file_name}")) as zi:
-                    with gzip.open(zi.open(self.gzip_name)) as gz:
-                        cell_text = gz.read().decode('utf-8')
+                gz_file = self.get_tar_member(f"{ipfs_hash}/{tar_name}", gzip_name)
+            except NOT_FOUND_ERRORS:
+                zip_file_name = tar_name[:-4] + '.zip'
+                gz_file = self.get_zip_member(f"{ipfs_hash}/{zip_file_name}", gzip_name)
         else:
-            with gzip.open(self.get_file_object(f"{ipfs_hash}/{self.gzip_name}")) as gz:
-                cell_text = gz.read().decode('utf-8')
+            # root cells hold the whole history of the dataset, so they're streamed and decompressed a year at a time
+            gz_file = self.get_file_object(f"{ipfs_hash}/{gzip_name}", stream=True)
+        return self.decode_weather_file(gz_file, date_range, missing_value, start, end)
 
+    def decode_weather_file(self, gz_file, date_range, missing_value=None, start=None, end=None):
+        """
+        Decode a gzipped cell file of a release, see get_weather_dict
+        args:
+        :gz_file: file-like object of the gzipped cell, closed once decoded
+        :date_range: time range that the release has data for
+        :missing_value: the dataset's "no observation" value from its metadata
+        return: pd.DataFrame as returned by get_weather_dict
+        """
+        start, end = window_bounds(start, end)
         day_itr = date_range[0]
-        weather_dict = {}
-        if "daily" in self.dataset:
-            for year_data in cell_text.split('\n'):
-                for day_data in year_data.split(','):
-                    weather_dict[day_itr.date()] = day_data
-                    day_itr = day_itr + datetime.timedelta(days=1)
-        elif "hourly" in self.dataset:
-            for year_data in cell_text.split('\n'):
-                for hour_data in year_data.split(','):
-                    weather_dict[day_itr] = hour_data
-                    day_itr = day_itr + datetime.timedelta(hours=1)
-        return weather_dict
-
-
-class CopernicusDataset(GriddedDataset):
+        first_kept, year_values, year_precisions = None, [], []
+        with gz_file, gzip.open(gz_file) as gz:
+            if "daily" in self.dataset:
+                step = datetime.timedelta(days=1)
+            elif "hourly" in self.dataset:
+                step = datetime.timedelta(hours=1)
+            else:
+                return cell_frame([], [], [])
+            # each year is parsed as it's streamed, so only one year of text is held at a time
+            for year_data in iter_lines(gz):
+                if end is not None and day_itr > end:
+                    break
+                year_end = day_itr + step * year_data.count(b',')
+                if start is not None and year_end < start:
+                    day_itr = year_end + step
+                    continue
+                if first_kept is None:
+                    first_kept = day_itr
+                values, precision = decode_cell(year_data, missing_value)
+                year_values.append(values)
+                year_precisions.append(precision)
+                day_itr = year_end + step
+        if not year_values:
+            return cell_frame([], [], [])
+        values, precision = np.concatenate(year_values), np.concatenate(year_precisions)
+        return cell_frame(values, precision, time_index(first_kept, len(values), self.dataset))
+
+
+class LatLonGriddedDataset(GriddedDataset):
+    """
+    Abstract class for gridded datasets whose cells are queried by lat/lon
+    """
+    def get_data_many(self, points, start=None, end=None):
+        """
+        Get the data of many points at once. Datasets that can share downloads between points override this,
+        by default each point is read on its own, with the head and metadata of the dataset looked up once
+        args:
+        :points: iterable of (lat, lon) tuples
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: dict of (lat, lon) point: the tuple get_data returns for it, or None if the dataset has no data there
+        """
+        head = super().get_data()
+        metadata = self.get_metadata(head)
+        ret = {}
+        for point in points:
+            try:
+                ret[point] = self.query_point(head, metadata, *point, start=start, end=end)
+            except (KeyError, FileNotFoundError, *NOT_FOUND_ERRORS):
+                ret[point] = None
+        return ret
+
+    @abstractmethod
+    def query_point(self, head, metadata, lat, lon, start=None, end=None):
+        """
+        Implementation of get_data, once the dataset's head and its metadata have been looked up, so that they
+        can be shared by the points of get_data_many
+        args:
+        :head: hash of the head of the dataset's linked list
+        :metadata: metadata of `head`
+        return: see get_data
+        """
+        pass
+
+
+class CopernicusDataset(LatLonGriddedDataset):
     """
     Abstract class for copernicus datasets, contains logic for reading binary files
     """
 
-    def get_data(self, lat, lon):
+    def get_data(self, lat, lon, start=None, end=None):
         """
         Copernicus datasets' method for getting data. Reads binary files named by long/lat
         args:
         :lat: float of latitude from which to get data
         :lon: float of longitude from which to get data
-        return: tuple of lat/lon snapped to copernicus grid, and weather data, which is pd.Series with date index
-        and str values corresponding to weather observations
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of lat/lon snapped to copernicus grid, and weather data, which is pd.DataFrame with date index
+        and `value`/`precision` columns, see GriddedDataset.get_weather_dict
         """
-        super().get_data()
-        first_metadata = self.get_metadata(self.head)
-        snapped_lat, snapped_lon = self.snap_to_grid(
-            float(lat), float(lon), first_metadata)
-        self.bin_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}"
-        self.zip_name = f"{snapped_lat:.3f}.zip"
-        ret_dict = {}
-        for i, h in enumerate(self.get_hashes()):
-            date_range = self.get_date_range_from_metadata(h)
-            weather_dict = self.get_copernicus_dict(date_range, h, i == 0)
-            ret_dict = {**ret_dict, **weather_dict}
-        return (float(snapped_lat), float(snapped_lon)), pd.Series(ret_dict).round(4).astype(str)
+        head = super().get_data()
+        return self.query_point(head, self.get_metadata(head), lat, lon, start, end)
 
-    def get_copernicus_dict(self, date_range, ipfs_hash, is_root):
-        """
-        Get a dict of weather values for a given IPFS hash
+    def query_point(self, head, metadata, lat, lon, start=None, end=None):
+        snapped_lat, snapped_lon = self.snap_to_grid(
+            float(lat), float(lon), metadata)
+        bin_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}"
+        zip_name = f"{snapped_lat:.3f}.zip"
+        missing_value = metadata.get("missing value")
+        start, end = window_bounds(start, end)
+        chunks = self.fetch_chain(
+            head, lambda date_range, h, is_root: self.get_copernicus_dict(
+                date_range, h, is_root, zip_name, bin_name, missing_value, start, end), start, end)
+        ret = merge_releases(chunks, cell_frame([], [], pd.DatetimeIndex([])))
+        # releases are merged on a DatetimeIndex, but like other daily datasets the result is keyed by date
+        ret.index = ret.index.date
+        return (float(snapped_lat), float(snapped_lon)), ret
+
+    def get_copernicus_dict(self, date_range, ipfs_hash, is_root, zip_name, bin_name, missing_value=None, start=None,
+                            end=None):
+        """
+        Get the weather values for a given IPFS hash
         args:
         :date_range: time range that hash has data for
         :ipfs_hash: hash containing data
         :is_root: bool indicating whether this is the root node in the linked list
-        return: dictionaey with date keys and weather values
+        :zip_name: name of the zip holding the cell in non-root releases
+        :bin_name: name of the cell's binary file
+        :missing_value: the dataset's "no observation" value from its metadata, replaced by NaN
+        :start: optional datetime, values before it aren't decoded
+        :end: optional datetime, values after it aren't decoded
+        return: pd.DataFrame with DatetimeIndex and `value`/`precision` columns. Values are rounded to 4 decimals
         """
         if is_root:
             data_bytes = self.get_file_object(
-                f"{ipfs_hash}/{self.bin_name}").read()
+                f"{ipfs_hash}/{bin_name}").read()
         else:
-            with zipfile.ZipFile(self.get_file_object(f"{ipfs_hash}/{self.zip_name}")) as zi:
-                data_bytes = zi.open(self.bin_name).read()
-        data_array = list(array("f", data_bytes))
-        index = [d.to_pydatetime().date()
-                 for d in pd.date_range(date_range[0], date_range[1])]
-        return dict(zip(index, data_array))
+            data_bytes = self.get_zip_member(f"{ipfs_hash}/{zip_name}", bin_name).read()
+        dates = pd.date_range(date_range[0], date_range[1])
+        first = 0 if start is None else dates.searchsorted(start)
+        last = len(dates) if end is None else dates.searchsorted(end, side="right")
+        # a view of the little endian floats in the window, only copied when widened to float64
+        values = np.frombuffer(data_bytes, dtype="<f4")[first:last].astype(np.float64).round(4)
+        index = dates[first:first + len(values)]
+        values = mask_missing(values[:len(index)], missing_value)
+        return cell_frame(values, decimal_places(values), index)
 
 
-class PrismGriddedDataset(GriddedDataset):
+class PrismGriddedDataset(LatLonGriddedDataset):
     """
     Abstract class from which all PRISM datasets inherit. Contains logic for overlapping date ranges
     that is unique to PRISM
     """
 
-    def get_data(self, lat, lon):
+    def get_data(self, lat, lon, start=None, end=None):
         """
-        PRISM datasets' method for getting data. Reverses the linked list so as to correctly prioritize displaying
-        more recent data
+        PRISM datasets' method for getting data. Releases overlap, so they are merged from oldest to newest
+        so as to correctly prioritize displaying more recent data
         args:
         :lat: float of latitude from which to get data
         :lon: float of longitude from which to get data
-        return: tuple of lat/lon snapped to PRISM grid, and weather data, which is pd.Series with date index
-        and str values corresponding to weather observations
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of lat/lon snapped to PRISM grid, and weather data, which is a pd.DataFrame with date index
+        and a float `value` column of weather observations alongside the `precision` they were recorded with
         """
-        super().get_data()
-        first_metadata = self.get_metadata(self.head)
+        head = super().get_data()
+        return self.query_point(head, self.get_metadata(head), lat, lon, start, end)
+
+    def query_point(self, head, metadata, lat, lon, start=None, end=None):
         snapped_lat, snapped_lon = self.snap_to_grid(
-            float(lat), float(lon), first_metadata)
-        self.tar_name = f"{snapped_lat:.3f}.tar"
-        self.gzip_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}.gz"
-        self.ret_dict = {}
-        for h in self.get_hashes()[::-1]:
-            self.update_prismc_dict(h)
-        return (float(snapped_lat), float(snapped_lon)), pd.Series(self.ret_dict)
-
-    def update_prismc_dict(self, ipfs_hash):
-        """
-        Updates self.ret_dict with data from a hash in the linked list. Written so as to never
-        overwrite newer data with older
+            float(lat), float(lon), metadata)
+        tar_name = f"{snapped_lat:.3f}.tar"
+        gzip_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}.gz"
+        start, end = window_bounds(start, end)
+        # releases are fetched concurrently but merged in chain order, so newer releases still win overlaps
+        chunks = self.fetch_chain(
+            head, lambda date_range, h, is_root: self.get_prism_frame(h, tar_name, gzip_name, start, end), start, end)
+        ret = merge_releases(chunks, cell_frame([], [], pd.DatetimeIndex([]))).sort_index()
+        ret[VALUE] = mask_missing(ret[VALUE].to_numpy(copy=True), metadata.get("missing value"))
+        ret.index = ret.index.date
+        return (float(snapped_lat), float(snapped_lon)), trim_to_window(ret, start, end)
+
+    def get_prism_frame(self, ipfs_hash, tar_name, gzip_name, start=None, end=None):
+        """
+        Gets the data of a hash in the linked list. Days left empty in the release are dropped, so that
+        they never overwrite older data when releases are merged
         args:
         :ipfs_hash: hash in linked list from which to get data
+        :tar_name: name of the tar holding the cell
+        :gzip_name: name of the cell's gzipped file
+        :start: optional datetime, years before it are skipped without being decoded
+        :end: optional datetime, years after it are skipped without being decoded
+        return: pd.DataFrame as returned by cell_frame, with a DatetimeIndex
         """
         try:
-            with tarfile.open(fileobj=self.get_file_object(f"{ipfs_hash}/{self.tar_name}")) as tar:
-                member = tar.getmember(self.gzip_name)
-                with gzip.open(tar.extractfile(member), "rb") as gz:
-                    for i, line in enumerate(gz):
-                        day_of_year = datetime.date(1981 + i, 1, 1)
-                        data_list = line.decode('utf-8').strip().split(',')
-                        for point in data_list:
-                            if (day_of_year not in self.ret_dict) and point:
-                                self.ret_dict[day_of_year] = point
-                            day_of_year += datetime.timedelta(days=1)
-
-        except ipfshttpclient.exceptions.ErrorResponse:
-            zip_file_name = self.tar_name[:-4] + '.zip'
-            with zipfile.ZipFile(self.get_file_object(f"{ipfs_hash}/{zip_file_name}")) as zi:
-                with gzip.open(zi.open(self.gzip_name), "rb") as gz:
-                    for i, line in enumerate(gz):
-                        day_of_year = datetime.date(1981 + i, 1, 1)
-                        data_list = line.decode('utf-8').strip().split(',')
-                        for point in data_list:
-                            if (day_of_year not in self.ret_dict) and point:
-                                self.ret_dict[day_of_year] = point
-                            day_of_year += datetime.timedelta(days=1)
-
-
-class RtmaGriddedDataset(GriddedDataset):
+            with gzip.open(self.get_tar_member(f"{ipfs_hash}/{tar_name}", gzip_name), "rb") as gz:
+                frame = self.decode_yearly_lines(gz, start, end)
+
+        except NOT_FOUND_ERRORS:
+            zip_file_name = tar_name[:-4] + '.zip'
+            with gzip.open(self.get_zip_member(f"{ipfs_hash}/{zip_file_name}", gzip_name), "rb") as gz:
+                frame = self.decode_yearly_lines(gz, start, end)
+        return frame[frame[VALUE].notna()]
+
+    def decode_yearly_lines(self, lines, start=None, end=None):
+        """
+        Decodes an iterable of yearly lines, the first of which starts on 1981-01-01
+        """
+        kept_lines, line_starts = [], []
+        for i, line in enumerate(lines):
+            year = 1981 + i
+            if start is not None and year < start.year:
+                continue
+            if end is not None and year > end.year:
+                break
+            kept_lines.append(line.strip())
+            line_starts.append(datetime.date(year, 1, 1))
+        return decode_lines(kept_lines, line_starts, datetime.timedelta(days=1))
+
+
+class RtmaGriddedDataset(LatLonGriddedDataset):
     """
     Abstract class from which RTMA datasets inherits. Contains custom logic for converting lat/lons to 
     RTMAs unique gridding system
     """
-    _etc_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "etc")
-    CHUNKS = os.path.join(_etc_dir, 'rtma_chunks.txt')
-    VALID_COORDS = os.path.join(_etc_dir, 'rtma_valid_coordinates.txt')
-    GRID_MAPPING = os.path.join(_etc_dir, 'rtma_grid_mapping.p.gz')
-    COORD_BUCKETS = os.path.join(_etc_dir, 'rtma_lat_lons.p.gz')
-    CHUNK_SIZE = 1000
+    CHUNK_SIZE = CHUNK_SIZE
 
-    def get_data(self, lat, lon):
+    def get_data(self, lat, lon, start=None, end=None):
         """
         RTMA datasets' method for getting data.
         args:
         :lat: float of latitude from which to get data
         :lon: float of longitude from which to get data
-        return: tuple of lat/lon snapped to RTMA grid, and weather data, which is pd.Series with datetime index
-        and str values corresponding to weather observations
-        """
-        super().get_data()
-        (self.x_grid, self.y_grid), (self.snapped_lat,
-                                     self.snapped_lon) = self.get_grid_x_y(lat, lon)
-        str_x, str_y = f'{self.x_grid:04}', f'{self.y_grid:04}'
-        index = self.get_file_index()
-        self.tar_name = self.find_archive(index)
-        self.gzip_name = f"{str_x}_{str_y}.gz"
-        ret_dict = {}
-        for i, h in enumerate(self.get_hashes()):
-            date_range = self.get_date_range_from_metadata(h)
-            rtma_dict = self.get_weather_dict(date_range, h, i == 0)
-            ret_dict = {**ret_dict, **rtma_dict}
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of lat/lon snapped to RTMA grid, and weather data, which is pd.DataFrame with datetime index
+        and `value`/`precision` columns, see GriddedDataset.get_weather_dict
+        """
+        head = super().get_data()
+        return self.query_point(head, self.get_metadata(head), lat, lon, start, end)
+
+    def query_point(self, head, metadata, lat, lon, start=None, end=None):
+        point = self.get_rtma_point(lat, lon)
+        (x_grid, y_grid), (snapped_lat, snapped_lon) = self.get_grid_x_y(point)
+        str_x, str_y = f'{x_grid:04}', f'{y_grid:04}'
+        tar_name = self.find_archive(self.get_file_index(point))
+        gzip_name = f"{str_x}_{str_y}.gz"
+        missing_value = metadata.get("missing value")
+        start, end = window_bounds(start, end)
+        chunks = self.fetch_chain(
+            head, lambda date_range, h, is_root: self.get_weather_dict(
+                date_range, h, is_root, tar_name, gzip_name, missing_value, start, end), start, end)
         ret_lat, ret_lon = cpc_lat_lon_to_conventional(
-            self.snapped_lat, self.snapped_lon)
-        return (float(ret_lat), float(ret_lon)), pd.Series(ret_dict)
+            snapped_lat, snapped_lon)
+        return (float(ret_lat), float(ret_lon)), trim_to_window(merge_releases(chunks, cell_frame([], [], [])), start, end)
 
-    def get_grid_x_y(self, lat, lon):
+    def get_rtma_point(self, lat, lon):
         """
-        Converts a lat/lon to an x/y in the RTMA grid
+        Finds the valid RTMA point closest to a lat/lon
         args:
         :lat: float
         :lon: float
-        returns: pair of tuples. First is x,y for RTMA grid, Second is snapped lat,lon for that point
+        returns: the point's rtma_utils.RTMA_INDEX_DTYPE record
         """
         lat, lon = conventional_lat_lon_to_cpc(lat, lon)
         if ((lat < 20) or (53 < lat)):
@@ -354,28 +594,28 @@ class RtmaGriddedDataset(GriddedDataset):
         if ((lon < 228) or (300 < lon)):
             raise FileNotFoundError(
                 'RTMA only covers longitudes -132 thru -60')
-        lat, lon = str(lat), str(lon)
-
-        with gzip.open(self.COORD_BUCKETS) as f:
-            valid_lat_lons = pickle.load(f)
-        close_array = valid_lat_lons[lat[:2], lon[:3]]
-        closest = find_closest_lat_lon(close_array, (lat, lon))
-
-        with gzip.open(self.GRID_MAPPING) as f:
-            grid_dict = pickle.load(f)
-        grid = grid_dict[closest[0]]
+        return get_rtma_index().nearest(lat, lon)
 
+    def get_grid_x_y(self, point):
+        """
+        Converts a point found by get_rtma_point to an x/y in the RTMA grid
+        args:
+        :point: RTMA_INDEX_DTYPE record
+        returns: pair of tuples. First is x,y for RTMA grid, Second is snapped lat,lon for that point
+        """
+        grid = (int(point["x"]), int(point["y"]))
+        closest = (float(point["lat"]), float(point["lon"]))
         return grid, closest
 
-    def get_file_index(self):
+    def get_file_index(self, point):
         """
-        Uses a list of valid RTMA points in txt file to determine how to find the archive containing that point
+        Looks up the position of a point found by get_rtma_point in the list of valid RTMA points,
+        which determines how to find the archive containing that point
+        args:
+        :point: RTMA_INDEX_DTYPE record
         return: index of x,y point
         """
-        with open(self.VALID_COORDS, "r") as f:
-            for i, line in enumerate(f):
-                if line.strip() == str((self.x_grid, self.y_grid)):
-                    return i
+        return int(point["file_index"])
 
     def find_archive(self, index):
         """
@@ -384,13 +624,10 @@ class RtmaGriddedDataset(GriddedDataset):
         :index: from get_file_index
         return: archive containing data
         """
-        with open(self.CHUNKS) as f:
-            balls = [line.strip() for line in list(f)]
-        ball_index = index // self.CHUNK_SIZE
-        return balls[ball_index]
+        return get_rtma_index().archive(index)
 
 
-class SimpleGriddedDataset(GriddedDataset):
+class SimpleGriddedDataset(LatLonGriddedDataset):
     """
     Abstract class for all other gridded datasets
     """
@@ -403,47 +640,185 @@ class SimpleGriddedDataset(GriddedDataset):
         """
         return None
 
-    def get_file_names(self):
+    def get_file_names(self, snapped_lat, snapped_lon):
         """
         Uses formatting and lat,lon to determine file name containing data
+        args:
+        :snapped_lat: lat snapped to the dataset's grid
+        :snapped_lon: lon snapped to the dataset's grid
         return: dict with names for tar and gz versions of file
         """
         if self.zero_padding:
-            lat_portion = f"{self.snapped_lat:0{self.zero_padding}.{self.SIG_DIGITS}f}"
-            lon_portion = f"{self.snapped_lon:0{self.zero_padding}.{self.SIG_DIGITS}f}"
+            lat_portion = f"{snapped_lat:0{self.zero_padding}.{self.SIG_DIGITS}f}"
+            lon_portion = f"{snapped_lon:0{self.zero_padding}.{self.SIG_DIGITS}f}"
         else:
-            lat_portion = f"{self.snapped_lat:.{self.SIG_DIGITS}f}"
-            lon_portion = f"{self.snapped_lon:.{self.SIG_DIGITS}f}"
+            lat_portion = f"{snapped_lat:.{self.SIG_DIGITS}f}"
+            lon_portion = f"{snapped_lon:.{self.SIG_DIGITS}f}"
         return {
             "tar": f"{lat_portion}.tar",
             "gz": f"{lat_portion}_{lon_portion}.gz"
         }
 
-    def get_data(self, lat, lon):
+    def get_data(self, lat, lon, start=None, end=None):
         """
         General method for gridded datasets getting data
         args:
         :lat: float of latitude from which to get data
         :lon: float of longitude from which to get data
-        return: tuple of lat/lon snapped to dataset grid, and weather data, is pd.Series with datetime or date index
-        and str values corresponding to weather observations
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of lat/lon snapped to dataset grid, and weather data, is pd.DataFrame with datetime or date index
+        and `value`/`precision` columns, see GriddedDataset.get_weather_dict
+        """
+        head = super().get_data()
+        return self.query_point(head, self.get_metadata(head), lat, lon, start, end)
+
+    def query_point(self, head, metadata, lat, lon, start=None, end=None):
+        snapped_lat, snapped_lon = self.snap_point(lat, lon, metadata)
+        file_names = self.get_file_names(snapped_lat, snapped_lon)
+        missing_value = metadata.get("missing value")
+        start, end = window_bounds(start, end)
+        chunks = self.fetch_chain(
+            head, lambda date_range, h, is_root: self.get_weather_dict(
+                date_range, h, is_root, file_names["tar"], file_names["gz"], missing_value, start, end), start, end)
+        ret_lat, ret_lon = cpc_lat_lon_to_conventional(
+            snapped_lat, snapped_lon)
+        return (float(ret_lat), float(ret_lon)), trim_to_window(merge_releases(chunks, cell_frame([], [], [])), start, end)
+
+    def to_dataset_lat_lon(self, lat, lon):
+        """
+        return: conventional lat/lon as floats in the dataset's own lat/lon convention, which is CPC's for some sets
         """
-        super().get_data()
-        first_metadata = self.get_metadata(self.head)
         if "cpcc" in self.dataset or "era5" in self.dataset:
-            lat, lon = conventional_lat_lon_to_cpc(float(lat), float(lon))
-        self.snapped_lat, self.snapped_lon = self.snap_to_grid(
-            float(lat), float(lon), first_metadata)
-        self.tar_name = self.get_file_names()["tar"]
-        self.gzip_name = self.get_file_names()["gz"]
-        ret_dict = {}
-        for i, h in enumerate(self.get_hashes()):
-            date_range = self.get_date_range_from_metadata(h)
-            weather_dict = self.get_weather_dict(date_range, h, i == 0)
-            ret_dict = {**ret_dict, **weather_dict}
-        ret_lat, ret_lon = cpc_lat_lon_to_conventional(
-            self.snapped_lat, self.snapped_lon)
-        return (float(ret_lat), float(ret_lon)), pd.Series(ret_dict)
+            return conventional_lat_lon_to_cpc(float(lat), float(lon))
+        return float(lat), float(lon)
+
+    def snap_point(self, lat, lon, metadata):
+        """
+        return: lat/lon snapped to the dataset's grid, in the dataset's own lat/lon convention
+        """
+        return self.snap_to_grid(*self.to_dataset_lat_lon(lat, lon), metadata)
+
+    def get_data_many(self, points, start=None, end=None):
+        """
+        Get the data of many points at once. Points are snapped to their grid cells, and the cells sharing a tar
+        are read from each release with a single transfer, see iter_cell_files
+        args:
+        :points: iterable of (lat, lon) tuples
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: dict of (lat, lon) point: the tuple get_data returns for it, or None if the dataset has no data there
+        """
+        head = super().get_data()
+        return self.query_points(head, points, self.get_metadata(head), start, end)
+
+    def get_region(self, min_lat, min_lon, max_lat, max_lon, start=None, end=None):
+        """
+        Get the data of every cell of the grid inside a bounding box, see get_data_many
+        args:
+        :min_lat: float southern bound, inclusive
+        :min_lon: float western bound, inclusive
+        :max_lat: float northern bound, inclusive
+        :max_lon: float eastern bound, inclusive
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of the time index, array of lats, array of lons, float array of values of shape
+        (times, lats, lons) with NaN for missing values, and the int8 array of the number of decimals of each value
+        """
+        head = super().get_data()
+        first_metadata = self.get_metadata(head)
+        resolution = first_metadata["resolution"]
+        lat_range = first_metadata["latitude range"]
+        lon_range = first_metadata["longitude range"]
+        lats = grid_axis(max(min_lat, lat_range[0]), min(max_lat, lat_range[1]), lat_range[0], resolution)
+        # the box's lons are conventional, so they're clamped once converted to the dataset's own convention.
+        # Grid points outside of the range are at least a resolution away from it, half of one covers rounding
+        lons = grid_axis(min_lon, max_lon, lon_range[0], resolution)
+        dataset_lons = np.array([self.to_dataset_lat_lon(0, lon)[1] for lon in lons])
+        lons = lons[(dataset_lons >= lon_range[0] - resolution / 2) & (dataset_lons <= lon_range[1] + resolution / 2)]
+        points = [(float(lat), float(lon)) for lat in lats for lon in lons]
+        responses = self.query_points(head, points, first_metadata, start, end)
+        frames = [None if responses[point] is None else responses[point][1] for point in points]
+        times, values, precision = stack_cells(frames, (len(lats), len(lons)))
+        return times, lats, lons, values, precision
+
+    def query_points(self, head, points, metadata, start=None, end=None):
+        """
+        Implementation of get_data_many, once the dataset's head has been looked up
+        args:
+        :head: hash of the head of the dataset
+        :metadata: metadata of the head of the dataset
+        """
+        cells = {point: self.snap_point(*point, metadata) for point in points}
+        file_names = {cell: self.get_file_names(*cell) for cell in set(cells.values())}
+        start, end = window_bounds(start, end)
+        def fetch(date_range, h, is_root):
+            return {cell: self.decode_weather_file(gz_file, date_range, metadata.get("missing value"), start, end)
+                    for cell, gz_file in self.iter_cell_files(h, is_root, file_names)}
+
+        return self.collect_cells(cells, self.fetch_chain(head, fetch, start, end), start, end)
+
+    def collect_cells(self, cells, releases, start=None, end=None):
+        """
+        Merge the cells read from each release into the result of get_data_many, see query_points
+        args:
+        :cells: dict of (lat, lon) point: its snapped cell
+        :releases: list of the dicts of cell: decoded data of the releases, in chain order
+        :start: optional start of the window as returned by window_bounds
+        :end: optional end of the window as returned by window_bounds
+        return: see get_data_many. A point is None if any release is missing its cell
+        """
+        chunks = {cell: [] for cell in cells.values()}
+        missing = set()
+        for release in releases:
+            for cell in chunks:
+                if cell in release:
+                    chunks[cell].append(release[cell])
+                else:
+                    missing.add(cell)
+
+        ret = {}
+        for point, cell in cells.items():
+            if cell in missing:
+                ret[point] = None
+                continue
+            ret_lat, ret_lon = cpc_lat_lon_to_conventional(*cell)
+            ret[point] = (float(ret_lat), float(ret_lon)), \
+                trim_to_window(merge_releases(chunks[cell], cell_frame([], [], [])), start, end)
+        return ret
+
+    def iter_cell_files(self, ipfs_hash, is_root, file_names):
+        """
+        Get the gzipped files of many cells from a release. In non-root releases the cells of a tar (or zip) are
+        fetched together. Root cells are streamed, and each stream is only opened once the previous file has been
+        consumed, so that a large region never holds more than one open stream
+        args:
+        :ipfs_hash: hash of the release
+        :is_root: bool indicating whether this is the root node in the linked list
+        :file_names: dict of snapped cell: dict of tar and gz names as returned by get_file_names
+        return: generator of (cell, file-like object of its gzipped data), without the cells the release doesn't have
+        """
+        if is_root:
+            for cell, names in file_names.items():
+                try:
+                    gz_file = self.get_file_object(f"{ipfs_hash}/{names['gz']}", stream=True)
+                except NOT_FOUND_ERRORS:
+                    continue
+                yield cell, gz_file
+            return
+        tars = {}
+        for cell, names in file_names.items():
+            tars.setdefault(names["tar"], {})[names["gz"]] = cell
+        for tar_name, cells in tars.items():
+            try:
+                members = self.get_tar_members(f"{ipfs_hash}/{tar_name}", list(cells))
+            except NOT_FOUND_ERRORS:
+                try:
+                    members = self.get_zip_members(f"{ipfs_hash}/{tar_name[:-4]}.zip", list(cells))
+                except NOT_FOUND_ERRORS:
+                    members = {}
+            for member, gz_file in members.items():
+                yield cells[member], gz_file
 
 
 class Era5LandWind(SimpleGriddedDataset):
@@ -463,42 +838,85 @@ class Vhi(IpfsDataset):
     dataset = "vhi"
     NUM_NAS_AT_START_OF_DATA = 34
 
-    def get_data(self, lat, lon):
-        super().get_data()
-        first_metadata = self.get_metadata(self.head)
-        snapped_lat, snapped_lon = self.snap_to_grid(
-            float(lat), float(lon), first_metadata)
-        self.zip_file_name = f"{snapped_lat:.3f}.zip"
-        self.gzip_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}.gz"
-        hashes = self.traverse_ll(self.head)
-
-        ret_dict = {}
-        for h in hashes:
-            date_range = self.get_date_range_from_metadata(h)
-            weather_dict = self.get_weather_dict(date_range, h)
-            ret_dict = {**ret_dict, **weather_dict}
+    def get_data(self, lat, lon, start=None, end=None):
+        """
+        args:
+        :lat: float of latitude from which to get data
+        :lon: float of longitude from which to get data
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: tuple of snapped lat/lon, and a pd.DataFrame with weekly date index, a float `value` column
+        and the `precision` of each value
+        """
+        head = super().get_data()
+        return self.query_point(self.traverse_ll(head), self.get_metadata(head), lat, lon, start, end)
 
-        return (snapped_lat, snapped_lon), pd.Series(ret_dict).iloc[self.NUM_NAS_AT_START_OF_DATA:]
+    def get_data_many(self, points, start=None, end=None):
+        """
+        Get the data of many points at once, walking the linked list and reading the metadata only once.
+        Each point's cell is read on its own, see GriddedDataset.get_data_many
+        args:
+        :points: iterable of (lat, lon) tuples
+        :start: optional date or datetime, releases ending before it aren't fetched
+        :end: optional date or datetime, releases starting after it aren't fetched
+        return: dict of (lat, lon) point: the tuple get_data returns for it, or None if the dataset has no data there
+        """
+        head = super().get_data()
+        hashes, metadata = self.traverse_ll(head), self.get_metadata(head)
+        ret = {}
+        for point in points:
+            try:
+                ret[point] = self.query_point(hashes, metadata, *point, start=start, end=end)
+            except (KeyError, FileNotFoundError, *NOT_FOUND_ERRORS):
+                ret[point] = None
+        return ret
 
-    def get_weather_dict(self, date_range, ipfs_hash):
+    def query_point(self, hashes, metadata, lat, lon, start=None, end=None):
         """
-        Uses a weekly time span, so logic is a little different from other datasets
+        Implementation of get_data, once the dataset's linked list has been walked
+        args:
+        :hashes: hashes of the linked list, as returned by traverse_ll
+        :metadata: metadata of the dataset's head
+        return: see get_data
         """
-        with zipfile.ZipFile(self.get_file_object(f"{ipfs_hash}/{self.zip_file_name}")) as zi:
-            with gzip.open(zi.open(self.gzip_name)) as gz:
-                cell_text = gz.read().decode('utf-8')
-        vhi_dict = {}
+        snapped_lat, snapped_lon = self.snap_to_grid(
+            float(lat), float(lon), metadata)
+        zip_file_name = f"{snapped_lat:.3f}.zip"
+        gzip_name = f"{snapped_lat:.3f}_{snapped_lon:.3f}.gz"
+        start, end = window_bounds(start, end)
+
+        # the first weeks of the root release are all missing values
+        first_valid_date = self.get_date_range_from_metadata(hashes[0])[0] + \
+            datetime.timedelta(weeks=self.NUM_NAS_AT_START_OF_DATA)
+        chunks = self.fetch_releases(
+            hashes, lambda date_range, h, is_root: self.get_weather_dict(
+                date_range, h, zip_file_name, gzip_name, start, end), start, end)
+
+        ret = merge_releases(chunks, cell_frame([], [], pd.DatetimeIndex([])))
+        # missing values are written as both -999 and -999.00, so they're compared as numbers
+        ret[VALUE] = mask_missing(ret[VALUE].to_numpy(copy=True), metadata.get("missing value", -999))
+        ret = ret[ret.index >= pd.Timestamp(first_valid_date)]
+        ret.index = ret.index.date
+        return (snapped_lat, snapped_lon), trim_to_window(ret, start, end)
+
+    def get_weather_dict(self, date_range, ipfs_hash, zip_file_name, gzip_name, start=None, end=None):
+        """
+        Uses a weekly time span, so logic is a little different from other datasets. Yearly lines
+        outside of the optional `start`/`end` datetimes are skipped without being decoded, and the cell
+        is read from `gzip_name` in the release's `zip_file_name`
+        return: pd.DataFrame as returned by cell_frame, with a DatetimeIndex
+        """
+        kept_lines, line_starts = [], []
         year = date_range[0].year
-        for year_data in cell_text.split('\n'):
-            if year == date_range[0].year:
-                date_itr = date_range[0]
-            else:
-                date_itr = datetime.date(year, 1, 1)
-            for week_data in year_data.split(','):
-                vhi_dict[date_itr] = "-999" if week_data == "-999.00" else week_data
-                date_itr += datetime.timedelta(days=7)
-            year += 1
-        return vhi_dict
+        with gzip.open(self.get_zip_member(f"{ipfs_hash}/{zip_file_name}", gzip_name)) as gz:
+            for year_data in iter_lines(gz):
+                if end is not None and year > end.year:
+                    break
+                if start is None or year >= start.year:
+                    kept_lines.append(year_data)
+                    line_starts.append(date_range[0] if year == date_range[0].year else datetime.date(year, 1, 1))
+                year += 1
+        return decode_lines(kept_lines, line_starts, datetime.timedelta(days=7))
 
     @classmethod
     def snap_to_grid(cls, lat, lon, metadata):
@@ -547,13 +965,13 @@ class StationDataset(IpfsDataset):
     def dataset(self):
         return self._dataset
 
-    def __init__(self, dataset, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, dataset, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
         self._dataset = dataset
 
     def get_data(self, station):
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv.gz"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv.gz"
         with gzip.open(self.get_file_object(file_name)) as gz:
             return gz.read().decode('utf-8')
 
@@ -564,12 +982,12 @@ class CmeStationsDataset(IpfsDataset):
     """
     dataset = "cme_temperature_stations-daily"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station):
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
 
@@ -579,12 +997,12 @@ class DutchStationsDataset(IpfsDataset):
     """
     dataset = "dutch_stations-daily"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station):
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
 
@@ -594,12 +1012,12 @@ class DwdStationsDataset(IpfsDataset):
     """
     dataset = "dwd_stations-daily"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station):
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv.gz"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv.gz"
         with gzip.open(self.get_file_object(file_name)) as gz:
             return gz.read().decode("utf-8")
 
@@ -610,12 +1028,12 @@ class DwdHourlyStationsDataset(IpfsDataset):
     """
     dataset = "dwd_hourly-hourly"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station, weather_variable):
-        super().get_data()
-        file_name = f"{self.head}/{weather_variable}/{station}.csv.gz"
+        head = super().get_data()
+        file_name = f"{head}/{weather_variable}/{station}.csv.gz"
         with gzip.open(self.get_file_object(file_name)) as gz:
             return gz.read().decode("utf-8")
 
@@ -626,12 +1044,12 @@ class GlobalHourlyStationsDataset(IpfsDataset):
     """
     dataset = "ghisd-sub_hourly"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station, weather_variable):
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv.gz"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv.gz"
         with gzip.open(self.get_file_object(file_name)) as gz:
             return gz.read().decode("utf-8")
 
@@ -653,31 +1071,33 @@ class CsvStationDataset(IpfsDataset):
     def dataset(self):
         return self._dataset
 
-    def __init__(self, dataset, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, dataset, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
         self._dataset = dataset
 
-    def get_hashes(self):
+    def get_hashes(self, head):
         """
+        args:
+        :head: hash of the head of the dataset's linked list
         return: list of all hashes in dataset
         """
-        hashes = self.traverse_ll(self.head, self.as_of)
+        hashes = self.traverse_ll(head, self.as_of)
         return list(hashes)
 
     def get_data(self, station, weather_variable=None):
         # only some stations need weather variable
         # so this is an optional arg
-        super().get_data()
-        file_name = f"{self.head}/{station}.csv"
+        head = super().get_data()
+        file_name = f"{head}/{station}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
     def get_data_recursive(self, station, weather_variable=None):
         # only some stations need weather variable
         # so this is an optional arg
-        super().get_data()
+        head = super().get_data()
         # get all hashes and then effectively just use get_data
         # recursively to get a full list of csvs
-        hashes = self.get_hashes()
+        hashes = self.get_hashes(head)
         csv_text_list = []
         for hash_ in hashes:
             file_name = f"{hash_}/{station}.csv"
@@ -694,7 +1114,7 @@ class YieldDatasets(IpfsDataset):
     def dataset(self):
         return self._dataset
 
-    def __init__(self, dataset, ipfs_timeout=None):
+    def __init__(self, dataset, ipfs_timeout=None, transport=None):
         if dataset not in {
             "sco-yearly",
             "sco_vhi_imputed-yearly",
@@ -703,15 +1123,15 @@ class YieldDatasets(IpfsDataset):
             "rma_t_yield_imputed-single-value"
         }:
             raise ValueError("Invalid yield dataset")
-        super().__init__(ipfs_timeout=ipfs_timeout)
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
         self._dataset = dataset
 
     def get_data(self, commodity, state, county):
-        super().get_data()
+        head = super().get_data()
         if self.dataset in ["rmasco_imputed-yearly", "rma_t_yield_imputed-single-value"]:
-            file_name = f"{self.head}/{state}-{county}.csv"
+            file_name = f"{head}/{state}-{county}.csv"
         else:
-            file_name = f"{self.head}/{commodity}-{state}-{county}.csv"
+            file_name = f"{head}/{commodity}-{state}-{county}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
 
@@ -722,8 +1142,8 @@ class FsaIrrigationDataset(IpfsDataset):
     dataset = "fsa_irrigation_splits"
 
     def get_data(self, commodity):
-        super().get_data()
-        file_name = f"{self.head}/fsa_commodity_{commodity}.csv"
+        head = super().get_data()
+        file_name = f"{head}/fsa_commodity_{commodity}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
 
@@ -753,14 +1173,13 @@ class PowerDataset(IpfsDataset):
         return [datetime.datetime.fromisoformat(dt) for dt in str_dates]
 
     def get_data(self):
-        super().get_data()
-        hashes = self.traverse_ll(self.head)
-        ret_dict = {}
+        head = super().get_data()
+        hashes = self.traverse_ll(head)
+        chunks = []
         for h in hashes:
             date_range = self.get_date_range_from_metadata(h)
-            new_dict = self.extract_data_from_gz(date_range, h)
-            ret_dict = {**ret_dict, **new_dict}
-        return ret_dict
+            chunks.append(self.extract_data_from_gz(date_range, h))
+        return merge_releases(chunks)
 
 
 class AemoPowerDataset(PowerDataset):
@@ -866,16 +1285,12 @@ class JapanStations(GriddedDataset):
             raise ValueError("Invalid station name")
 
     def get_data(self, station_name):
-        super().get_data()
-        hashes = self.get_hashes()
+        head = super().get_data()
+        hashes = self.get_hashes(head)
         block_number = self.get_block_number(station_name, hashes[0])
-        ret_dict = {}
-        for h in hashes:
-            date_range = self.get_date_range_from_metadata(h)
-            new_dict = self.extract_data_from_text(
-                date_range, h, block_number, station_name)
-            ret_dict = {**ret_dict, **new_dict}
-        return pd.Series(ret_dict)
+        chunks = self.fetch_releases(hashes, lambda date_range, h, is_root: self.extract_data_from_text(
+            date_range, h, block_number, station_name))
+        return pd.Series(merge_releases(chunks))
 
     def extract_data_from_text(self, date_range, ipfs_hash, block_number, station_name):
         byte_obj = self.get_file_object(
@@ -905,14 +1320,10 @@ class CwvStations(GriddedDataset):
         return "cwv_update_{}.txt"
 
     def get_data(self, station_name):
-        super().get_data()
-        hashes = self.get_hashes()
-        ret_dict = {}
-        for h in hashes:
-            date_range = self.get_date_range_from_metadata(h)
-            new_dict = self.extract_data_from_text(date_range, h, station_name)
-            ret_dict = {**ret_dict, **new_dict}
-        return pd.Series(ret_dict)
+        head = super().get_data()
+        chunks = self.fetch_chain(
+            head, lambda date_range, h, is_root: self.extract_data_from_text(date_range, h, station_name))
+        return pd.Series(merge_releases(chunks))
 
     def extract_data_from_text(self, date_range, ipfs_hash, station_name):
         byte_obj = self.get_file_object(
@@ -942,14 +1353,9 @@ class SapStations(GriddedDataset):
         return "sap_update_UK.txt"
 
     def get_data(self):
-        super().get_data()
-        hashes = self.get_hashes()
-        ret_dict = {}
-        for h in hashes:
-            date_range = self.get_date_range_from_metadata(h)
-            new_dict = self.extract_data_from_text(date_range, h)
-            ret_dict = {**ret_dict, **new_dict}
-        return pd.Series(ret_dict)
+        head = super().get_data()
+        chunks = self.fetch_chain(head, lambda date_range, h, is_root: self.extract_data_from_text(date_range, h))
+        return pd.Series(merge_releases(chunks))
 
     def extract_data_from_text(self, date_range, ipfs_hash):
         byte_obj = self.get_file_object(
@@ -985,15 +1391,12 @@ class AustraliaBomStations(GriddedDataset):
         return self.DATA_FILE_FORMAT.format(station_id)
 
     def get_data(self, station_name):
-        super().get_data()
-        hashes = self.get_hashes()
+        head = super().get_data()
+        hashes = self.get_hashes(head)
         file_name = self.get_file_name(station_name, hashes[0])
-        ret_list = []
-        for h in hashes:
-            date_range = self.get_date_range_from_metadata(h)
-            new_list = self.extract_data_from_text(date_range, h, file_name)
-            ret_list = [*ret_list, *new_list]
-        return pd.DataFrame(ret_list).set_index("date")
+        chunks = self.fetch_releases(
+            hashes, lambda date_range, h, is_root: self.extract_data_from_text(date_range, h, file_name))
+        return pd.DataFrame(merge_releases(chunks, [])).set_index("date")
 
     def extract_data_from_text(self, date_range, ipfs_hash, file_name):
         byte_obj = self.get_file_object(f"{ipfs_hash}/{file_name}")
@@ -1037,8 +1440,8 @@ class SpeedwellStations(GriddedDataset):
         return data
 
     def get_data(self, station_name):
-        super().get_data()
-        hashes = self.get_hashes()
+        head = super().get_data()
+        hashes = self.get_hashes(head)
         WMO = self.get_WMO(station_name, hashes[0])
         total_data = []
         for h in hashes:
@@ -1067,15 +1470,14 @@ class DroughtMonitor(IpfsDataset):
         return [datetime.datetime.fromisoformat(dt) for dt in str_dates]
 
     def get_data(self, state, county):
-        super().get_data()
-        hashes = self.traverse_ll(self.head)
-        ret_dict = {}
+        head = super().get_data()
+        hashes = self.traverse_ll(head)
+        chunks = []
         for h in hashes:
             date_range = self.get_date_range_from_metadata(h)
-            new_dict = self.extract_data_from_text(
-                date_range, h, state, county)
-            ret_dict = {**ret_dict, **new_dict}
-        return ret_dict
+            chunks.append(self.extract_data_from_text(
+                date_range, h, state, county))
+        return merge_releases(chunks)
 
     def extract_data_from_text(self, date_range, ipfs_hash, state, county):
         time_itr = date_range[0].date()
@@ -1096,13 +1498,9 @@ class AfrDataset(IpfsDataset):
         return "afr-monthly"
 
     def get_data(self):
-        super().get_data()
-        hashes = self.traverse_ll(self.head)
-        ret_dict = {}
-        for h in hashes:
-            f = self.get_file_object(f"{h}/afr.json")
-            ret_dict = {**ret_dict, **json.load(f)}
-        return ret_dict
+        head = super().get_data()
+        hashes = self.traverse_ll(head)
+        return merge_releases(json.load(self.get_file_object(f"{h}/afr.json")) for h in hashes)
 
 
 class CedaBiomass(IpfsDataset):
@@ -1124,7 +1522,7 @@ class CedaBiomass(IpfsDataset):
         returns:
             BytesIO representing relevant GeoTiff File
         """
-        super().get_data()
+        head = super().get_data()
 
         ns_string = f"S{abs(lat):02}" if lat < 0 else f"N{lat:02}"
         ew_string = f"W{abs(lon):03}" if lon < 0 else f"E{lon:03}"
@@ -1135,7 +1533,7 @@ class CedaBiomass(IpfsDataset):
         else:
             file_name = f"{ns_string}{ew_string}_ESACCI-BIOMASS-L4-{unit}-MERGED-100m-{year}-fv3.0.tif"
 
-        return self.get_file_object(f"{self.head}/{file_name}")
+        return self.get_file_object(f"{head}/{file_name}")
 
 
 class ForecastDataset(GriddedDataset):
@@ -1146,8 +1544,8 @@ class ForecastDataset(GriddedDataset):
     def dataset(self):
         return self._dataset
 
-    def __init__(self, dataset, interval, con_to_cpc=None, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, dataset, interval, con_to_cpc=None, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
         self._dataset = dataset
         self._interval = interval
         self._con_to_cpc = con_to_cpc
@@ -1168,19 +1566,32 @@ class ForecastDataset(GriddedDataset):
         :h: hash for ipfs directory containing metadata
         return: list of [start_time, end_time]
         """
-        metadata = self.get_metadata(h)
+        return self.parse_full_date_range(self.get_metadata(h))
+
+    @staticmethod
+    def parse_full_date_range(metadata):
+        """
+        return: list of [start_time, end_time] of the forecasts in the metadata of a release
+        """
         str_dates = (metadata["api documentation"]["full date range"]
                      [0], metadata["api documentation"]["full date range"][1])
         return [datetime.datetime.fromisoformat(dt).date() for dt in str_dates]
 
-    def get_relevant_hash(self, forecast_date):
+    def get_relevant_hash(self, forecast_date, head):
+        """
+        return the ipfs hash required to pull in data for a forecast date, searching back from `head`
+        """
+        return self.find_relevant_hash(
+            forecast_date, self.get_full_date_range_from_metadata(head), self.iter_releases(head))
+
+    @staticmethod
+    def find_relevant_hash(forecast_date, cur_full_date_range, records):
         """
-        return the ipfs hash required to pull in data for a forecast date
+        return the ipfs hash of the first release of `records` whose data contains `forecast_date`, see get_relevant_hash
+        args:
+        :cur_full_date_range: full date range of the head, see get_full_date_range_from_metadata
+        :records: manifest records of the releases in the linked list, newest first
         """
-        cur_hash = self.head
-        cur_metadata = self.get_metadata(cur_hash)
-        cur_date_range = self.get_date_range_from_metadata(cur_hash)
-        cur_full_date_range = self.get_full_date_range_from_metadata(cur_hash)
         # First confirm the user is not requesting a forecast date outside the available data
         if forecast_date > cur_full_date_range[1]:
             raise DateOutOfRangeError(
@@ -1188,21 +1599,13 @@ class ForecastDataset(GriddedDataset):
         elif forecast_date < cur_full_date_range[0]:
             raise DateOutOfRangeError(
                 "Forecast date is earlier than available data")
-        # If the forecast date is within the current hash, return it...
-        if cur_date_range[0] <= forecast_date <= cur_date_range[1]:
-            return cur_hash
-        # ...Otherwise, iterate backwards through the link list, returning the current hash if the forecast date falls w/in data available for it.
+        # Iterate backwards through the link list from the head, returning the first hash whose data contains the forecast date.
         # This routine is agnostic to the order of data contained in the hashes (at a cost of inefficiency) -- if the data contains the forecast date, it WILL be found, eventually
-        prev_hash = cur_metadata['previous hash']
-        while prev_hash is not None:
-            prev_metadata = self.get_metadata(prev_hash)
-            prev_date_range = self.get_date_range_from_metadata(prev_hash)
-            prev_date_range = [datetime.date.fromisoformat(
-                d) for d in prev_metadata["date range"]]
-            if prev_date_range[0] <= forecast_date <= prev_date_range[1]:
-                return prev_hash
-            # iterate backwards in the link list one step
-            prev_hash = prev_metadata['previous hash']
+        for record in records:
+            date_range = [datetime.date.fromisoformat(
+                d) for d in record["date range"]]
+            if date_range[0] <= forecast_date <= date_range[1]:
+                return record["hash"]
 
         # If this script runs to the end without returning anything or an error, the forecast date must fall in a hole in the data
         # NOTE only returns if there are holes in the data
@@ -1211,47 +1614,62 @@ class ForecastDataset(GriddedDataset):
 
     def get_weather_dict(self, forecast_date, ipfs_hash, lat, lon):
         """
-        return dict with the forecast data corresponding to a lat/lon, forecast_date, and ipfs hash
+        return pd.DataFrame as returned by cell_frame with the forecast data corresponding to a lat/lon,
+        forecast_date, and ipfs hash
         """
-        ret = {}
-        zip_file_name = f"{forecast_date.strftime('%Y%m%d')}_{lat:.2f}.zip"
-        with zipfile.ZipFile(self.get_file_object(f"{ipfs_hash}/{zip_file_name}")) as zi:
-            file_name = f"{forecast_date.strftime('%Y%m%d')}_{lat:.2f}_{lon:.2f}"
-            with zi.open(file_name) as f:
-                vals = f.read().decode("utf-8").split(',')
-                start_hour = 1 if "gfs" in self._dataset else 0
-                start_datetime = datetime.datetime(
-                    forecast_date.year, forecast_date.month, forecast_date.day, hour=start_hour)
-                for i, val in enumerate(vals):
-                    ret[start_datetime +
-                        datetime.timedelta(hours=i*self._interval)] = val
-        return ret
+        file_names = self.get_file_names(forecast_date, lat, lon)
+        return self.decode_forecast(
+            forecast_date, self.get_zip_member(f"{ipfs_hash}/{file_names['zip']}", file_names["file"]).read())
+
+    def get_file_names(self, forecast_date, snapped_lat, snapped_lon):
+        """
+        return: dict with the names of the zip holding a cell's forecast and of the cell's file in the zip
+        """
+        return {
+            "zip": f"{forecast_date.strftime('%Y%m%d')}_{snapped_lat:.2f}.zip",
+            "file": f"{forecast_date.strftime('%Y%m%d')}_{snapped_lat:.2f}_{snapped_lon:.2f}"
+        }
+
+    def decode_forecast(self, forecast_date, content):
+        """
+        return pd.DataFrame as returned by cell_frame from the content of a cell's forecast file, see get_weather_dict
+        """
+        # forecasts leave missing values empty, which decode to NaN
+        values, precision = decode_cell(content.rstrip(b"\n"))
+        start_hour = 1 if "gfs" in self._dataset else 0
+        start_datetime = datetime.datetime(
+            forecast_date.year, forecast_date.month, forecast_date.day, hour=start_hour)
+        index = pd.date_range(start_datetime, periods=len(values), freq=pd.Timedelta(hours=self._interval))
+        return cell_frame(values, precision, index)
 
     def get_data(self, lat, lon, forecast_date):
         """
-        return pd.Series with the forecast data corresponding to a lat/lon and forecast_date
+        return pd.DataFrame with datetime index, a float `value` column with the forecast data corresponding
+        to a lat/lon and forecast_date, and the `precision` of each value
+        """
+        head = super().get_data()
+        snapped_lat, snapped_lon = self.snap_point(lat, lon, self.get_metadata(head))
+        relevant_hash = self.get_relevant_hash(forecast_date, head)
+        weather_frame = self.get_weather_dict(
+            forecast_date, relevant_hash, snapped_lat, snapped_lon)
+        return self.to_conventional(snapped_lat, snapped_lon), weather_frame
+
+    def snap_point(self, lat, lon, metadata):
         """
-        super().get_data()
-        first_metadata = self.get_metadata(self.head)
+        return: lat/lon snapped to the dataset's grid, in the dataset's own lat/lon convention, which is CPC's for GFS
+        """
+        lat, lon = float(lat), float(lon)
         if self._con_to_cpc:
-            lat, lon = conventional_lat_lon_to_cpc(float(lat), float(lon))
-            snapped_lat, snapped_lon = self.snap_to_grid(
-                float(lat), float(lon), first_metadata)
-            relevant_hash = self.get_relevant_hash(forecast_date)
-            weather_dict = self.get_weather_dict(
-                forecast_date, relevant_hash, snapped_lat, snapped_lon)
-            ret_lat, ret_lon = cpc_lat_lon_to_conventional(
-                snapped_lat, snapped_lon)
-        else:
-            lat, lon = float(lat), float(lon)
-            snapped_lat, snapped_lon = self.snap_to_grid(
-                float(lat), float(lon), first_metadata)
-            relevant_hash = self.get_relevant_hash(forecast_date)
-            weather_dict = self.get_weather_dict(
-                forecast_date, relevant_hash, snapped_lat, snapped_lon)
-            ret_lat, ret_lon = snapped_lat, snapped_lon
+            lat, lon = conventional_lat_lon_to_cpc(lat, lon)
+        return self.snap_to_grid(float(lat), float(lon), metadata)
 
-        return (float(ret_lat), float(ret_lon)), pd.Series(weather_dict)
+    def to_conventional(self, snapped_lat, snapped_lon):
+        """
+        return: conventional lat/lon as floats of a point snapped by snap_point
+        """
+        if self._con_to_cpc:
+            snapped_lat, snapped_lon = cpc_lat_lon_to_conventional(snapped_lat, snapped_lon)
+        return float(snapped_lat), float(snapped_lon)
 
 
 class StationForecastDataset(ForecastDataset):
@@ -1264,15 +1682,14 @@ class StationForecastDataset(ForecastDataset):
         return self._dataset
 
     def __init__(self, dataset, **kwargs):
-        super().__init__(dataset, 1)
-        self.head = get_heads()[self.dataset]
+        super().__init__(dataset, 1, transport=kwargs.get("transport"))
 
     def get_data(self, station, forecast_date):
-        relevant_hash = self.get_relevant_hash(forecast_date)
+        relevant_hash = self.get_relevant_hash(forecast_date, get_heads()[self.dataset])
         return self.get_file_object(f"{relevant_hash}/{station}.csv").read().decode("utf-8")
 
     def get_stations(self, forecast_date):
-        relevant_hash = self.get_relevant_hash(forecast_date)
+        relevant_hash = self.get_relevant_hash(forecast_date, get_heads()[self.dataset])
         return self.get_file_object(f"{relevant_hash}/stations.json").read().decode("utf-8")
 
 
@@ -1282,14 +1699,14 @@ class TeleconnectionsDataset(IpfsDataset):
     """
     dataset = "cpc_teleconnections-monthly"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station):
-        super().get_data()
-        metadata = self.get_metadata(self.head)
+        head = super().get_data()
+        metadata = self.get_metadata(head)
 
-        file_name = f"{self.head}/{station}.csv"
+        file_name = f"{head}/{station}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
 
 
@@ -1299,11 +1716,11 @@ class EauFranceDataset(IpfsDataset):
     """
     dataset = "EauFrance-daily"
 
-    def __init__(self, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
 
     def get_data(self, station):
-        super().get_data()
-        metadata = self.get_metadata(self.head)
-        file_name = f"{self.head}/{station}.csv"
+        head = super().get_data()
+        metadata = self.get_metadata(head)
+        file_name = f"{head}/{station}.csv"
         return self.get_file_object(file_name).read().decode("utf-8")
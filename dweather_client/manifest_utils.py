@@ -0,0 +1,169 @@
+"""
+Persisted index of the releases in each dataset's linked list.
+
+Every release's metadata names the release before it, so resolving a chain from scratch takes one
+metadata fetch per release. Since releases are immutable, the summary of a release never changes
+once it has been seen: when heads.json points at a new head, only the releases published since the
+last known head have to be walked.
+"""
+import os
+import json
+import threading
+
+from dweather_client import cache_utils
+
+
+def release_record(ipfs_hash, metadata):
+    """
+    Summarize a release's metadata into a manifest record
+    args:
+    :ipfs_hash: hash of the release
+    :metadata: metadata of the release
+    return: dict with the hash, date range, time generated and previous hash of the release
+    """
+    if "date range" in metadata:
+        date_range = metadata["date range"]
+    else:
+        date_range = metadata.get("date_range")
+    return {
+        "hash": ipfs_hash,
+        "date range": date_range,
+        "time generated": metadata.get("time generated"),
+        "previous hash": metadata.get("previous hash"),
+    }
+
+
+class ReleaseManifest:
+    """
+    Ordered list of (hash, date range, time generated, previous hash) records for a dataset, persisted
+    as JSON in the cache dir and extended incrementally whenever the head changes
+    """
+
+    def __init__(self, dataset, cache_dir=None, persist=True):
+        """
+        args:
+        :dataset: name of the dataset in heads.json
+        :cache_dir: base directory for the manifest file. If None, uses cache_utils.CACHE_DIR
+        :persist: if False, the manifest only lives in memory
+        """
+        self.dataset = dataset
+        self.persist = persist
+        self._cache_dir = cache_dir
+        self._lock = threading.RLock()
+        self.head = None
+        self.releases = {}
+        self._load()
+
+    @property
+    def path(self):
+        base = self._cache_dir if self._cache_dir is not None else cache_utils.CACHE_DIR
+        if not (self.persist and base):
+            return None
+        return os.path.join(base, "manifests", f"{self.dataset}.json")
+
+    def get(self, ipfs_hash):
+        """
+        return: the record for `ipfs_hash`, or None if the release hasn't been indexed yet
+        """
+        with self._lock:
+            return self.releases.get(ipfs_hash)
+
+    def iter_releases(self, head, get_metadata):
+        """
+        Iterate through the releases in the linked list from `head` back to the root, only fetching
+        metadata for releases that aren't in the manifest yet
+        args:
+        :head: ipfs hash of the release at the head of the linked list
+        :get_metadata: function taking a hash and returning that release's metadata
+        return: generator of release records, newest first
+        """
+        new_records = []
+        release_itr = head
+        try:
+            while release_itr is not None:
+                record = self.get(release_itr)
+                if record is None:
+                    record = release_record(release_itr, get_metadata(release_itr))
+                    new_records.append(record)
+                yield record
+                release_itr = record["previous hash"]
+        finally:
+            if new_records:
+                self._extend(head, new_records, complete=release_itr is None)
+
+    def chain(self, head, get_metadata):
+        """
+        return: list of release records in the linked list starting at `head`, root first
+        """
+        return list(self.iter_releases(head, get_metadata))[::-1]
+
+    def _extend(self, head, new_records, complete):
+        with self._lock:
+            for record in new_records:
+                self.releases[record["hash"]] = record
+            if complete:
+                self.head = head
+            self._save()
+
+    def _ordered_records(self):
+        """
+        return: records in the current head's chain, root first, followed by any records off that chain
+        """
+        ordered = []
+        seen = set()
+        release_itr = self.head
+        while release_itr is not None and release_itr in self.releases and release_itr not in seen:
+            seen.add(release_itr)
+            ordered.append(self.releases[release_itr])
+            release_itr = self.releases[release_itr]["previous hash"]
+        ordered.reverse()
+        return ordered + [record for h, record in self.releases.items() if h not in seen]
+
+    def _load(self):
+        path = self.path
+        if path is None:
+            return
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for record in stored.get("releases", []):
+                self.releases.setdefault(record["hash"], record)
+            if self.head is None:
+                self.head = stored.get("head")
+
+    def _save(self):
+        path = self.path
+        if path is None:
+            return
+        # another process may have extended the manifest in the meantime, so merge before writing
+        head = self.head
+        self._load()
+        self.head = head
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"head": self.head, "releases": self._ordered_records()}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+_MANIFESTS = {}
+_MANIFESTS_LOCK = threading.Lock()
+
+
+def get_manifest(dataset):
+    """
+    return: the process-wide ReleaseManifest for `dataset`
+    """
+    with _MANIFESTS_LOCK:
+        if dataset not in _MANIFESTS:
+            _MANIFESTS[dataset] = ReleaseManifest(dataset)
+        return _MANIFESTS[dataset]
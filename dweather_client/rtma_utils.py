@@ -0,0 +1,199 @@
+"""
+Process-wide index of the valid RTMA grid points.
+
+RTMA data is addressed by (x, y) on its own grid, and each point's data lives in an archive chosen by
+the point's position in the list of valid coordinates. A point resolves to the nearest valid point of
+its bucket, the valid points whose coordinates start like its own (e.g. "36" and "277"). All of this
+is precomputed into one array of (bucket, lat, lon, x, y, file index) records sorted by bucket and
+memory mapped on first use, so resolving a point is a binary search for its bucket plus a distance
+computation over the points of that bucket. Packages ship the array as etc/rtma_index.npy, built by
+scripts/build_rtma_index.py. Without it, the array is built once from the lookup files and kept in the
+cache dir.
+"""
+import os
+import gzip
+import pickle
+import threading
+
+import numpy as np
+
+from dweather_client import cache_utils
+from dweather_client.struct_utils import closest_lat_lon_index
+
+ETC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "etc")
+RTMA_INDEX = os.path.join(ETC_DIR, "rtma_index.npy")
+RTMA_INDEX_CACHE_FILE = os.path.join("rtma", "rtma_index.npy")
+# files the index is built from, see scripts/build_rtma_index.py
+CHUNKS = os.path.join(ETC_DIR, "rtma_chunks.txt")
+VALID_COORDS = os.path.join(ETC_DIR, "rtma_valid_coordinates.txt")
+GRID_MAPPING = os.path.join(ETC_DIR, "rtma_grid_mapping.p.gz")
+COORD_BUCKETS = os.path.join(ETC_DIR, "rtma_lat_lons.p.gz")
+CHUNK_SIZE = 1000
+
+RTMA_INDEX_DTYPE = np.dtype([
+    ("bucket", "S16"), ("lat", "<f8"), ("lon", "<f8"), ("x", "<i4"), ("y", "<i4"), ("file_index", "<i4")])
+# x, y and file index of valid points missing from the grid mapping or the list of valid coordinates
+NO_GRID_POINT = -1
+
+
+class RtmaIndex:
+    """
+    Nearest valid RTMA point lookups over an array of RTMA_INDEX_DTYPE records sorted by bucket
+    """
+
+    def __init__(self, records, chunks):
+        """
+        args:
+        :records: array of RTMA_INDEX_DTYPE sorted by bucket, e.g. memory mapped from RTMA_INDEX
+        :chunks: names of the archives, each holding CHUNK_SIZE consecutive valid points
+        """
+        self.records = records
+        # searching the strided fields of the records would copy them on every lookup
+        self.buckets = np.ascontiguousarray(records["bucket"])
+        self.lats = np.ascontiguousarray(records["lat"])
+        self.lons = np.ascontiguousarray(records["lon"])
+        self.chunks = chunks
+
+    def nearest(self, lat, lon):
+        """
+        args:
+        :lat: latitude in CPC format
+        :lon: longitude in CPC format, i.e. 0 to 360
+        return: the RTMA_INDEX_DTYPE record of the valid point of lat/lon's bucket closest to it in euclidean
+        distance, the first one in the bucket's order if there are ties
+        raises: KeyError if there are no valid points in the bucket, or the closest one isn't on the RTMA grid
+        """
+        key = bucket_key(lat, lon)
+        first = np.searchsorted(self.buckets, key, side="left")
+        last = np.searchsorted(self.buckets, key, side="right")
+        if first == last:
+            raise KeyError(f"No valid RTMA points around {lat}, {lon}")
+        closest, _ = closest_lat_lon_index(self.lats[first:last], self.lons[first:last], float(lat), float(lon))
+        record = self.records[first + closest]
+        if record["file_index"] == NO_GRID_POINT:
+            raise KeyError(f"No RTMA grid point at {record['lat']}, {record['lon']}")
+        return record
+
+    def archive(self, file_index):
+        """
+        return: name of the archive containing the valid point at `file_index`
+        """
+        return self.chunks[file_index // CHUNK_SIZE]
+
+
+def bucket_key(lat, lon):
+    """
+    args:
+    :lat: latitude in CPC format, as a float or the str of one
+    :lon: longitude in CPC format
+    return: bytes key of the bucket of valid points that lat/lon is searched in, which is keyed by the first
+    two characters of the latitude and the first three of the longitude, e.g. b"36,277"
+    """
+    return f"{str(float(lat))[:2]},{str(float(lon))[:3]}".encode("ascii")
+
+
+def build_rtma_records(coord_buckets, grid_mapping, valid_coords):
+    """
+    Build the index records from the original lookup files. A point listed in several buckets gets a record in
+    each of them, and the points of a bucket keep their order
+    args:
+    :coord_buckets: dict of (lat str[:2], lon str[:3]) bucket: list of (lat str, lon str), as pickled in COORD_BUCKETS
+    :grid_mapping: dict of lat str: (x, y), as pickled in GRID_MAPPING
+    :valid_coords: iterable of "(x, y)" lines, as in VALID_COORDS. A point's line number is its file index
+    return: array of RTMA_INDEX_DTYPE sorted by bucket
+    """
+    file_indexes = {line.strip(): i for i, line in enumerate(valid_coords)}
+    records = []
+    for (bucket_lat, bucket_lon), points in coord_buckets.items():
+        bucket = f"{bucket_lat},{bucket_lon}"
+        for lat, lon in points:
+            x, y = grid_mapping.get(lat, (NO_GRID_POINT, NO_GRID_POINT))
+            file_index = file_indexes.get(str((x, y)), NO_GRID_POINT) if lat in grid_mapping else NO_GRID_POINT
+            records.append((bucket, float(lat), float(lon), x, y, file_index))
+    records = np.array(records, dtype=RTMA_INDEX_DTYPE)
+    return records[np.argsort(records["bucket"], kind="stable")]
+
+
+def read_rtma_records():
+    """
+    return: index records built from COORD_BUCKETS, GRID_MAPPING and VALID_COORDS
+    """
+    with gzip.open(COORD_BUCKETS) as f:
+        coord_buckets = pickle.load(f)
+    with gzip.open(GRID_MAPPING) as f:
+        grid_mapping = pickle.load(f)
+    with open(VALID_COORDS, "r") as f:
+        return build_rtma_records(coord_buckets, grid_mapping, f)
+
+
+def cached_rtma_index_path():
+    """
+    return: path of the index built from the lookup files in the cache dir, or None if nothing is persisted
+    """
+    if not cache_utils.CACHE_DIR:
+        return None
+    return os.path.join(cache_utils.CACHE_DIR, RTMA_INDEX_CACHE_FILE)
+
+
+def _load_index_file(path):
+    """
+    return: the records memory mapped from `path`, or None if it doesn't hold an index of RTMA_INDEX_DTYPE
+    """
+    try:
+        records = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return records if records.dtype == RTMA_INDEX_DTYPE else None
+
+
+def save_rtma_records(records, path):
+    """
+    Write the index to `path` atomically, so that other processes never map a partially written file.
+    Best effort, e.g. a read-only cache dir only means the index is rebuilt by the next process
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            np.save(f, records)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_rtma_records(path=RTMA_INDEX):
+    """
+    Memory map the index shipped at `path`. If the package doesn't ship one, the index is built from the
+    original lookup files the first time, and memory mapped from the cache dir afterwards
+    """
+    for index_path in (path, cached_rtma_index_path()):
+        if index_path is not None and os.path.exists(index_path):
+            records = _load_index_file(index_path)
+            if records is not None:
+                return records
+    records = read_rtma_records()
+    cached_path = cached_rtma_index_path()
+    if cached_path is not None:
+        save_rtma_records(records, cached_path)
+    return records
+
+
+_rtma_index = None
+_rtma_index_lock = threading.Lock()
+
+
+def get_rtma_index():
+    """
+    return: the process-wide RtmaIndex, loaded on first use
+    """
+    global _rtma_index
+    if _rtma_index is None:
+        with _rtma_index_lock:
+            if _rtma_index is None:
+                with open(CHUNKS) as f:
+                    chunks = [line.strip() for line in f]
+                _rtma_index = RtmaIndex(load_rtma_records(), chunks)
+    return _rtma_index
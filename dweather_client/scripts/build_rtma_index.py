@@ -0,0 +1,14 @@
+from dweather_client.rtma_utils import read_rtma_records, RTMA_INDEX
+import numpy as np
+
+def main():
+    """
+    Convert the RTMA lookup files into the sorted, memory mappable index loaded by rtma_utils.
+    Run before packaging, so that the index ships in etc/ with the package
+    """
+    records = read_rtma_records()
+    np.save(RTMA_INDEX, records)
+    print(f"saved {len(records)} points to {RTMA_INDEX}")
+
+if __name__ == "__main__":
+    main()
@@ -9,39 +9,25 @@ class DateRangeRetriever(IpfsDataset):
     def dataset(self):
         return self._dataset
 
-    def __init__(self, dataset, ipfs_timeout=None):
-        super().__init__(ipfs_timeout=ipfs_timeout)
+    def __init__(self, dataset, ipfs_timeout=None, transport=None):
+        super().__init__(ipfs_timeout=ipfs_timeout, transport=transport)
         self._dataset = dataset
 
     def get_data(self, as_of):
         """
         Returns a list of datetime ranges corresponding to all metadata generated after `as_of`
         """
-        super().get_data()
-        cur_metadata = self.get_metadata(self.head)
-        time_generated = datetime.datetime.fromisoformat(cur_metadata["time generated"])
-
+        head = super().get_data()
         ret = []
-        while time_generated >= as_of:
-            if "date range" in cur_metadata:
-                str_range = cur_metadata["date range"]
-            elif "date_range" in cur_metadata:
-                str_range = cur_metadata["date_range"]
-            else:
-                raise KeyError("metadata has no date range key") 
-
-            date_range = _convert_str_range(str_range)
-            ret.append(date_range)
-
-            try:
-                prev_release = cur_metadata['previous hash']
-            except KeyError:
-                break
-            if prev_release is not None:
-                cur_metadata = self.get_metadata(prev_release)
-                time_generated = datetime.datetime.fromisoformat(cur_metadata["time generated"])
-            else:
+        for record in self.iter_releases(head):
+            if record["time generated"] is None:
+                raise KeyError("metadata has no time generated key")
+            time_generated = datetime.datetime.fromisoformat(record["time generated"])
+            if time_generated < as_of:
                 break
+            if record["date range"] is None:
+                raise KeyError("metadata has no date range key")
+            ret.append(_convert_str_range(record["date range"]))
         return ret
 
 def _convert_str_range(str_range):
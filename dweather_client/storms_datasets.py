@@ -21,13 +21,21 @@ def process_df(input_df, **kwargs):
             
 class IbtracsDataset(IpfsDataset):
     dataset = "ibtracs_storm_basins"
+    BASINS = {'NI', 'SI', 'NA', 'EP', 'WP', 'SP', 'SA'}
 
     def get_data(self, basin, **kwargs):
-        if basin not in {'NI', 'SI', 'NA', 'EP', 'WP', 'SP', 'SA'}:
+        if basin not in self.BASINS:
             raise ValueError("Invalid basin ID")
-        super().get_data()
-        ipfs_hash = self.get_relevant_hash(kwargs["as_of"])
+        head = super().get_data()
+        ipfs_hash = self.get_relevant_hash(kwargs["as_of"], head)
         file_obj = self.get_file_object(f"{ipfs_hash}/ibtracs-{basin}.csv.gz")
+        return self.read_basin_file(file_obj, **kwargs)
+
+    @staticmethod
+    def read_basin_file(file_obj, **kwargs):
+        """
+        return the storms of a basin's gzipped csv as a pd.DataFrame, subset with process_df
+        """
         df = pd.read_csv(
             file_obj, na_values=["", " "], keep_default_na=False, low_memory=False, compression="gzip"
         )
@@ -50,45 +58,60 @@ class IbtracsDataset(IpfsDataset):
 
         return processed_df
 
-    def get_relevant_hash(self, as_of_date):
+    def get_relevant_hash(self, as_of_date, head):
         """
-        return the ipfs hash required to pull in data for a forecast date
+        return the ipfs hash required to pull in data for a forecast date, searching back from `head`
         """
-        cur_hash = self.head
         if as_of_date == None:
-            return cur_hash
-        cur_metadata = self.get_metadata(cur_hash)
+            return head
+        return self.find_relevant_hash(as_of_date, head, self.iter_releases(head))
+
+    @staticmethod
+    def find_relevant_hash(as_of_date, head, records):
+        """
+        return the ipfs hash of the release that was current on `as_of_date`, see get_relevant_hash
+        args:
+        :records: manifest records of the releases in the linked list from `head`, newest first
+        """
+        cur_hash = head
         # This routine is agnostic to the order of data contained in the hashes (at a cost of inefficiency) -- if the data contains the forecast date, it WILL be found, eventually
-        most_recent_date = datetime.datetime.fromisoformat(cur_metadata["time generated"]).date()
-        if as_of_date >= most_recent_date:
-            return cur_hash
-        prev_hash = cur_metadata['previous hash']
-        while prev_hash is not None:
-            prev_metadata = self.get_metadata(prev_hash)
-            prev_date = datetime.datetime.fromisoformat(prev_metadata["time generated"]).date()
-            if prev_date <= as_of_date <= most_recent_date:
-                return prev_hash
-            # iterate backwards in the link list one step
-            try:
-                prev_hash = prev_metadata['previous hash']
-                most_recent_date = prev_date
-            except KeyError:
-                # Because we added the as_of after a while to this ETL prev_hash won't be 'None' we'll just run into an exception
-                raise DateOutOfRangeError(
-                    "as_of data is earlier than earliest available hash")
+        most_recent_date = None
+        for record in records:
+            if record["time generated"] is None:
+                # Because we added the as_of after a while to this ETL older releases have no time generated
+                break
+            release_date = datetime.datetime.fromisoformat(record["time generated"]).date()
+            if most_recent_date is None:
+                if as_of_date >= release_date:
+                    return cur_hash
+            elif release_date <= as_of_date <= most_recent_date:
+                return record["hash"]
+            most_recent_date = release_date
+        raise DateOutOfRangeError(
+            "as_of data is earlier than earliest available hash")
 
 
 class AtcfDataset(IpfsDataset):
     dataset = "atcf_btk-seasonal"
+    BASINS = {'AL', 'CP', 'EP', 'SL'}
 
     def get_data(self, basin, **kwargs):
-        if basin not in {'AL', 'CP', 'EP', 'SL'}:
+        if basin not in self.BASINS:
             raise ValueError("Invalid basin ID")
-        super().get_data()
-        release_ll = self.traverse_ll(self.head)
+        head = super().get_data()
+        release_ll = self.traverse_ll(head)
+        release_files = [self.get_file_object(f"{release_hash}/history.json.gz") for release_hash in release_ll]
+        return self.read_release_files(release_files, basin, **kwargs)
+
+    @staticmethod
+    def read_release_files(release_files, basin, **kwargs):
+        """
+        return the storms of a basin as a pd.DataFrame, subset with process_df
+        args:
+        :release_files: file-like objects of the gzipped history of each release, root first
+        """
         hurr_dict = {}
-        for release_hash in release_ll:
-            release_file = self.get_file_object(f"{release_hash}/history.json.gz")
+        for release_file in release_files:
             with gzip.open(release_file) as zip_data:
                 release_content = json.load(zip_data)
             try:
@@ -117,23 +140,32 @@ class AtcfDataset(IpfsDataset):
 
 class SimulatedStormsDataset(IpfsDataset):
     dataset = "storm-simulated-hurricane"
+    BASINS = {'EP', 'NA', 'NI', 'SI', 'SP', 'WP'}
 
     def get_data(self, basin, **kwargs):
-        super().get_data()
+        head = super().get_data()
         
-        if basin not in {'EP', 'NA', 'NI', 'SI', 'SP', 'WP'}:
+        if basin not in self.BASINS:
             raise ValueError("Invalid basin ID")
 
-        metadata  = self.get_metadata(self.head)
+        metadata  = self.get_metadata(head)
+        files = {f: self.get_file_object(f"{head}/{f}") for f in metadata["files"] if basin in f}
+        return self.read_simulation_files(files, **kwargs)
+
+    @staticmethod
+    def read_simulation_files(files, **kwargs):
+        """
+        return the simulated storms of a basin as a pd.DataFrame, subset with process_df
+        args:
+        :files: dict of the names of the basin's gzipped csvs in the release's metadata: their file-like objects
+        """
         dfs = []
-        for f in metadata["files"]:
-            if basin in f:
-                file_obj = self.get_file_object(f"{self.head}/{f}")
-                df = pd.read_csv(file_obj, header=None, compression="gzip")[range(10)]
-                columns = ['year', 'month', 'tc_num', 'time_step', 'basin', 'lat', 'lon', 'min_press', 'max_wind', 'rmw']
-                df.columns = columns
-                df["sim"] = f[-8]
-                dfs.append(df)
+        for f, file_obj in files.items():
+            df = pd.read_csv(file_obj, header=None, compression="gzip")[range(10)]
+            columns = ['year', 'month', 'tc_num', 'time_step', 'basin', 'lat', 'lon', 'min_press', 'max_wind', 'rmw']
+            df.columns = columns
+            df["sim"] = f[-8]
+            dfs.append(df)
 
         big_df = pd.concat(dfs).reset_index(drop=True)
         big_df.loc[big_df.lon > 180, 'lon'] = big_df.lon - 360
@@ -0,0 +1,72 @@
+"""
+Helpers for consuming IPFS content incrementally, so that large cells never have to be held in
+memory whole, neither compressed nor decompressed.
+"""
+import io
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkedReader(io.RawIOBase):
+    """
+    Read-only file-like object over an iterator of bytes chunks, e.g. a streamed HTTP response
+    """
+
+    def __init__(self, chunks):
+        """
+        args:
+        :chunks: iterable of bytes objects
+        """
+        self._chunks = iter(chunks)
+        self._chunk_iterable = chunks
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self):
+        if not self.closed and hasattr(self._chunk_iterable, "close"):
+            self._chunk_iterable.close()
+        super().close()
+
+
+def open_stream(chunks, buffer_size=STREAM_CHUNK_SIZE):
+    """
+    return: buffered file-like object reading from an iterable of bytes chunks
+    """
+    return io.BufferedReader(ChunkedReader(chunks), buffer_size=buffer_size)
+
+
+def iter_lines(fileobj):
+    """
+    Read a binary file line by line. Lines are split exactly like bytes.split(b'\n') would split the
+    whole file, so a trailing newline yields a final empty line
+    args:
+    :fileobj: binary file-like object, e.g. a gzip.GzipFile
+    return: generator of bytes lines without their newlines
+    """
+    line = b"\n"
+    for line in fileobj:
+        yield line.rstrip(b"\n")
+    if line.endswith(b"\n"):
+        yield b""
+
+
+def iter_text_lines(fileobj, encoding="utf-8"):
+    """
+    Like iter_lines, but decoding each line
+    return: generator of str lines without their newlines
+    """
+    for line in iter_lines(fileobj):
+        yield line.decode(encoding)
@@ -1,5 +1,14 @@
-import math
 import numpy as np
+import pandas as pd
+try:
+    import xarray as xr
+except ImportError:
+    xr = None
+
+# "dict": {time: Quantity or None}, one Python object per value
+# "series": pd.Series of floats with NaN for missing values and the astropy unit in series.attrs["unit"]
+# "quantity": tuple of one Quantity array and a pd.DatetimeIndex
+RESULT_FORMATS = ("dict", "series", "quantity")
 
 def convert_nans_to_none(quantity):
     if np.isnan(quantity.value):
@@ -22,4 +31,114 @@ def find_closest_lat_lon(lst, K):
     Find the closest (lat, lon) tuple in a list to a given 
     (lat, lon) tuple K. Use euclidian distance for performance reasons.
     """
-    return lst[min(range(len(lst)), key = lambda i: math.sqrt((float(lst[i][0]) - float(K[0]))**2 + (float(lst[i][1]) - float(K[1]))**2 ))] 
+    candidates = np.asarray(lst, dtype=np.float64).reshape(-1, 2)
+    index, _ = closest_lat_lon_index(candidates[:, 0], candidates[:, 1], float(K[0]), float(K[1]))
+    return lst[index]
+
+def closest_lat_lon_index(lats, lons, lat, lon):
+    """
+    Nearest neighbour of one point among candidates held as float arrays
+    Args:
+        lats (np.ndarray): latitudes of the candidates
+        lons (np.ndarray): longitudes of the candidates, in the same convention as `lon`
+        lat (float), lon (float): the point to search for
+    Returns:
+        tuple of the index of the closest candidate in euclidean distance, the first one if there are ties,
+        and its squared distance
+    """
+    distances = (lats - lat) ** 2 + (lons - lon) ** 2
+    index = int(np.argmin(distances))
+    return index, float(distances[index])
+
+def closest_lat_lon_indices(lats, lons, query_lats, query_lons, block_size=2 ** 22):
+    """
+    Batch version of closest_lat_lon_index, resolving many points in one call
+    Args:
+        lats (np.ndarray), lons (np.ndarray): coordinates of the candidates
+        query_lats (array-like), query_lons (array-like): coordinates of the points to search for
+        block_size (int): max number of distances computed at once, to bound memory use
+    Returns:
+        int array of the index of the closest candidate to each point
+    """
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    query_lats = np.asarray(query_lats, dtype=np.float64)
+    query_lons = np.asarray(query_lons, dtype=np.float64)
+    indices = np.empty(len(query_lats), dtype=np.int64)
+    rows = max(1, block_size // max(1, len(lats)))
+    for start in range(0, len(query_lats), rows):
+        block = slice(start, start + rows)
+        distances = (lats[np.newaxis, :] - query_lats[block, np.newaxis]) ** 2 + \
+            (lons[np.newaxis, :] - query_lons[block, np.newaxis]) ** 2
+        indices[block] = np.argmin(distances, axis=1)
+    return indices
+
+def merge_releases(chunks, default=None):
+    """
+    Combine the data read from each release of a linked list into one object, copying every chunk once
+    instead of re-merging the growing result once per release.
+    Args:
+        chunks (iterable): per release data, oldest release first. Either dicts, lists, or pd.Series/DataFrames
+        default: returned if there are no chunks. If None, an empty dict is returned
+    Returns:
+        dicts merged so that a newer release's value wins for a key already seen, like repeated {**a, **b}
+        lists concatenated
+        pandas objects concatenated, keeping only the newest release's row for an index label seen more than once
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return {} if default is None else default
+    if isinstance(chunks[0], dict):
+        merged = {}
+        for chunk in chunks:
+            merged.update(chunk)
+        return merged
+    if isinstance(chunks[0], list):
+        return [item for chunk in chunks for item in chunk]
+    non_empty = [chunk for chunk in chunks if len(chunk)]
+    if len(non_empty) <= 1:
+        return non_empty[0] if non_empty else chunks[0]
+    merged = pd.concat(non_empty)
+    return merged[~merged.index.duplicated(keep="last")]
+
+def check_result_format(result_format):
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"result_format must be one of {RESULT_FORMATS}")
+
+def format_history(series, unit, result_format):
+    """
+    Shape a history into one of the array based RESULT_FORMATS, without creating an object per value
+    Args:
+        series (pd.Series): values as floats or as a Quantity array, indexed by dates, datetimes or ISO strings
+        unit (astropy.units.UnitBase): unit of the values, used if they aren't a Quantity already
+        result_format (str): "series" or "quantity"
+    Returns:
+        pd.Series with the unit in its attrs, or tuple of (Quantity array, pd.DatetimeIndex)
+    """
+    check_result_format(result_format)
+    values = series.values
+    unit = getattr(values, "unit", unit)
+    values = np.asarray(getattr(values, "value", values), dtype=np.float64)
+    index = series.index if isinstance(series.index, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(series.index))
+    if result_format == "quantity":
+        return values * unit, index
+    history = pd.Series(values, index=index, name=series.name)
+    history.attrs["unit"] = unit
+    return history
+
+
+def region_to_xarray(cube, times, lats, lons):
+    """
+    Wrap a region returned by get_gridcell_region into an xarray.DataArray, requires xarray to be installed
+    Args:
+        cube (astropy.units.Quantity): values of shape (times, lats, lons)
+        times (pd.Index): dates or datetimes of the first axis
+        lats (np.ndarray): latitudes of the second axis
+        lons (np.ndarray): longitudes of the third axis
+    Returns:
+        xarray.DataArray with "time", "lat" and "lon" dimensions and the unit in its attrs["unit"]
+    """
+    if xr is None:
+        raise ImportError("xarray is required to return regions as xarray.DataArray")
+    return xr.DataArray(
+        cube.value, coords={"time": times, "lat": lats, "lon": lons}, dims=("time", "lat", "lon"),
+        attrs={"unit": cube.unit})
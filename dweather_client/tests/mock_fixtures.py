@@ -1,14 +1,51 @@
 from dweather_client.client import GRIDDED_DATASETS
 import pickle
 import os
+import gzip
+import json
+import tarfile
+from io import BytesIO
+import pandas as pd
+from dweather_client.timeseries_utils import trim_to_window
+from dweather_client.http_queries import get_metadata, get_heads
+from dweather_client.cell_utils import decode_cell, cell_frame
+from dweather_client.transports import DirectoryTransport
+
+# heads and metadata of the pickled datasets that tests can query without network, see patch_offline
+OFFLINE_METADATA = {
+    "chirpsc_final_05-daily": {"unit of measurement": "mm", "missing value": "-9999"},
+    "rtma_pcp-hourly": {"unit of measurement": "kg/m**2", "missing value": "-9999"},
+}
+OFFLINE_HEADS = {dataset: f"offline-{dataset}" for dataset in OFFLINE_METADATA}
+
+def get_offline_heads():
+    return dict(OFFLINE_HEADS)
+
+def get_offline_metadata(hash_str):
+    return next(OFFLINE_METADATA[dataset] for dataset, head in OFFLINE_HEADS.items() if head == hash_str)
 
 def constructor(self, as_of, ipfs_timeout):
     pass
 
-def get_data(self, lat, lon):
+def get_data(self, lat, lon, start=None, end=None):
     to_open = os.path.join(os.path.dirname(__file__), "etc", f"{self.dataset}_{lat}_{lon}.p")
     with open(to_open, "rb") as f:
-        return pickle.load(f)
+        snapped_coords, series = pickle.load(f)
+    if not isinstance(series, pd.DataFrame):
+        # the pickles hold the str series datasets used to return, decode them like the datasets now do
+        missing_value = get_metadata(get_heads()[self.dataset])["missing value"]
+        values, precision = decode_cell(",".join(series.values).encode("utf-8"), missing_value)
+        series = cell_frame(values, precision, series.index)
+    return snapped_coords, trim_to_window(series, start, end)
+
+def get_data_many(self, points, start=None, end=None):
+    ret = {}
+    for point in points:
+        try:
+            ret[point] = get_data(self, *point, start=start, end=end)
+        except FileNotFoundError:
+            ret[point] = None
+    return ret
 
 def dummy_enter(self):
     return self
@@ -27,8 +64,101 @@ def get_patched_datasets():
             "__init__": constructor,
             "__enter__": dummy_enter,
             "__exit__": dummy_exit,
-            "get_data": get_data
+            "get_data": get_data,
+            "get_data_many": get_data_many
         })
         patched_datasets[k] = new_class
     return patched_datasets
-        
\ No newline at end of file
+        
+
+def patch_offline(mocker):
+    """
+    Patch the client to query the pickled datasets, with the heads and metadata of OFFLINE_METADATA
+    instead of fetching them over the network
+    """
+    mocker.patch("dweather_client.client.GRIDDED_DATASETS", get_patched_datasets())
+    for module in ("dweather_client.client", "dweather_client.tests.mock_fixtures"):
+        mocker.patch(f"{module}.get_heads", get_offline_heads)
+        mocker.patch(f"{module}.get_metadata", get_offline_metadata)
+
+def write_release(root, ipfs_hash, metadata, files):
+    """
+    Write a release to a directory laid out like the gateway, see patch_directory
+    args:
+    :root: pathlib.Path of the directory
+    :files: dict of file name: content as bytes
+    """
+    (root / ipfs_hash).mkdir(parents=True)
+    (root / ipfs_hash / "metadata.json").write_text(json.dumps(metadata))
+    for name, content in files.items():
+        (root / ipfs_hash / name).write_bytes(content)
+
+
+def tar_of(files):
+    """
+    return: content of a tar of `files`, a dict of member name: content as bytes
+    """
+    tar_bytes = BytesIO()
+    with tarfile.open(fileobj=tar_bytes, mode="w") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, BytesIO(content))
+    return tar_bytes.getvalue()
+
+
+def write_gridded_releases(root):
+    """
+    Write a root and a later release of chirpsc_final_05-daily, both holding the cells (10, 20) and (10, 20.05)
+    return: heads of the dataset, see patch_directory
+    """
+    metadata = {"resolution": 0.05, "latitude range": [-50, 50], "longitude range": [-180, 180],
+                "unit of measurement": "mm", "missing value": "-9999"}
+    write_release(root, "QmChirpsRoot",
+                  {**metadata, "date range": ["2000-01-01T00:00:00", "2000-01-03T00:00:00"], "previous hash": None},
+                  {"10.000_20.000.gz": gzip.compress(b"1,2,3"), "10.000_20.050.gz": gzip.compress(b"4,-9999,6")})
+    write_release(root, "QmChirpsNext",
+                  {**metadata, "date range": ["2000-01-04T00:00:00", "2000-01-05T00:00:00"], "previous hash": "QmChirpsRoot"},
+                  {"10.000.tar": tar_of({"10.000_20.000.gz": gzip.compress(b"7,8"),
+                                         "10.000_20.050.gz": gzip.compress(b"9,10")})})
+    return {"chirpsc_final_05-daily": "QmChirpsNext"}
+
+
+class CountingTransport(DirectoryTransport):
+    """
+    DirectoryTransport recording the path of each of its reads, to check how many transfers a query takes
+    """
+    def __init__(self, root):
+        super().__init__(root)
+        self.reads = []
+
+    def cat(self, path):
+        self.reads.append(path)
+        return super().cat_range(path, 0, -1)
+
+    def cat_range(self, path, offset, length):
+        self.reads.append(path)
+        return super().cat_range(path, offset, length)
+
+    def stream(self, path, **kwargs):
+        self.reads.append(path)
+        return super().stream(path, **kwargs)
+
+
+def patch_directory(mocker, root, heads, transport=None):
+    """
+    Patch the client and datasets to read from a directory laid out like the gateway instead of the network
+    args:
+    :root: pathlib.Path of the directory, holding one subdirectory per hash
+    :heads: dict of dataset name: hash of its head, served as heads.json
+    :transport: Transport reading `root` to use, defaults to a DirectoryTransport
+    return: the transport
+    """
+    transport = DirectoryTransport(str(root)) if transport is None else transport
+    mocker.patch("dweather_client.cache_utils.CACHE_DIR", str(root / "cache"))
+    mocker.patch.dict("dweather_client.manifest_utils._MANIFESTS", clear=True)
+    mocker.patch("dweather_client.transports._default_transport", transport)
+    for module in ("dweather_client.client", "dweather_client.ipfs_queries"):
+        mocker.patch(f"{module}.get_heads", lambda: dict(heads))
+    mocker.patch("dweather_client.client.get_metadata", lambda h: json.loads(transport.cat(f"{h}/metadata.json")))
+    return transport
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import gzip
+import zipfile
+from io import BytesIO
+import pytest
+from dweather_client import client
+from dweather_client.ipfs_errors import CoordinateNotFoundError
+from dweather_client.tests.mock_fixtures import patch_directory, write_release, write_gridded_releases
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from dweather_client import aio
+
+
+def make_app(root, heads, in_flight):
+    """
+    Serve `root` like the gateway, counting the requests open at once in `in_flight`
+    """
+    @web.middleware
+    async def count_in_flight(request, handler):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            # give the other queries time to pile up on the transport
+            await asyncio.sleep(0.01)
+            return await handler(request)
+        finally:
+            in_flight["now"] -= 1
+
+    async def get_heads(request):
+        return web.json_response(heads)
+
+    app = web.Application(middlewares=[count_in_flight])
+    app.router.add_get("/climate/hashes/heads.json", get_heads)
+    app.router.add_static("/ipfs", str(root))
+    return app
+
+
+def run_on_gateway(root, heads, query, max_concurrency=aio.DEFAULT_CONCURRENCY):
+    """
+    Run the coroutine function `query` with an AsyncGatewayTransport reading `root` from a local server
+    return: what `query` returns, and the most requests the server had open at once
+    """
+    in_flight = {"now": 0, "peak": 0}
+
+    async def main():
+        async with TestServer(make_app(root, heads, in_flight)) as server:
+            url = str(server.make_url("")).rstrip("/")
+            async with aio.AsyncGatewayTransport(url=url, max_concurrency=max_concurrency) as transport:
+                return await query(transport)
+
+    return asyncio.run(main()), in_flight["peak"]
+
+
+def test_async_gridcell_histories(mocker, tmp_path):
+    root = tmp_path / "ipfs"
+    heads = write_gridded_releases(root)
+    points = [(10.01, 20.01), (10.0, 20.04), (9.99, 19.99), (12, 20)]
+
+    async def query(transport):
+        many = await asyncio.gather(*(
+            aio.get_gridcell_histories(points, "chirpsc_final_05-daily", transport=transport) for _ in range(5)))
+        with pytest.raises(CoordinateNotFoundError):
+            await aio.get_gridcell_history(12, 20, "chirpsc_final_05-daily", transport=transport)
+        return many
+
+    results, peak = run_on_gateway(root, heads, query, max_concurrency=2)
+    assert peak == 2
+    patch_directory(mocker, root, heads)
+    expected = client.get_gridcell_histories(points, "chirpsc_final_05-daily")
+    assert expected[(12, 20)] is None
+    assert all(result == expected for result in results)
+
+
+def test_async_queries_match_client(mocker, tmp_path):
+    root = tmp_path / "ipfs"
+    csv = "DATE,TMAX,PRCP\n2021-01-01,105,3\n2021-01-02,,\n2021-01-03,-20,0\n"
+    write_release(root, "QmGhcnd", {"previous hash": None}, {"USW00014732.csv.gz": gzip.compress(csv.encode("utf-8"))})
+
+    forecast_date = datetime.date(2022, 12, 31)
+    zip_file = BytesIO()
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("20221231_10.00_20.00", "1.5,2.5,,3.5\n")
+        z.writestr("20221231_10.00_20.10", "4,5,6,7\n")
+    forecast_metadata = {"resolution": 0.1, "latitude range": [-90, 90], "longitude range": [-180, 180],
+                         "unit of measurement": "mm", "missing value": ""}
+    write_release(root, "QmEcmwfRoot",
+                  {**forecast_metadata, "date range": ["2022-12-30", "2022-12-31"], "previous hash": None,
+                   "api documentation": {"full date range": ["2022-12-30", "2022-12-31"]}},
+                  {"20221231_10.00.zip": zip_file.getvalue()})
+    write_release(root, "QmEcmwfNext",
+                  {**forecast_metadata, "date range": ["2023-01-01", "2023-01-01"], "previous hash": "QmEcmwfRoot",
+                   "api documentation": {"full date range": ["2022-12-30", "2023-01-01"]}}, {})
+
+    storms = "2000,9,1,0,NA,25.0,280.0,990,30,40\n2000,9,1,1,NA,26.0,281.0,985,35,40\n"
+    storm_files = {"STORM_NA_1.csv.gz": gzip.compress(storms.encode("utf-8")),
+                   "STORM_EP_1.csv.gz": gzip.compress(storms.replace("NA", "EP").encode("utf-8"))}
+    write_release(root, "QmStorms", {"previous hash": None, "files": list(storm_files)}, storm_files)
+
+    heads = {"ghcnd": "QmGhcnd", "ecmwf_precip-3hourly": "QmEcmwfNext", "storm-simulated-hurricane": "QmStorms"}
+
+    async def query(transport):
+        return await asyncio.gather(
+            aio.get_station_history("USW00014732", "TMAX", transport=transport),
+            aio.get_forecast(10.04, 20.02, forecast_date, "ecmwf_precip-3hourly",
+                             also_return_snapped_coordinates=True, transport=transport),
+            aio.get_tropical_storms("simulated", "NA", transport=transport))
+
+    (station, forecast, storm_frame), _ = run_on_gateway(root, heads, query)
+    patch_directory(mocker, root, heads)
+    assert station == client.get_station_history("USW00014732", "TMAX")
+    assert forecast == client.get_forecast(10.04, 20.02, forecast_date, "ecmwf_precip-3hourly",
+                                           also_return_snapped_coordinates=True)
+    assert forecast["snapped to"] == [10.0, 20.0] and len(forecast["data"]) == 4
+    assert storm_frame.equals(client.get_tropical_storms("simulated", "NA"))
+    assert list(storm_frame.lon) == [-80.0, -79.0]
@@ -1,4 +1,8 @@
-from dweather_client.aliases_and_units import snotel_to_ghcnd, rounding_formula, rounding_formula_temperature
+from dweather_client.aliases_and_units import snotel_to_ghcnd, rounding_formula, rounding_formula_temperature, \
+    round_converted, round_converted_temperature, str_precision, get_unit_converter_no_aliases, get_unit_converter, \
+    METRIC_TO_IMPERIAL, IMPERIAL_TO_METRIC, AffineConverter
+from astropy import units as u
+import numpy as np
 
 def test_snotel_to_ghcnd():
     assert snotel_to_ghcnd(602, 'CO') == 'USS0005K05S'
@@ -11,3 +15,52 @@ def test_rounding_formula():
 def test_rounding_formula_temperature():
     assert rounding_formula_temperature("11", 51.8) == 52
     assert rounding_formula_temperature("11.0", 51.8) == 51.8
+
+
+def test_round_converted_matches_rounding_formula():
+    str_vals = np.array(["10", "34.60", "0", "0.00", "nan", "-12.345", "55.25", "0.001", "1403.5", "-9.6525"], dtype=object)
+    original = str_vals.astype(float)
+    precision = str_precision(str_vals)
+    assert list(precision) == [0, 2, 0, 2, 0, 3, 2, 3, 1, 4]
+    for factor in (25.4, 1 / 25.4, 0.0393701, -2):
+        converted = original * factor
+        expected = np.vectorize(rounding_formula)(str_vals, original, converted)
+        np.testing.assert_array_equal(round_converted(original, converted, precision), expected)
+        expected = np.vectorize(rounding_formula_temperature)(str_vals, converted)
+        np.testing.assert_array_equal(round_converted_temperature(converted, precision), expected)
+
+
+def test_round_converted_keeps_the_shape_of_its_input():
+    # a (times, lats) cube as get_gridcell_region rounds it, with exact halves rounded by Python
+    str_vals = np.array([["0.5", "2.5", "1.25"], ["-0.125", "nan", "3"]], dtype=object)
+    original = str_vals.astype(float)
+    precision = str_precision(str_vals.ravel()).reshape(str_vals.shape)
+    for converted in (original, original * 25.4):
+        expected = np.vectorize(rounding_formula_temperature)(str_vals, converted)
+        rounded = round_converted_temperature(converted, precision)
+        assert rounded.shape == (2, 3)
+        np.testing.assert_array_equal(rounded, expected)
+        np.testing.assert_array_equal(round_converted(original, converted, precision),
+                                      np.vectorize(rounding_formula)(str_vals, original, converted))
+    np.testing.assert_array_equal(round_converted_temperature(original, 0), [[0, 2, 1], [-0, np.nan, 3]])
+
+
+def test_unit_converters_are_built_once():
+    converter, dweather_unit = get_unit_converter_no_aliases("degC", "degF")
+    assert get_unit_converter_no_aliases("degC", "degF") == (converter, dweather_unit)
+    assert round(converter(10 * dweather_unit).value, 6) == 50
+    assert get_unit_converter("mm", True) is get_unit_converter("mm", True)
+
+
+def test_affine_converters_match_astropy():
+    values = np.array([-40.0, 0.0, 0.125, 37.5, 1e6, np.nan])
+    for table in (METRIC_TO_IMPERIAL, IMPERIAL_TO_METRIC):
+        for from_unit, converter in table.items():
+            assert isinstance(converter, AffineConverter)
+            expected = (values * from_unit).to(converter.to_unit, equivalencies=u.temperature())
+            converted = converter(values * from_unit)
+            assert converted.unit == expected.unit
+            np.testing.assert_allclose(converted.value, expected.value, rtol=1e-12)
+    converter, dweather_unit = get_unit_converter_no_aliases("degF", "K")
+    np.testing.assert_allclose(converter(values * dweather_unit).value,
+                               (values * dweather_unit).to(u.K, equivalencies=u.temperature()).value, rtol=1e-12)
@@ -0,0 +1,90 @@
+import io
+import tarfile
+import zipfile
+import pytest
+from dweather_client import archive_utils
+from dweather_client.cache_utils import ContentCache
+
+
+class CountingTransport:
+    def __init__(self, files):
+        self.files = files
+        self.bytes_sent = 0
+
+    def cat(self, path):
+        self.bytes_sent += len(self.files[path])
+        return self.files[path]
+
+    def cat_range(self, path, offset, length):
+        self.bytes_sent += length
+        return self.files[path][offset:offset + length]
+
+    def size(self, path):
+        return len(self.files[path])
+
+
+def make_tar(members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def test_get_tar_member(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_utils, "TAR_INDEX_CACHE", ContentCache("tar_index", cache_dir=str(tmp_path)))
+    members = {f"10.000_{lon}.gz": bytes([lon]) * 1000 for lon in range(20)}
+    transport = CountingTransport({"Qmhash/10.000.tar": make_tar(members)})
+    assert archive_utils.get_tar_member(transport, "Qmhash/10.000.tar", "10.000_3.gz") == members["10.000_3.gz"]
+    transport.bytes_sent = 0
+    assert archive_utils.get_tar_member(transport, "Qmhash/10.000.tar", "10.000_7.gz") == members["10.000_7.gz"]
+    assert transport.bytes_sent == 1000
+    with pytest.raises(KeyError):
+        archive_utils.get_tar_member(transport, "Qmhash/10.000.tar", "missing.gz")
+
+
+def test_get_tar_members(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_utils, "TAR_INDEX_CACHE", ContentCache("tar_index", cache_dir=str(tmp_path)))
+    members = {f"10.000_{lon}.gz": bytes([lon]) * 1000 for lon in range(20)}
+    tar = make_tar(members)
+    transport = CountingTransport({"Qmhash/10.000.tar": tar})
+    wanted = ["10.000_3.gz", "10.000_5.gz", "missing.gz"]
+    assert archive_utils.get_tar_members(transport, "Qmhash/10.000.tar", wanted) == \
+        {name: members[name] for name in wanted[:2]}
+    assert transport.bytes_sent == len(tar)
+    transport.bytes_sent = 0
+    assert archive_utils.get_tar_members(transport, "Qmhash/10.000.tar", wanted) == \
+        {name: members[name] for name in wanted[:2]}
+    # the span from the first to the last wanted member, instead of the whole tar
+    assert transport.bytes_sent < 3 * 1536
+
+
+def make_zip(members, compression):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, mode="w", compression=compression) as zi:
+        for name, content in members.items():
+            zi.writestr(name, content)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2])
+def test_get_zip_member(tmp_path, monkeypatch, compression):
+    monkeypatch.setattr(archive_utils, "ZIP_INDEX_CACHE", ContentCache("zip_index", cache_dir=str(tmp_path)))
+    members = {f"10.000_{lon}.gz": bytes(range(lon, lon + 200)) * 50 for lon in range(20)}
+    transport = CountingTransport({"Qmhash/10.000.zip": make_zip(members, compression)})
+    for name in ["10.000_3.gz", "10.000_19.gz"]:
+        assert archive_utils.get_zip_member(transport, "Qmhash/10.000.zip", name) == members[name]
+    with pytest.raises(KeyError):
+        archive_utils.get_zip_member(transport, "Qmhash/10.000.zip", "missing.gz")
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2])
+def test_get_zip_members(tmp_path, monkeypatch, compression):
+    monkeypatch.setattr(archive_utils, "ZIP_INDEX_CACHE", ContentCache("zip_index", cache_dir=str(tmp_path)))
+    members = {f"10.000_{lon}.gz": bytes(range(lon, lon + 200)) * 50 for lon in range(20)}
+    transport = CountingTransport({"Qmhash/10.000.zip": make_zip(members, compression)})
+    wanted = ["10.000_2.gz", "10.000_4.gz", "10.000_19.gz", "missing.gz"]
+    assert archive_utils.get_zip_members(transport, "Qmhash/10.000.zip", wanted) == \
+        {name: members[name] for name in wanted[:3]}
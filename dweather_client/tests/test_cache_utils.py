@@ -0,0 +1,37 @@
+import os
+from dweather_client.cache_utils import ContentCache, get_cached_json
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ContentCache("metadata", cache_dir=str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return '{"previous hash": null}'
+
+    assert get_cached_json(cache, "Qm123", fetch) == {"previous hash": None}
+    assert get_cached_json(cache, "Qm123", fetch) == {"previous hash": None}
+    assert len(calls) == 1
+    # a fresh cache in the same directory reads from disk instead of fetching
+    assert ContentCache("metadata", cache_dir=str(tmp_path)).get("Qm123") == '{"previous hash": null}'
+
+
+def test_cache_memory_eviction():
+    cache = ContentCache("metadata", max_entries=2, persist=False)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_cache_disk_eviction(tmp_path):
+    cache = ContentCache("metadata", max_entries=1, max_disk_bytes=250, cache_dir=str(tmp_path))
+    for i in range(10):
+        cache.put(f"key_{i}", "x" * 50)
+    directory = os.path.join(str(tmp_path), "metadata")
+    assert sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) <= 250
+    assert cache.get("key_9") == "x" * 50
@@ -0,0 +1,53 @@
+import datetime
+import numpy as np
+from dweather_client.cell_utils import decode_cell, decode_lines, time_index, decimal_places, stack_cells, cell_frame, \
+    VALUE, PRECISION
+
+
+def test_decode_cell_matches_str_parsing():
+    text = "1.25,-999.0,3\n,4.5,12.000\n0.1,-0.75"
+    values, precision = decode_cell(text.encode(), "-999.0")
+    tokens = text.replace("\n", ",").split(",")
+    expected = [np.nan if t in ("", "-999.0") else float(t) for t in tokens]
+    np.testing.assert_array_equal(values, expected)
+    assert list(precision[[0, 2, 4, 5, 6, 7]]) == [2, 0, 1, 3, 1, 2]
+
+
+def test_decode_cell_numeric_missing_value():
+    values, _ = decode_cell(b"1,-999,2.5", -999)
+    np.testing.assert_array_equal(values, [1, np.nan, 2.5])
+
+
+def test_time_index():
+    first = datetime.datetime(2020, 2, 28)
+    assert list(time_index(first, 3, "chirpsc_final_05-daily")) == [
+        datetime.date(2020, 2, 28), datetime.date(2020, 2, 29), datetime.date(2020, 3, 1)]
+    assert time_index(first, 25, "rtma_pcp-hourly")[-1] == datetime.datetime(2020, 2, 29)
+
+
+def test_decimal_places_matches_str():
+    values = np.array([12.0, 3.5, 0.25, -1.125, 7.0625, 280.1234])
+    expected = [len(str(v).split(".")[1]) for v in values]
+    assert list(decimal_places(values)) == expected
+
+
+def test_decode_lines():
+    frame = decode_lines(
+        [b"1,2", b"3.5,,4"], [datetime.date(2019, 12, 30), datetime.date(2020, 1, 1)], datetime.timedelta(days=1))
+    assert list(frame.index.date) == [datetime.date(2019, 12, 30), datetime.date(2019, 12, 31)] + \
+        [datetime.date(2020, 1, d) for d in (1, 2, 3)]
+    np.testing.assert_array_equal(frame[VALUE].values, [1, 2, 3.5, np.nan, 4])
+    assert list(frame[PRECISION]) == [0, 0, 1, 0, 0]
+    assert decode_lines([], [], datetime.timedelta(days=1)).empty
+
+
+def test_stack_cells():
+    first = cell_frame([1.0, 2.0], [1, 2], time_index(datetime.datetime(2000, 1, 1), 2, "test-daily"))
+    second = cell_frame([3.0], [0], time_index(datetime.datetime(2000, 1, 2), 1, "test-daily"))
+    times, values, precision = stack_cells([first, None, second, first], (2, 2))
+    assert list(times) == [datetime.date(2000, 1, 1), datetime.date(2000, 1, 2)]
+    assert values.shape == precision.shape == (2, 2, 2)
+    np.testing.assert_array_equal(values[:, 0, 0], [1.0, 2.0])
+    assert np.isnan(values[:, 0, 1]).all()
+    np.testing.assert_array_equal(values[:, 1, 0], [np.nan, 3.0])
+    np.testing.assert_array_equal(precision[:, 1, 1], [1, 2])
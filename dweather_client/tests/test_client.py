@@ -1,10 +1,13 @@
 from dweather_client.ipfs_errors import *
-from dweather_client.tests.mock_fixtures import get_patched_datasets
+from dweather_client.tests.mock_fixtures import get_patched_datasets, patch_offline, patch_directory, CountingTransport, \
+    write_gridded_releases
 from dweather_client.client import get_australia_station_history, get_station_history, get_gridcell_history, get_tropical_storms,\
     get_yield_history, get_irrigation_data, get_power_history, get_gas_history, get_alberta_power_history, GRIDDED_DATASETS, has_dataset_updated,\
     get_forecast_datasets, get_forecast, get_cme_station_history, get_european_station_history, get_hourly_station_history, get_drought_monitor_history, get_japan_station_history,\
-    get_afr_history, get_cwv_station_history, get_teleconnections_history, get_station_forecast_history, get_station_forecast_stations, get_eaufrance_history, get_sap_station_history
+    get_afr_history, get_cwv_station_history, get_teleconnections_history, get_station_forecast_history, get_station_forecast_stations, get_eaufrance_history, get_sap_station_history,\
+    get_gridcell_histories
 from dweather_client.aliases_and_units import snotel_to_ghcnd
+import numpy as np
 import pandas as pd
 from io import StringIO
 import datetime
@@ -184,6 +187,44 @@ def test_get_gridcell_history_date_range(mocker):
         assert time_diff_hours + 1 == len(res)
 
 
+def test_get_gridcell_history_window(mocker):
+    patch_offline(mocker)
+    start, end = datetime.date(2008, 1, 1), datetime.date(2008, 1, 31)
+    res = get_gridcell_history(37, -83, "chirpsc_final_05-daily",
+                               ipfs_timeout=IPFS_TIMEOUT, start=start, end=end)
+    assert sorted(res)[0] == start
+    assert sorted(res)[-1] == end
+    assert len(res) == 31
+
+
+def test_get_gridcell_history_result_formats(mocker):
+    patch_offline(mocker)
+    as_dict = get_gridcell_history(37, -83, "rtma_pcp-hourly", ipfs_timeout=IPFS_TIMEOUT)
+    series = get_gridcell_history(37, -83, "rtma_pcp-hourly", ipfs_timeout=IPFS_TIMEOUT, result_format="series")
+    quantity, index = get_gridcell_history(37, -83, "rtma_pcp-hourly", ipfs_timeout=IPFS_TIMEOUT, result_format="quantity")
+    assert len(series) == len(quantity) == len(index) == len(as_dict)
+    assert series.attrs["unit"] == quantity.unit
+    for k, v in as_dict.items():
+        assert (np.isnan(series[k]) if v is None else series[k] == v.value)
+
+
+def test_get_gridcell_histories(mocker, tmp_path):
+    transport = patch_directory(mocker, tmp_path, write_gridded_releases(tmp_path), CountingTransport(str(tmp_path)))
+    # two cells on the same latitude row, one of them queried twice, and a cell the dataset has no data for
+    points = [(10.01, 20.01), (10.0, 20.04), (9.99, 19.99), (12, 20)]
+    histories = get_gridcell_histories(points, "chirpsc_final_05-daily")
+    cell_reads = [path for path in transport.reads if not path.endswith("metadata.json")]
+    # the tar holding both cells is fetched once, and each root cell once
+    assert sorted(cell_reads) == ["QmChirpsNext/10.000.tar", "QmChirpsNext/12.000.tar", "QmChirpsRoot/10.000_20.000.gz",
+                                  "QmChirpsRoot/10.000_20.050.gz", "QmChirpsRoot/12.000_20.000.gz"]
+    assert histories[(12, 20)] is None
+    assert histories[(10.01, 20.01)] == histories[(9.99, 19.99)]
+    assert [None if v is None else v.to_value(u.mm) for v in histories[(10.0, 20.04)].values()] == \
+        [pytest.approx(4), None, pytest.approx(6), pytest.approx(9), pytest.approx(10)]
+    for point in points[:3]:
+        assert histories[point] == get_gridcell_history(*point, "chirpsc_final_05-daily")
+
+
 def test_get_forecast_date_range():
     for s in get_forecast_datasets():
         res = get_forecast(37, -83, datetime.date(2022, 12, 31),
@@ -509,3 +550,18 @@ def test_forecast_station_stations():
 def test_eaufrance_station():
     history = get_eaufrance_history("V720001002", "FLOWRATE")
     assert history[datetime.date(2022, 4, 2)].value == 749
+
+
+def test_eaufrance_result_formats(mocker, tmp_path):
+    (tmp_path / "QmEau").mkdir()
+    (tmp_path / "QmEau" / "metadata.json").write_text("{}")
+    (tmp_path / "QmEau" / "V720001002.csv").write_text("DATE,FLOWRATE\n2022-04-01,750.5\n2022-04-02,749\n2022-04-03,\n")
+    patch_directory(mocker, tmp_path, {"EauFrance-daily": "QmEau"})
+    as_dict = get_eaufrance_history("V720001002", "FLOWRATE")
+    series = get_eaufrance_history("V720001002", "FLOWRATE", result_format="series")
+    quantity, index = get_eaufrance_history("V720001002", "FLOWRATE", result_format="quantity")
+    assert as_dict[datetime.date(2022, 4, 2)].value == 749 and as_dict[datetime.date(2022, 4, 3)] is None
+    assert list(index.date) == sorted(as_dict) == list(series.index.date)
+    assert series.attrs["unit"] == quantity.unit == as_dict[datetime.date(2022, 4, 1)].unit
+    np.testing.assert_array_equal(series.values, [750.5, 749, np.nan])
+    np.testing.assert_array_equal(quantity.value, series.values)
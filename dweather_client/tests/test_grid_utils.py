@@ -30,4 +30,11 @@ def test_conventional_lat_lon_to_cpc():
     lon = -98.000
     new_lat, new_lon = conventional_lat_lon_to_cpc(lat, lon)
     assert new_lat == lat
-    assert new_lon == 262.000    
\ No newline at end of file
+    assert new_lon == 262.000    
+
+def test_grid_axis():
+    assert list(grid_axis(40.1, 40.9, 0.125, 0.25)) == [40.125, 40.375, 40.625, 40.875]
+    # bounds on the grid are included, and longitudes west of the origin are on the same grid
+    assert list(grid_axis(-100.125, -99.625, 0.125, 0.25)) == [-100.125, -99.875, -99.625]
+    assert len(grid_axis(40.2, 40.3, 0.125, 0.25)) == 0
+
@@ -0,0 +1,41 @@
+from dweather_client.manifest_utils import ReleaseManifest
+
+
+def make_chain(n):
+    chain = {}
+    prev = None
+    for i in range(n):
+        chain[f"Qm{i}"] = {
+            "date range": [f"2021-01-{i + 1:02}", f"2021-01-{i + 1:02}"],
+            "time generated": f"2021-01-{i + 2:02}T00:00:00",
+            "previous hash": prev,
+        }
+        prev = f"Qm{i}"
+    return chain
+
+
+def test_manifest_only_walks_delta(tmp_path):
+    chain = make_chain(10)
+    fetched = []
+
+    def get_metadata(h):
+        fetched.append(h)
+        return chain[h]
+
+    manifest = ReleaseManifest("cpcc_precip_us-daily", cache_dir=str(tmp_path))
+    hashes = [r["hash"] for r in manifest.chain("Qm5", get_metadata)]
+    assert hashes == [f"Qm{i}" for i in range(6)]
+    assert len(fetched) == 6
+
+    # new head: only the releases published since Qm5 are fetched
+    fetched.clear()
+    records = manifest.chain("Qm9", get_metadata)
+    assert [r["hash"] for r in records] == [f"Qm{i}" for i in range(10)]
+    assert fetched == ["Qm9", "Qm8", "Qm7", "Qm6"]
+    assert records[3]["date range"] == ["2021-01-04", "2021-01-04"]
+
+    # steady state, even from a fresh process, takes no fetches at all
+    fetched.clear()
+    reloaded = ReleaseManifest("cpcc_precip_us-daily", cache_dir=str(tmp_path))
+    assert [r["hash"] for r in reloaded.chain("Qm9", get_metadata)] == [f"Qm{i}" for i in range(10)]
+    assert fetched == []
@@ -0,0 +1,76 @@
+import os
+import numpy as np
+import pytest
+from dweather_client.rtma_utils import RtmaIndex, build_rtma_records, load_rtma_records, CHUNK_SIZE
+from dweather_client.struct_utils import find_closest_lat_lon
+
+
+def bucket_search(coord_buckets, grid_mapping, lat, lon):
+    """
+    The lookup RtmaGriddedDataset.get_grid_x_y used to do on the original lookup files
+    """
+    lat, lon = str(lat), str(lon)
+    closest = find_closest_lat_lon(coord_buckets[lat[:2], lon[:3]], (lat, lon))
+    return grid_mapping[closest[0]], closest
+
+
+def make_lookup_files(rng, size=3000):
+    lats = [f"{lat}" for lat in 35 + rng.random(size) * 2]
+    lons = [f"{lon}" for lon in 250 + rng.random(size) * 2]
+    coord_buckets = {}
+    for lat, lon in zip(lats, lons):
+        coord_buckets.setdefault((lat[:2], lon[:3]), []).append((lat, lon))
+    grid_mapping = {lat: (i % 50, i // 50) for i, lat in enumerate(lats)}
+    valid_coords = [f"{(i % 50, i // 50)}\n" for i in range(len(lats))][::-1]
+    return lats, lons, coord_buckets, grid_mapping, valid_coords
+
+
+def test_rtma_index_matches_bucket_search():
+    rng = np.random.default_rng(0)
+    lats, _, coord_buckets, grid_mapping, valid_coords = make_lookup_files(rng)
+    records = build_rtma_records(coord_buckets, grid_mapping, valid_coords)
+    assert len(records) == len(lats)
+    index = RtmaIndex(records, [f"chunk_{i}.tar" for i in range(len(lats) // CHUNK_SIZE + 1)])
+    queries = list(zip(35.1 + rng.random(200) * 1.8, 250.1 + rng.random(200) * 1.8))
+    # points right by the edges of the buckets, whose closest valid point overall is often in the next bucket
+    queries += [(edge + offset, lon) for edge in (35.0, 36.0) for offset in (0.0005, 0.9995)
+                for lon in 250.05 + rng.random(20) * 1.9]
+    queries += [(lat, edge + offset) for edge in (250.0, 251.0) for offset in (0.0005, 0.9995)
+                for lat in 35.05 + rng.random(20) * 1.9]
+    points = [point for bucket in coord_buckets.values() for point in bucket]
+    crossing = 0
+    for lat, lon in queries:
+        record = index.nearest(lat, lon)
+        grid, closest = bucket_search(coord_buckets, grid_mapping, lat, lon)
+        assert (record["lat"], record["lon"]) == (float(closest[0]), float(closest[1]))
+        assert (record["x"], record["y"]) == grid
+        assert record["file_index"] == len(lats) - 1 - lats.index(closest[0])
+        crossing += find_closest_lat_lon(points, (lat, lon)) != closest
+    # the edge points do exercise buckets whose closest point isn't the closest overall
+    assert crossing > 0
+    assert index.archive(2500) == "chunk_2.tar"
+
+
+def test_rtma_index_outside_of_buckets():
+    rng = np.random.default_rng(1)
+    lats, lons, coord_buckets, grid_mapping, valid_coords = make_lookup_files(rng, 100)
+    del grid_mapping[lats[0]]
+    index = RtmaIndex(build_rtma_records(coord_buckets, grid_mapping, valid_coords), ["chunk_0.tar"])
+    with pytest.raises(KeyError):
+        index.nearest(40.5, 250.5)
+    with pytest.raises(KeyError):
+        index.nearest(float(lats[0]), float(lons[0]))
+
+
+def test_load_rtma_records_caches_the_built_index(mocker, tmp_path):
+    rng = np.random.default_rng(2)
+    _, _, coord_buckets, grid_mapping, valid_coords = make_lookup_files(rng, 100)
+    records = build_rtma_records(coord_buckets, grid_mapping, valid_coords)
+    read = mocker.patch("dweather_client.rtma_utils.read_rtma_records", return_value=records)
+    mocker.patch("dweather_client.cache_utils.CACHE_DIR", str(tmp_path))
+    shipped = str(tmp_path / "etc" / "rtma_index.npy")
+    np.testing.assert_array_equal(load_rtma_records(shipped), records)
+    # the second load maps the file written by the first, which left no temporary files behind
+    np.testing.assert_array_equal(load_rtma_records(shipped), records)
+    assert read.call_count == 1
+    assert os.listdir(tmp_path / "rtma") == ["rtma_index.npy"]
@@ -0,0 +1,43 @@
+import datetime
+import numpy as np
+import pandas as pd
+from astropy import units as u
+import math
+from dweather_client.struct_utils import merge_releases, format_history, find_closest_lat_lon, closest_lat_lon_indices
+
+
+def test_merge_releases_matches_repeated_splat():
+    chunks = [{1: "a", 2: "b", 3: "c"}, {3: "C", 4: "d"}, {4: "D", 5: "e"}]
+    expected = {}
+    for chunk in chunks:
+        expected = {**expected, **chunk}
+    merged = merge_releases(chunks)
+    assert merged == expected
+    assert list(merged) == list(expected)
+    series = merge_releases(pd.Series(chunk) for chunk in chunks)
+    assert series.to_dict() == expected
+    assert list(series.index) == list(expected)
+    assert merge_releases([[1, 2], [3]]) == [1, 2, 3]
+
+
+
+def test_format_history():
+    history = pd.Series([1.5, np.nan], index=[datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)])
+    series = format_history(history, u.mm, "series")
+    assert series.attrs["unit"] == u.mm
+    assert series.index.equals(pd.DatetimeIndex(["2020-01-01", "2020-01-02"]))
+    np.testing.assert_array_equal(series.values, history.values)
+    quantity, index = format_history(history, u.mm, "quantity")
+    assert quantity.unit == u.mm and index.equals(series.index)
+
+
+def test_closest_lat_lon():
+    rng = np.random.default_rng(0)
+    candidates = [(f"{lat}", f"{lon}") for lat, lon in zip(30 + rng.random(500), 250 + rng.random(500))]
+    queries = list(zip(30 + rng.random(50), 250 + rng.random(50)))
+    expected = [min(range(len(candidates)), key=lambda i: math.sqrt(
+        (float(candidates[i][0]) - lat) ** 2 + (float(candidates[i][1]) - lon) ** 2)) for lat, lon in queries]
+    assert [find_closest_lat_lon(candidates, query) for query in queries] == [candidates[i] for i in expected]
+    floats = np.array(candidates, dtype=float)
+    indices = closest_lat_lon_indices(floats[:, 0], floats[:, 1], *zip(*queries), block_size=1000)
+    assert list(indices) == expected
@@ -0,0 +1,37 @@
+import datetime
+import pandas as pd
+from dweather_client import timezone_utils
+from dweather_client.timezone_utils import timezone_names_at, timezone_name_at, to_local_time
+
+
+class CountingFinder:
+    def __init__(self):
+        self.lookups = 0
+
+    def timezone_at(self, lng, lat):
+        self.lookups += 1
+        return "America/New_York" if lng < -30 else "Europe/Paris"
+
+
+def test_timezone_lookups_are_cached(mocker):
+    finder = CountingFinder()
+    mocker.patch.object(timezone_utils, "_finder", finder)
+    timezone_name_at.cache_clear()
+    names = timezone_names_at([37, 48.85, 37, 37], [-83, 2.35, -83, -83])
+    assert names == ["America/New_York", "Europe/Paris", "America/New_York", "America/New_York"]
+    assert timezone_name_at(37.0, -83.0) == "America/New_York"
+    assert finder.lookups == 2
+    timezone_name_at.cache_clear()
+
+
+def test_to_local_time(mocker):
+    mocker.patch.object(timezone_utils, "_finder", CountingFinder())
+    timezone_name_at.cache_clear()
+    hourly = pd.Series([1.0, 2.0], index=pd.DatetimeIndex(["2021-01-01 05:00", "2021-01-01 06:00"]))
+    local = to_local_time(hourly, 37, -83)
+    assert list(local.index.hour) == [0, 1]
+    assert str(local.index.tz) == "America/New_York"
+    assert hourly.index.tz is None
+    daily = pd.Series([1.0], index=[datetime.date(2021, 1, 1)])
+    assert to_local_time(daily, 37, -83) is daily
+    timezone_name_at.cache_clear()
@@ -0,0 +1,25 @@
+import io
+import os
+import gzip
+import pytest
+from dweather_client.transports import DirectoryTransport, NOT_FOUND_ERRORS
+from dweather_client.stream_utils import open_stream, iter_text_lines
+
+
+def test_directory_transport(tmp_path):
+    os.makedirs(tmp_path / "Qmhash")
+    (tmp_path / "Qmhash" / "metadata.json").write_bytes(b'{"previous hash": null}')
+    transport = DirectoryTransport(str(tmp_path))
+    assert transport.cat("Qmhash/metadata.json") == b'{"previous hash": null}'
+    assert transport.cat("/ipfs/Qmhash/metadata.json") == b'{"previous hash": null}'
+    assert b"".join(transport.stream("Qmhash/metadata.json", chunk_size=4)) == b'{"previous hash": null}'
+    with pytest.raises(NOT_FOUND_ERRORS):
+        transport.cat("Qmhash/missing.tar")
+
+
+def test_streamed_lines_match_split():
+    text = "1,2,3\n4,5,6\n"
+    stream = open_stream(iter([text[:4].encode(), text[4:9].encode(), text[9:].encode()]), buffer_size=2)
+    with gzip.open(io.BytesIO(gzip.compress(stream.read()))) as gz:
+        assert list(iter_text_lines(gz)) == text.split("\n")
+    assert list(iter_text_lines(io.BytesIO(b""))) == "".split("\n")
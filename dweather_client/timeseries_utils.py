@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, time
+import numpy as np
 import pandas as pd
 
 
@@ -56,3 +57,56 @@ def period_slice_df(df, ps, pe, yrs):
             
     return mydf
 
+def window_bounds(start=None, end=None):
+    """
+    Normalize the bounds of a query window to datetimes.
+    Args:
+        start (datetime.date or datetime.datetime): first date/time to include, or None for no lower bound
+        end (datetime.date or datetime.datetime): last date/time to include, or None for no upper bound.
+        A date includes the whole day
+    Returns:
+        tuple of (start, end) as naive datetime.datetime objects or None
+    """
+    if start is not None and not isinstance(start, datetime):
+        start = datetime.combine(start, time.min)
+    if end is not None and not isinstance(end, datetime):
+        end = datetime.combine(end, time.max)
+    return start, end
+
+def overlaps_window(first, last, start=None, end=None):
+    """
+    Determine whether the span [first, last] overlaps a query window.
+    Args:
+        first (datetime.date or datetime.datetime): start of the span
+        last (datetime.date or datetime.datetime): end of the span
+        start, end: window bounds as returned by `window_bounds`
+    Returns:
+        bool
+    """
+    first, _ = window_bounds(first)
+    _, last = window_bounds(end=last)
+    if start is not None and last < start:
+        return False
+    if end is not None and first > end:
+        return False
+    return True
+
+def trim_to_window(series, start=None, end=None):
+    """
+    Drop the values of a time series that fall outside a query window.
+    Args:
+        series (pd.Series or pd.DataFrame): indexed by dates or datetimes
+        start, end: window bounds, see `window_bounds`
+    Returns:
+        series restricted to the window
+    """
+    start, end = window_bounds(start, end)
+    if start is None and end is None:
+        return series
+    index = pd.to_datetime(series.index)
+    mask = np.ones(len(index), dtype=bool)
+    if start is not None:
+        mask &= index >= start
+    if end is not None:
+        mask &= index <= end
+    return series[mask]
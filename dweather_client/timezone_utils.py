@@ -0,0 +1,76 @@
+"""
+Timezone lookups for converting hourly series to local time.
+
+Building a TimezoneFinder loads its polygon data, so a single finder is built the first time a
+timezone is needed and shared by the whole process. The timezone of each snapped grid cell is
+remembered, since queries for a portfolio ask for the same cells over and over.
+"""
+import threading
+from functools import lru_cache
+
+import pandas as pd
+import pytz
+
+TIMEZONE_CACHE_SIZE = 65536
+
+_finder = None
+_finder_lock = threading.Lock()
+
+
+def get_timezone_finder():
+    """
+    return: the process-wide TimezoneFinder, built on first use
+    """
+    global _finder
+    if _finder is None:
+        with _finder_lock:
+            if _finder is None:
+                from timezonefinder import TimezoneFinder
+                _finder = TimezoneFinder()
+    return _finder
+
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def timezone_name_at(lat, lon):
+    """
+    args:
+    :lat: float latitude, snapped to the dataset's grid so that lookups for a cell are shared
+    :lon: float longitude
+    return: IANA name of the timezone at lat/lon, or None if there is none (e.g. at sea)
+    """
+    return get_timezone_finder().timezone_at(lng=lon, lat=lat)
+
+
+def timezone_names_at(lats, lons):
+    """
+    Resolve the timezones of many points at once, looking each distinct point up only once
+    args:
+    :lats: iterable of latitudes
+    :lons: iterable of longitudes, the same length as `lats`
+    return: list of IANA names or None, one per point
+    """
+    points = [(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+    names = {point: timezone_name_at(*point) for point in set(points)}
+    return [names[point] for point in points]
+
+
+def timezone_at(lat, lon):
+    """
+    return: pytz timezone at lat/lon
+    """
+    return pytz.timezone(timezone_name_at(float(lat), float(lon)))
+
+
+def to_local_time(data, lat, lon):
+    """
+    Convert UTC hourly data to the local time at lat/lon, without copying the values
+    args:
+    :data: pd.Series or pd.DataFrame with a naive UTC DatetimeIndex
+    return: `data` with a tz-aware index, or as is if it's indexed by dates (daily sets)
+    """
+    if not isinstance(data.index, pd.DatetimeIndex):
+        return data
+    local_tz = timezone_at(lat, lon)
+    data = data.copy(deep=False)
+    data.index = data.index.tz_localize("UTC").tz_convert(local_tz)
+    return data
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.insert(1, os.getcwd())
+
+from dweather_client.aliases_and_units import rounding_formula, rounding_formula_temperature, \
+    round_converted, round_converted_temperature, str_precision
+import numpy as np
+import timeit
+import argparse
+
+def benchmark(size, repeat):
+    rng = np.random.default_rng(0)
+    decimals = rng.integers(0, 4, size)
+    str_vals = np.array([f"{val:.{d}f}" for val, d in zip(rng.normal(10, 20, size), decimals)], dtype=object)
+    original = str_vals.astype(float)
+    converted = original / 25.4
+    precision = str_precision(str_vals)
+    cases = {
+        "np.vectorize(rounding_formula)": lambda: np.vectorize(rounding_formula)(str_vals, original, converted),
+        "round_converted": lambda: round_converted(original, converted, precision),
+        "round_converted + str_precision": lambda: round_converted(original, converted, str_precision(str_vals)),
+        "np.vectorize(rounding_formula_temperature)": lambda: np.vectorize(rounding_formula_temperature)(str_vals, converted),
+        "round_converted_temperature": lambda: round_converted_temperature(converted, precision),
+    }
+    print(f"{size} values, best of {repeat}")
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f"{name:45} {seconds:.4f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=24 * 365 * 40, help="number of values, default 40 years hourly")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.size, args.repeat)
@@ -0,0 +1,298 @@
+"""
+Transports used by IpfsDataset to read content addressed by IPFS paths.
+
+A transport only has to turn a path like `{hash}/metadata.json` into bytes, so the same dataset
+classes can read from a local IPFS daemon, from an HTTP gateway, or from a directory on disk.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import ipfshttpclient
+import requests
+
+from dweather_client.ipfs_errors import ContentNotFoundError
+from dweather_client.http_queries import GATEWAY_URL, pooled_session
+from dweather_client.stream_utils import STREAM_CHUNK_SIZE
+
+GATEWAY_IPFS_ID = "/ip4/134.122.126.13/tcp/4001/p2p/12D3KooWM8nN6VbUka1NeuKnu9xcKC56D17ApAVRDyfYNytzUsqG"
+# "once": connect to the gateway peer the first time this process needs it, and again only after a timeout
+# "always": connect before every request, "never": leave peering up to the local daemon
+SWARM_CONNECT_POLICIES = ("once", "always", "never")
+
+# what each transport raises when a path doesn't exist, e.g. for the tar -> zip fallbacks
+NOT_FOUND_ERRORS = (ipfshttpclient.exceptions.ErrorResponse, ContentNotFoundError)
+TIMEOUT_ERRORS = (ipfshttpclient.exceptions.TimeoutError, requests.exceptions.Timeout)
+
+_swarm_connected_peers = set()
+_swarm_lock = threading.Lock()
+
+
+def _strip_ipfs_prefix(path):
+    path = path.lstrip("/")
+    if path.startswith("ipfs/"):
+        path = path[len("ipfs/"):]
+    return path
+
+
+class Transport(ABC):
+    """
+    Base class for the ways of reading IPFS content
+    """
+
+    @abstractmethod
+    def cat(self, path):
+        """
+        args:
+        :path: IPFS path of the file to get, e.g. `{hash}/metadata.json`
+        return: content of the file as bytes
+        raises: one of NOT_FOUND_ERRORS if the path doesn't exist
+        """
+        pass
+
+    def cat_range(self, path, offset, length):
+        """
+        args:
+        :path: IPFS path of the file to get
+        :offset: index of the first byte to get
+        :length: number of bytes to get
+        return: `length` bytes of the file starting at `offset`, fewer if the file ends first
+        """
+        return self.cat(path)[offset:offset + length]
+
+    def size(self, path):
+        """
+        args:
+        :path: IPFS path of the file
+        return: size of the file in bytes
+        """
+        return len(self.cat(path))
+
+    def stream(self, path, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        args:
+        :path: IPFS path of the file to get
+        :chunk_size: preferred size of the chunks, transports may yield chunks of other sizes
+        return: iterator of the file's content as bytes chunks
+        """
+        return iter([self.cat(path)])
+
+    def close(self):
+        """
+        Release any connections held by the transport
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class IpfsApiTransport(Transport):
+    """
+    Reads content through the HTTP API of a local IPFS daemon
+    """
+    swarm_connect_policy = "once"
+
+    def __init__(self, timeout=None, addr=None):
+        """
+        args:
+        :timeout: Time IPFS should wait for response before throwing exception. If None, will assume that
+        code is running in an environment containing all datasets (such as gateway)
+        :addr: multiaddr of the daemon's API. If None, uses ipfshttpclient's default
+        """
+        self.on_gateway = not timeout
+        if addr is None:
+            self.ipfs = ipfshttpclient.connect(timeout=timeout, session=True)
+        else:
+            self.ipfs = ipfshttpclient.connect(addr, timeout=timeout, session=True)
+        self.swarm_connected = False
+
+    def ensure_swarm_connected(self, force=False):
+        """
+        Connect the local daemon to the dClimate gateway peer according to `swarm_connect_policy`.
+        The connection is tracked both on this instance and for the whole process, so with the
+        default "once" policy a session only issues a single /swarm/connect
+        args:
+        :force: connect even if the peer is believed to be connected already
+        """
+        if self.swarm_connect_policy not in SWARM_CONNECT_POLICIES:
+            raise ValueError(f"swarm_connect_policy must be one of {SWARM_CONNECT_POLICIES}")
+        if self.on_gateway or self.swarm_connect_policy == "never":
+            return
+        force = force or self.swarm_connect_policy == "always"
+        if self.swarm_connected and not force:
+            return
+        with _swarm_lock:
+            if force or GATEWAY_IPFS_ID not in _swarm_connected_peers:
+                _swarm_connected_peers.discard(GATEWAY_IPFS_ID)
+                self.ipfs._client.request('/swarm/connect', (GATEWAY_IPFS_ID,))
+                _swarm_connected_peers.add(GATEWAY_IPFS_ID)
+        self.swarm_connected = True
+
+    def _request(self, fn, *args, **kwargs):
+        self.ensure_swarm_connected()
+        try:
+            return fn(*args, **kwargs)
+        except ipfshttpclient.exceptions.TimeoutError:
+            # a timeout is what a dropped peer looks like, so re-check the connection and retry once.
+            # ErrorResponses (e.g. a missing file) are passed through as is
+            if self.on_gateway or self.swarm_connect_policy == "never":
+                raise
+            self.ensure_swarm_connected(force=True)
+            return fn(*args, **kwargs)
+
+    def cat(self, path):
+        return self._request(self.ipfs.cat, path)
+
+    def cat_range(self, path, offset, length):
+        return self._request(self.ipfs.cat, path, offset=offset, length=length)
+
+    def size(self, path):
+        return self._request(self.ipfs.files.stat, f"/ipfs/{_strip_ipfs_prefix(path)}")["Size"]
+
+    def stream(self, path, chunk_size=STREAM_CHUNK_SIZE):
+        return self._request(self.ipfs.cat, path, stream=True)
+
+    def close(self):
+        self.ipfs.close()
+
+
+class GatewayTransport(Transport):
+    """
+    Reads content from an HTTP gateway over a pool of keep-alive connections
+    """
+
+    def __init__(self, url=GATEWAY_URL, timeout=None, pool_size=10, session=None):
+        """
+        args:
+        :url: base url of the IPFS gateway
+        :timeout: seconds to wait for the gateway before throwing exception. If None, waits indefinitely
+        :pool_size: max number of connections kept open to the gateway
+        :session: requests.Session to use instead of creating a new pooled one
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = session if session is not None else pooled_session(pool_size)
+
+    def cat(self, path):
+        r = self.session.get(f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", timeout=self.timeout)
+        if r.status_code == 404:
+            raise ContentNotFoundError(f"{path} not found on {self.url}")
+        r.raise_for_status()
+        return r.content
+
+    def cat_range(self, path, offset, length):
+        if length <= 0:
+            return b""
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        r = self.session.get(f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", headers=headers, timeout=self.timeout)
+        if r.status_code == 404:
+            raise ContentNotFoundError(f"{path} not found on {self.url}")
+        if r.status_code == 416:
+            return b""
+        r.raise_for_status()
+        if r.status_code == 206:
+            return r.content
+        # the gateway ignored the range and sent the whole file
+        return r.content[offset:offset + length]
+
+    def stream(self, path, chunk_size=STREAM_CHUNK_SIZE):
+        r = self.session.get(f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", stream=True, timeout=self.timeout)
+        if r.status_code == 404:
+            r.close()
+            raise ContentNotFoundError(f"{path} not found on {self.url}")
+        try:
+            r.raise_for_status()
+        except requests.exceptions.HTTPError:
+            r.close()
+            raise
+        return self._iter_response(r, chunk_size)
+
+    @staticmethod
+    def _iter_response(r, chunk_size):
+        try:
+            yield from r.iter_content(chunk_size)
+        finally:
+            r.close()
+
+    def size(self, path):
+        r = self.session.head(f"{self.url}/ipfs/{_strip_ipfs_prefix(path)}", timeout=self.timeout)
+        if r.status_code == 404:
+            raise ContentNotFoundError(f"{path} not found on {self.url}")
+        r.raise_for_status()
+        if "Content-Length" in r.headers:
+            return int(r.headers["Content-Length"])
+        return len(self.cat(path))
+
+    def close(self):
+        self.session.close()
+
+
+class DirectoryTransport(Transport):
+    """
+    Reads content from a local directory laid out like the gateway, i.e. `{root}/{hash}/{file}`.
+    Useful for offline use, tests and benchmarks
+    """
+
+    def __init__(self, root):
+        """
+        args:
+        :root: directory containing one subdirectory per IPFS hash
+        """
+        self.root = root
+
+    def cat(self, path):
+        return self.cat_range(path, 0, -1)
+
+    def cat_range(self, path, offset, length):
+        try:
+            with open(self._local_path(path), "rb") as f:
+                f.seek(offset)
+                return f.read(length)
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            raise ContentNotFoundError(f"{path} not found in {self.root}")
+
+    def size(self, path):
+        local_path = self._local_path(path)
+        if not os.path.isfile(local_path):
+            raise ContentNotFoundError(f"{path} not found in {self.root}")
+        return os.path.getsize(local_path)
+
+    def stream(self, path, chunk_size=STREAM_CHUNK_SIZE):
+        try:
+            f = open(self._local_path(path), "rb")
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            raise ContentNotFoundError(f"{path} not found in {self.root}")
+        return self._iter_file(f, chunk_size)
+
+    @staticmethod
+    def _iter_file(f, chunk_size):
+        with f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+
+    def _local_path(self, path):
+        return os.path.join(self.root, *_strip_ipfs_prefix(path).split("/"))
+
+
+_default_transport = None
+
+
+def set_default_transport(transport):
+    """
+    Make every IpfsDataset created without an explicit transport share `transport`.
+    Pass None to go back to creating an IpfsApiTransport per dataset
+    """
+    global _default_transport
+    _default_transport = transport
+
+
+def get_default_transport():
+    """
+    return: the transport set with set_default_transport, or None
+    """
+    return _default_transport
@@ -24,6 +24,7 @@ setuptools.setup(
     name="dweather_client",
     include_package_data=True,
     install_requires=load_requirements("requirements.txt"),
+    extras_require={"aio": ["aiohttp"]},
     version="2.1.3",
     author="Arbol",
     author_email="info@dclimate.net",